@@ -12,7 +12,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.database import Base
 from app.config import get_settings
-from app.models import User, TTSRequest  # Import all models
+from app.models import User, TTSRequest, TTSJob  # Import all models
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,52 @@
+"""Initial schema
+
+Tables were previously created by Base.metadata.create_all() at startup,
+so existing tables are left untouched.
+
+Revision ID: 1a2b3c4d5e6f
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '1a2b3c4d5e6f'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    
+    if not inspector.has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("username", sa.String(50), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+    
+    if not inspector.has_table("tts_requests"):
+        op.create_table(
+            "tts_requests",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("text", sa.Text(), nullable=False),
+            sa.Column("voice_id", sa.String(100), nullable=True),
+            sa.Column("audio_url", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_tts_requests_user_id", "tts_requests", ["user_id"])
+        op.create_index("ix_tts_requests_created_at", "tts_requests", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("tts_requests")
+    op.drop_table("users")
@@ -0,0 +1,147 @@
+"""Move generated audio out of tts_requests.audio_url
+
+Existing base64 data URLs are decoded, written to the audio store and
+replaced by the blob key, size, MIME type and duration. If any audio_url
+cannot be moved (not a base64 data URL, or invalid base64), the
+migration fails before audio_url is dropped; fix or clear those rows and
+run it again (rows already moved are skipped).
+
+Revision ID: 2b3c4d5e6f70
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import base64
+import logging
+
+
+# revision identifiers, used by Alembic.
+revision = '2b3c4d5e6f70'
+down_revision = '1a2b3c4d5e6f'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+BATCH_SIZE = 100
+
+tts_requests = sa.table(
+    "tts_requests",
+    sa.column("id"),
+    sa.column("audio_url", sa.Text()),
+    sa.column("audio_key", sa.String(64)),
+    sa.column("audio_size", sa.BigInteger()),
+    sa.column("audio_mime_type", sa.String(50)),
+    sa.column("audio_duration", sa.Float()),
+)
+
+
+def _columns(bind) -> set:
+    return {column["name"] for column in sa.inspect(bind).get_columns("tts_requests")}
+
+
+def upgrade() -> None:
+    from app.services.audio_store import get_audio_store
+    from app.utils.audio import audio_duration
+    
+    bind = op.get_bind()
+    columns = _columns(bind)
+    
+    # create_all() may already have created the new columns
+    if "audio_key" not in columns:
+        op.add_column("tts_requests", sa.Column("audio_key", sa.String(64), nullable=True))
+    if "audio_size" not in columns:
+        op.add_column("tts_requests", sa.Column("audio_size", sa.BigInteger(), nullable=True))
+    if "audio_mime_type" not in columns:
+        op.add_column("tts_requests", sa.Column("audio_mime_type", sa.String(50), nullable=True))
+    if "audio_duration" not in columns:
+        op.add_column("tts_requests", sa.Column("audio_duration", sa.Float(), nullable=True))
+    
+    if "audio_url" not in columns:
+        return
+    
+    store = get_audio_store()
+    moved = 0
+    last_id = None
+    while True:
+        query = sa.select(tts_requests.c.id, tts_requests.c.audio_url).where(
+            tts_requests.c.audio_url.like("data:%")
+        ).order_by(tts_requests.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(tts_requests.c.id > last_id)
+        rows = bind.execute(query).fetchall()
+        if not rows:
+            break
+        
+        for row_id, audio_url in rows:
+            last_id = row_id
+            header, _, payload = audio_url.partition(",")
+            if not header.endswith(";base64"):
+                logger.warning(f"Cannot move tts_request {row_id}: audio_url is not a base64 data URL")
+                continue
+            mime_type = header[len("data:"):-len(";base64")] or "application/octet-stream"
+            try:
+                audio_bytes = base64.b64decode(payload)
+            except ValueError:
+                logger.warning(f"Cannot move tts_request {row_id}: invalid base64 audio")
+                continue
+            bind.execute(
+                tts_requests.update().where(tts_requests.c.id == row_id).values(
+                    audio_key=store.put(audio_bytes),
+                    audio_size=len(audio_bytes),
+                    audio_mime_type=mime_type,
+                    audio_duration=audio_duration(audio_bytes, mime_type),
+                    audio_url=None,
+                )
+            )
+            moved += 1
+    
+    logger.info(f"Moved audio of {moved} TTS requests to the audio store")
+    
+    # Never drop audio that was not moved (including values that are not data URLs)
+    not_moved = tts_requests.c.audio_url.isnot(None) & (tts_requests.c.audio_url != "")
+    remaining = bind.execute(sa.select(sa.func.count()).where(not_moved)).scalar()
+    if remaining:
+        examples = bind.execute(
+            sa.select(tts_requests.c.id).where(not_moved).order_by(tts_requests.c.id).limit(5)
+        ).scalars().all()
+        raise RuntimeError(
+            f"{remaining} tts_requests rows have an audio_url that could not be moved to the "
+            f"audio store (e.g. {', '.join(str(row_id) for row_id in examples)}); fix or clear "
+            "their audio_url and run the migration again"
+        )
+    op.drop_column("tts_requests", "audio_url")
+
+
+def downgrade() -> None:
+    from app.services.audio_store import get_audio_store, AudioNotFoundError
+    
+    bind = op.get_bind()
+    op.add_column("tts_requests", sa.Column("audio_url", sa.Text(), nullable=True))
+    
+    store = get_audio_store()
+    rows = bind.execute(
+        sa.select(
+            tts_requests.c.id,
+            tts_requests.c.audio_key,
+            tts_requests.c.audio_mime_type,
+        ).where(tts_requests.c.audio_key.isnot(None))
+    ).fetchall()
+    for row_id, audio_key, mime_type in rows:
+        try:
+            audio_bytes = store.get(audio_key)
+        except AudioNotFoundError:
+            continue
+        audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
+        bind.execute(
+            tts_requests.update().where(tts_requests.c.id == row_id).values(
+                audio_url=f"data:{mime_type or 'application/octet-stream'};base64,{audio_base64}"
+            )
+        )
+    
+    op.drop_column("tts_requests", "audio_duration")
+    op.drop_column("tts_requests", "audio_mime_type")
+    op.drop_column("tts_requests", "audio_size")
+    op.drop_column("tts_requests", "audio_key")
@@ -0,0 +1,40 @@
+"""Composite index for keyset-paginated history
+
+Replaces the single-column user_id index with (user_id, created_at DESC,
+id DESC), which serves both per-user lookups and history pages.
+
+Revision ID: 3c4d5e6f7081
+Revises: 2b3c4d5e6f70
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c4d5e6f7081'
+down_revision = '2b3c4d5e6f70'
+branch_labels = None
+depends_on = None
+
+
+def _indexes() -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("tts_requests")}
+
+
+def upgrade() -> None:
+    indexes = _indexes()
+    if "ix_tts_requests_user_created_at_id" not in indexes:
+        op.create_index(
+            "ix_tts_requests_user_created_at_id",
+            "tts_requests",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        )
+    if "ix_tts_requests_user_id" in indexes:
+        op.drop_index("ix_tts_requests_user_id", table_name="tts_requests")
+
+
+def downgrade() -> None:
+    op.create_index("ix_tts_requests_user_id", "tts_requests", ["user_id"])
+    op.drop_index("ix_tts_requests_user_created_at_id", table_name="tts_requests")
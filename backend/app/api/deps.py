@@ -1,24 +1,25 @@
 """API dependencies for authentication and database."""
-from fastapi import Depends, HTTPException, status, Cookie, Request
-from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, status, Cookie, Request, Response, WebSocket
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import database
 from app.database import get_db
 from app.models.user import User
+from app.services.principal_cache import Principal, get_principal_cache
+from app.services.rate_limiter import ProviderBusyError, queue_deadline
 from app.utils.jwt import decode_access_token, get_username_from_token
-from typing import Optional
+from typing import Dict, Optional
+import math
 
 
-def get_current_user(
-    token: Optional[str] = None,
-    access_token: Optional[str] = Cookie(None, alias="access_token"),
-    db: Session = Depends(get_db)
-) -> User:
-    """
-    Get current authenticated user from JWT token.
-    Token can come from Authorization header or cookie.
+async def _resolve_principal(jwt_token: Optional[str], db: Optional[AsyncSession] = None) -> Principal:
     """
-    # Try to get token from cookie first, then from Authorization header
-    jwt_token = access_token or token
+    Resolve a JWT to the authenticated principal.
     
+    The token is always verified. The user lookup is served from the
+    principal cache when possible; on a miss the users table is queried
+    with db, or with a short-lived session when no db is given.
+    """
     if not jwt_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,28 +27,59 @@ def get_current_user(
         )
     
     # Decode JWT token
-    username = get_username_from_token(jwt_token)
+    payload = decode_access_token(jwt_token)
+    username = payload.get("sub") if payload else None
     if not username:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
         )
     
+    cache = get_principal_cache()
+    cache_key = payload.get("user_id") or username
+    principal = cache.get(cache_key)
+    if principal is not None and principal.username == username:
+        return principal
+    
     # Get user from database
-    user = db.query(User).filter(User.username == username).first()
+    query = select(User).where(User.username == username)
+    if db is not None:
+        user = (await db.execute(query)).scalars().first()
+    else:
+        async with database.AsyncSessionLocal() as session:
+            user = (await session.execute(query)).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
-    return user
+    principal = Principal.from_user(user)
+    cache.put(cache_key, principal)
+    return principal
+
+
+async def get_current_user(
+    token: Optional[str] = None,
+    access_token: Optional[str] = Cookie(None, alias="access_token"),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Get current authenticated user from JWT token.
+    Token can come from Authorization header or cookie.
+    """
+    # Try to get token from cookie first, then from Authorization header
+    jwt_token = access_token or token
+    return await _resolve_principal(jwt_token, db)
 
 
-def get_current_user_from_request(request: Request, db: Session = Depends(get_db)) -> User:
+async def get_current_user_from_request(request: Request, db: Optional[AsyncSession] = None) -> Principal:
     """
     Get current authenticated user from request (for use in dependencies).
     Checks both Authorization header and cookies.
+    
+    db is only used on a principal cache miss; routes that do not otherwise
+    need the database can omit it.
     """
     # Check Authorization header
     token = None
@@ -58,26 +90,118 @@ def get_current_user_from_request(request: Request, db: Session = Depends(get_db
     # Check cookie
     access_token = request.cookies.get("access_token")
     jwt_token = access_token or token
+    return await _resolve_principal(jwt_token, db)
+
+
+async def get_current_user_from_websocket(websocket: WebSocket) -> Principal:
+    """
+    Get current authenticated user for a WebSocket connection.
     
-    if not jwt_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
+    Like get_current_user_from_request(), plus a token query parameter for
+    browser clients, which cannot set headers on WebSocket requests.
+    """
+    token = websocket.query_params.get("token")
+    auth_header = websocket.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
     
-    username = get_username_from_token(jwt_token)
-    if not username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
+    access_token = websocket.cookies.get("access_token")
+    jwt_token = access_token or token
+    return await _resolve_principal(jwt_token)
+
+
+def invalidate_principal(jwt_token: Optional[str]) -> None:
+    """Drop the cached principal for a token (e.g. on logout)."""
+    payload = decode_access_token(jwt_token) if jwt_token else None
+    if payload:
+        get_principal_cache().invalidate(payload.get("user_id") or payload.get("sub"))
+
+
+def get_queue_deadline(request: Request) -> float:
+    """
+    Deadline for admitting this request's provider calls.
     
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+    Callers can lower the wait with an X-Max-Queue-Wait header (seconds);
+    the server maximum (PROVIDER_QUEUE_MAX_WAIT_SECONDS) always applies.
+    """
+    max_wait = None
+    header = request.headers.get("X-Max-Queue-Wait")
+    if header:
+        try:
+            max_wait = float(header)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="X-Max-Queue-Wait must be a number of seconds"
+            )
+    return queue_deadline(max_wait)
+
+
+def provider_busy_http_exception(e: ProviderBusyError) -> HTTPException:
+    """Map a rejected provider call to 429/503 with a Retry-After header."""
+    return HTTPException(
+        status_code=e.status_code,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
+def wants_binary_audio(request: Request, binary: bool = False) -> bool:
+    """
+    Whether to answer a generation request with the raw audio body.
+    
+    Selected with ?binary=true, or with an Accept header that ranks an
+    audio/* type at least as high as JSON (q-values are respected, so
+    browsers' and HTTP clients' default */* keeps the JSON response).
+    """
+    if binary:
+        return True
+    accept = request.headers.get("Accept")
+    if not accept:
+        return False
     
-    return user
+    audio_q = 0.0
+    json_q = 0.0
+    for media_range in accept.split(","):
+        media_type, _, params = media_range.partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type.startswith("audio/"):
+            audio_q = max(audio_q, q)
+        elif media_type in ("application/json", "application/*", "*/*"):
+            json_q = max(json_q, q)
+    return audio_q > 0 and audio_q >= json_q
+
 
+def binary_audio_response(
+    audio_bytes: bytes,
+    mime_type: str,
+    tts_request,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Raw audio response for a stored generation.
+    
+    The body is the audio itself (no base64/JSON wrapping); metadata that
+    the JSON response would carry is sent as headers. Content-Location
+    points to the copy kept in the user's history.
+    """
+    audio_headers = {"X-TTS-Request-Id": str(tts_request.id)}
+    if tts_request.audio_url:
+        audio_headers["Content-Location"] = tts_request.audio_url
+    if tts_request.audio_duration is not None:
+        audio_headers["X-Audio-Duration"] = f"{tts_request.audio_duration:.3f}"
+    if tts_request.voice_id:
+        audio_headers["X-Voice-Id"] = tts_request.voice_id
+    if tts_request.created_at is not None:
+        audio_headers["X-Created-At"] = tts_request.created_at.isoformat()
+    audio_headers.update(headers or {})
+    # Content-Length is set from the body
+    return Response(content=audio_bytes, media_type=mime_type, headers=audio_headers)
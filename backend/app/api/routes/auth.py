@@ -1,11 +1,11 @@
 """Authentication routes."""
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.schemas.auth import LoginRequest, LoginResponse, UserResponse
 from app.services.auth_service import validate_credentials, get_or_create_user
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, invalidate_principal
 from app.utils.jwt import create_access_token
 from app.models.user import User
 from app.config import get_settings
@@ -18,7 +18,7 @@ settings = get_settings()
 async def login(
     credentials: LoginRequest,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login endpoint with JWT token in HTTP-only cookie."""
     # Validate credentials
@@ -29,7 +29,7 @@ async def login(
         )
     
     # Get or create user in database
-    user = get_or_create_user(db, credentials.username)
+    user = await get_or_create_user(db, credentials.username)
     
     # Create JWT access token
     access_token = create_access_token(
@@ -60,6 +60,8 @@ async def logout(
     access_token: str = Cookie(None, alias="access_token")
 ):
     """Logout endpoint - clears the access token cookie."""
+    invalidate_principal(access_token)
+    
     # Create response and clear cookie
     response = JSONResponse(content={"message": "Logout successful"})
     response.delete_cookie(
@@ -73,9 +75,9 @@ async def logout(
 @router.get("/me", response_model=UserResponse)
 async def get_me(
     access_token: str = Cookie(None, alias="access_token"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current authenticated user from JWT token in cookie."""
-    user = get_current_user(token=None, access_token=access_token, db=db)
+    user = await get_current_user(token=None, access_token=access_token, db=db)
     return UserResponse.model_validate(user)
 
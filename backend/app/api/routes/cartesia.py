@@ -1,25 +1,64 @@
 """Cartesia AI TTS routes."""
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Cookie, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Cookie, Request, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.api.deps import get_current_user, get_current_user_from_request
+from app.api.deps import (
+    get_current_user,
+    get_current_user_from_request,
+    get_queue_deadline,
+    provider_busy_http_exception,
+    wants_binary_audio,
+    binary_audio_response,
+)
 from app.services.cartesia_service import (
-    generate_tts_audio,
-    get_available_voices,
+    generate_tts_audio_async,
+    stream_tts_audio_async,
+    voice_catalog,
+    DEFAULT_VOICES,
     get_available_models,
     get_available_languages,
+    resolve_output_format,
+    resolve_postprocess,
+    output_format_mime_type,
+    get_output_format_options,
 )
-from app.config import ConfigurationError
+from app.services.tts_history_service import record_tts_request, stream_and_record
+from app.services.catalog_cache import etag_matches, catalog_headers
+from app.services.rate_limiter import ProviderBusyError
+from app.services.batch_service import run_tts_batch
+from app.utils.pcm import PostProcessOptions
+from app.api.routes.tts import _batch_response, _validate_batch_size, _validate_batch_text
+from app.api.routes.jobs import queue_job_response
+from app.schemas.tts import TTSBatchResponse, TTSJobResponse
+from app.config import ConfigurationError, get_settings
 import io
-from typing import Optional
+import logging
+from typing import Dict, Literal, Optional
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/cartesia", tags=["cartesia"])
 
 
+def _generation_http_exception(e: Exception) -> HTTPException:
+    """Map a Cartesia generation error to an HTTP error response."""
+    if isinstance(e, ProviderBusyError):
+        return provider_busy_http_exception(e)
+    if isinstance(e, ConfigurationError):
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Failed to generate audio: {str(e)}"
+    )
+
+
 class CartesiaGenerateRequest(BaseModel):
     """Request model for Cartesia TTS generation."""
     text: str
@@ -29,6 +68,14 @@ class CartesiaGenerateRequest(BaseModel):
     speed: float = 1.0
     volume: float = 1.0
     emotion: str = "neutral"
+    bypass_cache: bool = False
+    # Output format (see GET /api/cartesia/models for what each model supports)
+    container: Literal["wav", "raw", "mp3"] = "wav"
+    encoding: Optional[Literal["pcm_f32le", "pcm_s16le", "pcm_mulaw", "pcm_alaw"]] = None
+    sample_rate: int = 44100
+    bit_rate: Optional[int] = None
+    # Trim silence and normalize loudness (None follows AUDIO_POSTPROCESS_ENABLED)
+    postprocess: Optional[bool] = None
 
 
 class CartesiaGenerateResponse(BaseModel):
@@ -37,18 +84,84 @@ class CartesiaGenerateResponse(BaseModel):
     audio_url: str
     text: str
     voice_id: Optional[str]
+    mime_type: str
+    output_format: Dict
+    audio_size: int
+    audio_duration: Optional[float] = None
     created_at: datetime
 
 
-@router.post("/generate", response_model=CartesiaGenerateResponse)
+def _output_format(request_body: CartesiaGenerateRequest, postprocess: Optional[PostProcessOptions] = None) -> Dict:
+    """
+    Resolve the requested output format, rejecting unsupported combinations.
+    
+    Post-processed audio defaults to pcm_s16le instead of pcm_f32le.
+    """
+    encoding = request_body.encoding
+    if encoding is None and postprocess is not None:
+        encoding = "pcm_s16le"
+    try:
+        return resolve_output_format(
+            request_body.model_id,
+            request_body.container,
+            encoding,
+            request_body.sample_rate,
+            request_body.bit_rate,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _postprocess(request_body: CartesiaGenerateRequest) -> Optional[PostProcessOptions]:
+    """Post-processing options for the request, rejecting unsupported formats."""
+    try:
+        return resolve_postprocess(request_body.container, request_body.encoding, request_body.postprocess)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+class CartesiaBatchRequest(BaseModel):
+    """Request model for Cartesia batch TTS generation."""
+    items: list[CartesiaGenerateRequest]
+
+
+@router.post(
+    "/generate",
+    response_model=CartesiaGenerateResponse,
+    responses={200: {"content": {"audio/wav": {}, "audio/pcm": {}, "audio/mpeg": {}}}}
+)
 async def generate_cartesia_tts(
     request_body: CartesiaGenerateRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    binary: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Generate TTS audio using Cartesia AI."""
+    """
+    Generate TTS audio using Cartesia AI.
+    
+    The output format defaults to 44.1 kHz pcm_f32le WAV; smaller formats
+    (pcm_s16le, 8-bit pcm_mulaw/pcm_alaw, lower sample rates, or mp3 on
+    models that support it) cut response and storage size. container raw
+    returns bare PCM samples (audio/pcm) without a WAV header. The
+    response reports the resulting size and duration.
+    
+    With postprocess (or AUDIO_POSTPROCESS_ENABLED), leading and trailing
+    silence is trimmed and loudness normalized; the encoding then
+    defaults to pcm_s16le. Only pcm_f32le and pcm_s16le output can be
+    post-processed.
+    
+    With ?binary=true or Accept: audio/* the audio itself is returned
+    instead of JSON; metadata is sent in X-TTS-Request-Id,
+    X-Audio-Duration, X-Audio-Encoding and X-Audio-Sample-Rate headers.
+    """
     # Authenticate user using request-based dependency
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request(request, db)
     
     # Validate text
     if not request_body.text or len(request_body.text.strip()) == 0:
@@ -56,10 +169,13 @@ async def generate_cartesia_tts(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Text cannot be empty"
         )
+    postprocess = _postprocess(request_body)
+    output_format = _output_format(request_body, postprocess)
+    mime_type = output_format_mime_type(output_format)
     
     try:
         # Generate audio using Cartesia
-        audio_bytes = generate_tts_audio(
+        audio_bytes = await generate_tts_audio_async(
             text=request_body.text,
             voice_id=request_body.voice_id,
             model_id=request_body.model_id,
@@ -67,110 +183,264 @@ async def generate_cartesia_tts(
             speed=request_body.speed,
             volume=request_body.volume,
             emotion=request_body.emotion,
+            output_format=output_format,
+            bypass_cache=request_body.bypass_cache,
+            deadline=get_queue_deadline(request),
+            postprocess=postprocess,
         )
         
-        # Store request in database (reuse TTSRequest model)
-        from app.models.tts_request import TTSRequest
-        tts_request = TTSRequest(
+        # Store request in database (reuse TTSRequest model, audio goes to the audio store)
+        tts_request = await record_tts_request(
+            db,
             user_id=user.id,
             text=request_body.text,
             voice_id=request_body.voice_id or "cartesia-default",
-            audio_url=None
+            audio_bytes=audio_bytes,
+            mime_type=mime_type,
+            output_format=output_format
         )
-        db.add(tts_request)
-        db.commit()
-        db.refresh(tts_request)
+        
+        if wants_binary_audio(request, binary):
+            format_headers = {"X-Audio-Sample-Rate": str(output_format["sample_rate"])}
+            if "encoding" in output_format:
+                format_headers["X-Audio-Encoding"] = output_format["encoding"]
+            return binary_audio_response(audio_bytes, mime_type, tts_request, format_headers)
         
         # Convert audio to base64 for response
         import base64
         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-        audio_url = f"data:audio/wav;base64,{audio_base64}"
-        
-        # Update request with audio URL
-        tts_request.audio_url = audio_url
-        db.commit()
+        audio_url = f"data:{mime_type};base64,{audio_base64}"
         
         return CartesiaGenerateResponse(
             request_id=tts_request.id,
             audio_url=audio_url,
             text=request_body.text,
             voice_id=request_body.voice_id,
+            mime_type=mime_type,
+            output_format=output_format,
+            audio_size=tts_request.audio_size,
+            audio_duration=tts_request.audio_duration,
             created_at=tts_request.created_at
         )
-    except ConfigurationError as e:
+    except Exception as e:
+        raise _generation_http_exception(e)
+
+
+@router.post("/batch", response_model=TTSBatchResponse)
+async def generate_cartesia_batch(
+    request_body: CartesiaBatchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Generate Cartesia TTS audio for many texts in one request.
+    
+    Same behavior as /api/tts/batch: items are generated concurrently
+    within the Cartesia rate limit, stored with a single insert and
+    reported individually. Each item may choose its own output format.
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    _validate_batch_size(len(request_body.items))
+    
+    async def synthesize(item: CartesiaGenerateRequest) -> bytes:
+        _validate_batch_text(item.text)
+        postprocess = _postprocess(item)
+        return await generate_tts_audio_async(
+            text=item.text,
+            voice_id=item.voice_id,
+            model_id=item.model_id,
+            language=item.language,
+            speed=item.speed,
+            volume=item.volume,
+            emotion=item.emotion,
+            output_format=_output_format(item, postprocess),
+            bypass_cache=item.bypass_cache,
+            postprocess=postprocess,
+        )
+    
+    outcomes = await run_tts_batch(
+        db,
+        user_id=user.id,
+        items=request_body.items,
+        synthesize=synthesize,
+        concurrency=get_settings().batch_concurrency,
+        mime_type_of=lambda item: output_format_mime_type(_output_format(item)),
+        voice_id_of=lambda item: item.voice_id or "cartesia-default",
+        output_format_of=lambda item: _output_format(item, _postprocess(item))
+    )
+    return _batch_response(outcomes, _generation_http_exception)
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED, response_model=TTSJobResponse)
+async def queue_cartesia_job(
+    request_body: CartesiaGenerateRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue a Cartesia generation to run in the background.
+    
+    Returns 202 with the job id; the result is available from the job's
+    status_url (see /api/jobs/{job_id}).
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    
+    # Validate text
+    if not request_body.text or len(request_body.text.strip()) == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            detail="Text cannot be empty"
         )
-    except Exception as e:
+    
+    postprocess = _postprocess(request_body)
+    _output_format(request_body, postprocess)
+    
+    # Settle post-processing now, so a settings change does not affect queued jobs
+    payload = request_body.model_dump(mode="json")
+    payload["postprocess"] = postprocess is not None
+    return await queue_job_response(
+        db,
+        user_id=user.id,
+        provider="cartesia",
+        payload=payload
+    )
+
+
+@router.post("/stream")
+async def stream_cartesia_tts(
+    request_body: CartesiaGenerateRequest,
+    request: Request,
+    raw: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream Cartesia TTS audio as it is generated.
+    
+    By default the response is a WAV stream (header with unknown length
+    followed by PCM frames). With ?raw=true or container raw, bare PCM
+    frames are returned; the encoding and sample rate are given in the
+    X-Audio-Encoding and X-Audio-Sample-Rate headers. The request's
+    encoding and sample_rate select the PCM format (mp3 cannot be
+    streamed). Audio is streamed as
+    generated: postprocess is not available (AUDIO_POSTPROCESS_ENABLED
+    does not apply). The request is added to history once the stream has
+    been fully sent.
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    
+    # Validate text
+    if not request_body.text or len(request_body.text.strip()) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Text cannot be empty"
+        )
+    if request_body.container == "mp3":
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate audio: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Streaming supports PCM output only (container wav or raw)"
         )
+    raw = raw or request_body.container == "raw"
+    if request_body.postprocess:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="postprocess is not supported for streaming"
+        )
+    output_format = _output_format(request_body)
+    
+    chunks = stream_tts_audio_async(
+        text=request_body.text,
+        voice_id=request_body.voice_id,
+        model_id=request_body.model_id,
+        language=request_body.language,
+        speed=request_body.speed,
+        volume=request_body.volume,
+        emotion=request_body.emotion,
+        encoding=output_format["encoding"],
+        sample_rate=output_format["sample_rate"],
+        include_wav_header=not raw,
+        bypass_cache=request_body.bypass_cache,
+        deadline=get_queue_deadline(request),
+    )
+    
+    # Pull the first chunk here so provider errors map to proper status codes
+    try:
+        first_chunk = await anext(chunks)
+    except StopAsyncIteration:
+        first_chunk = b""
+    except Exception as e:
+        await chunks.aclose()
+        raise _generation_http_exception(e)
+    
+    media_type = "audio/pcm" if raw else "audio/wav"
+    return StreamingResponse(
+        stream_and_record(
+            first_chunk,
+            chunks,
+            user_id=user.id,
+            text=request_body.text,
+            voice_id=request_body.voice_id or "cartesia-default",
+            mime_type=media_type,
+            output_format=output_format
+        ),
+        media_type=media_type,
+        headers={
+            "X-Audio-Encoding": output_format["encoding"],
+            "X-Audio-Sample-Rate": str(output_format["sample_rate"]),
+        }
+    )
 
 
 @router.get("/voices")
 async def get_cartesia_voices(
     request: Request,
-    db: Session = Depends(get_db)
+    response: Response
 ):
-    """Get list of available Cartesia voices."""
+    """
+    Get list of available Cartesia voices.
+    
+    Served from the voice catalog cache; supports If-None-Match revalidation.
+    """
     # Authenticate user using request-based dependency
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request(request)
     
     try:
-        voices = get_available_voices()
-        # Always return at least default voices
-        if not voices or len(voices) == 0:
-            # Fallback default voice
-            voices = [{
-                "voice_id": "6ccbfb76-1fc6-48f7-b71d-91ac6298247b",
-                "name": "Default Voice",
-                "description": "High-quality default voice",
-            }]
-        return {"voices": voices}
-    except ConfigurationError as e:
-        # Even on config error, return default voices so user can still use TTS
-        logger.warning(f"Configuration error but returning default voices: {str(e)}")
-        return {
-            "voices": [{
-                "voice_id": "6ccbfb76-1fc6-48f7-b71d-91ac6298247b",
-                "name": "Default Voice",
-                "description": "High-quality default voice",
-            }]
-        }
+        catalog = await voice_catalog.get()
     except Exception as e:
-        # On any error, return default voices
-        logger.warning(f"Error fetching voices but returning defaults: {str(e)}")
-        return {
-            "voices": [{
-                "voice_id": "6ccbfb76-1fc6-48f7-b71d-91ac6298247b",
-                "name": "Default Voice",
-                "description": "High-quality default voice",
-            }]
-        }
+        # Serve the last fetched catalog, however old; the default voice only
+        # when none was ever fetched, so the user can still use TTS
+        catalog = voice_catalog.last()
+        if catalog is None:
+            logger.warning(f"Error fetching voices, returning defaults: {str(e)}")
+            return {"voices": DEFAULT_VOICES}
+        logger.warning(f"Error fetching voices, serving the last catalog: {str(e)}")
+    
+    if etag_matches(request.headers.get("If-None-Match"), catalog.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=catalog_headers(catalog))
+    response.headers.update(catalog_headers(catalog))
+    return {"voices": catalog.value}
 
 
 @router.get("/models")
 async def get_cartesia_models(
-    request: Request,
-    db: Session = Depends(get_db)
+    request: Request
 ):
-    """Get list of available Cartesia models."""
+    """Get list of available Cartesia models and the output format options."""
     # Authenticate user using request-based dependency
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request(request)
     
-    return {"models": get_available_models()}
+    return {"models": get_available_models(), "output_formats": get_output_format_options()}
 
 
 @router.get("/languages")
 async def get_cartesia_languages(
-    request: Request,
-    db: Session = Depends(get_db)
+    request: Request
 ):
     """Get list of available languages."""
     # Authenticate user using request-based dependency
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request(request)
     
     return {"languages": get_available_languages()}
 
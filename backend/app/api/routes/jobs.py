@@ -0,0 +1,94 @@
+"""Background TTS job routes."""
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.api.deps import get_current_user_from_request
+from app.models.tts_job import TTSJob, JOB_FINISHED_STATES
+from app.schemas.tts import TTSJobResponse
+from app.services.job_queue import enqueue_job, wait_for_job
+from app.config import get_settings
+from typing import Any, Dict
+from uuid import UUID
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def job_response(job: TTSJob) -> TTSJobResponse:
+    """Build the status representation of a job."""
+    tts_request = job.tts_request
+    return TTSJobResponse(
+        job_id=job.id,
+        provider=job.provider,
+        status=job.status,
+        status_url=f"/api/jobs/{job.id}",
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        finished_at=job.finished_at,
+        request_id=tts_request.id if tts_request else None,
+        audio_url=tts_request.audio_url if tts_request else None,
+        audio_size=tts_request.audio_size if tts_request else None,
+        audio_mime_type=tts_request.audio_mime_type if tts_request else None,
+        audio_duration=tts_request.audio_duration if tts_request else None,
+        error=job.last_error,
+        error_status_code=job.error_status_code
+    )
+
+
+def _poll_headers() -> Dict[str, str]:
+    """Suggested delay before polling an unfinished job again."""
+    return {"Retry-After": str(max(1, math.ceil(get_settings().job_poll_interval_seconds)))}
+
+
+async def queue_job_response(
+    db: AsyncSession,
+    user_id: UUID,
+    provider: str,
+    payload: Dict[str, Any]
+) -> JSONResponse:
+    """Queue a generation job and answer 202 Accepted pointing at its status."""
+    job = await enqueue_job(db, user_id=user_id, provider=provider, payload=payload)
+    body = job_response(job)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=body.model_dump(mode="json"),
+        headers={"Location": body.status_url, **_poll_headers()}
+    )
+
+
+@router.get("/{job_id}", response_model=TTSJobResponse)
+async def get_job_status(
+    job_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    wait: float = Query(0, ge=0)
+):
+    """
+    Get the status of a background TTS job.
+    
+    With wait=N the request is held until the job succeeds or fails, or N
+    seconds pass (capped at JOB_LONG_POLL_MAX_SECONDS), and then returns
+    the latest state. Once the job succeeded, audio_url points to the
+    stored audio in the user's history.
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    
+    timeout = min(wait, get_settings().job_long_poll_max_seconds)
+    job = await wait_for_job(db, job_id, user.id, timeout=timeout)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    if job.status not in JOB_FINISHED_STATES:
+        response.headers.update(_poll_headers())
+    return job_response(job)
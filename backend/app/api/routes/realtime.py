@@ -0,0 +1,328 @@
+"""Realtime TTS routes (incremental text over WebSocket)."""
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, status
+from app.api.deps import get_current_user_from_websocket
+from app.config import get_settings, ConfigurationError
+from app.services.rate_limiter import ProviderBusyError, queue_deadline
+from app.services.metrics import observe_synthesis
+from app.services.realtime_tts import (
+    RealtimeProvider,
+    RealtimeTurn,
+    create_realtime_provider,
+    DEFAULT_REALTIME_ENCODING,
+    DEFAULT_REALTIME_SAMPLE_RATE,
+)
+from contextlib import aclosing
+from typing import Any, Dict, Optional
+import asyncio
+import json
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/realtime", tags=["realtime"])
+
+
+async def _receive_message(websocket: WebSocket, timeout: float) -> Dict[str, Any]:
+    """
+    Receive the next client message (a JSON object in a text frame).
+
+    Raises:
+        WebSocketDisconnect: If the client closed the connection
+        asyncio.TimeoutError: If nothing was received within timeout
+        ValueError: If the message is not a JSON object
+    """
+    message = await asyncio.wait_for(websocket.receive(), timeout=timeout)
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+    text = message.get("text")
+    if text is None:
+        raise ValueError("Messages must be JSON objects sent as text frames")
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Messages must be JSON objects sent as text frames")
+    return data
+
+
+def _error(detail: str, status_code: int, turn: Optional[int] = None, **extra) -> Dict[str, Any]:
+    """Error event (status_code follows the HTTP API's codes)."""
+    return {"type": "error", "turn": turn, "status_code": status_code, "detail": detail, **extra}
+
+
+async def _close_quietly(websocket: WebSocket, code: int) -> None:
+    """Close the connection, ignoring a client that already went away."""
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass
+
+
+class _RealtimeSession:
+    """
+    State of one realtime connection.
+
+    Each turn has a pump task that reads the provider's audio and puts it
+    in a bounded outbound queue, which a single sender task writes to the
+    client. A client that reads slower than audio is produced fills the
+    queue, which stops the pumps reading from the provider. A new turn can
+    start while the previous one is still being sent; its pump waits for
+    the previous pump, so audio is never interleaved.
+    """
+
+    def __init__(self, websocket: WebSocket, provider: RealtimeProvider):
+        self.websocket = websocket
+        self.provider = provider
+        self.outbound: asyncio.Queue = asyncio.Queue(maxsize=get_settings().realtime_send_queue_frames)
+        self.turn_no = 0
+        # Turn currently accepting input (None between turns)
+        self.turn: Optional[RealtimeTurn] = None
+        # The current turn failed to start; its input is ignored until end/cancel
+        self.rejected = False
+        self.pumps: Dict[int, asyncio.Task] = {}
+        self.turns: Dict[int, RealtimeTurn] = {}
+        self.last_pump: Optional[asyncio.Task] = None
+        # Queued output of turns up to this number is dropped (cancelled)
+        self.cancelled_through = 0
+
+    async def send(self, message, turn: Optional[int] = None) -> None:
+        """Queue an audio frame (bytes) or event (dict) for the client."""
+        await self.outbound.put((turn, message))
+
+    async def sender(self) -> None:
+        """Write queued output to the client."""
+        try:
+            while True:
+                turn, message = await self.outbound.get()
+                if turn is not None and turn <= self.cancelled_through:
+                    continue
+                if isinstance(message, bytes):
+                    await self.websocket.send_bytes(message)
+                else:
+                    await self.websocket.send_json(message)
+        except Exception:
+            # Client gone: keep draining so pumps never block on a full queue
+            while True:
+                await self.outbound.get()
+
+    async def pump(self, turn_no: int, turn: RealtimeTurn, previous: Optional[asyncio.Task], started: float) -> None:
+        """Forward one turn's audio and events, then report it done."""
+        audio_bytes = 0
+        first_audio_ms = None
+        try:
+            events = turn.events()
+            async with aclosing(events):
+                async for event in events:
+                    if previous is not None:
+                        await asyncio.wait({previous})
+                        previous = None
+                    if event.type == "audio":
+                        if first_audio_ms is None:
+                            first_audio_ms = round((time.perf_counter() - started) * 1000, 1)
+                        audio_bytes += len(event.audio)
+                        await self.send(event.audio, turn_no)
+                    elif event.type == "flushed":
+                        await self.send({"type": "flushed", "turn": turn_no, "flush_id": event.flush_id}, turn_no)
+                    elif event.type == "done":
+                        break
+        except Exception as e:
+            logger.error(f"Realtime turn {turn_no} ({self.provider.name}) failed: {str(e)}")
+            await self.send(_error(f"Realtime synthesis failed: {str(e)}", status.HTTP_502_BAD_GATEWAY, turn_no), turn_no)
+            return
+        observe_synthesis(
+            self.provider.name, self.provider.model_id, "realtime", time.perf_counter() - started,
+            audio_bytes, first_audio_ms / 1000 if first_audio_ms is not None else None
+        )
+        await self.send({
+            "type": "done",
+            "turn": turn_no,
+            "audio_bytes": audio_bytes,
+            "first_audio_ms": first_audio_ms
+        }, turn_no)
+
+    def _forget(self, turn_no: int) -> None:
+        self.pumps.pop(turn_no, None)
+        self.turns.pop(turn_no, None)
+
+    async def start_turn(self) -> None:
+        """Open a provider turn for the text that just arrived."""
+        self.turn_no += 1
+        turn_no = self.turn_no
+        started = time.perf_counter()
+        try:
+            turn = await self.provider.open_turn(queue_deadline())
+        except ProviderBusyError as e:
+            self.rejected = True
+            await self.send(_error(str(e), e.status_code, turn_no, retry_after=max(1, math.ceil(e.retry_after))))
+            return
+        except ConfigurationError as e:
+            self.rejected = True
+            await self.send(_error(str(e), status.HTTP_400_BAD_REQUEST, turn_no))
+            return
+        except Exception as e:
+            logger.error(f"Failed to start realtime turn ({self.provider.name}): {str(e)}")
+            self.rejected = True
+            await self.send(_error(f"Failed to start realtime synthesis: {str(e)}", status.HTTP_502_BAD_GATEWAY, turn_no))
+            return
+
+        self.turn = turn
+        self.turns[turn_no] = turn
+        pump = asyncio.create_task(self.pump(turn_no, turn, self.last_pump, started))
+        pump.add_done_callback(lambda _: self._forget(turn_no))
+        self.pumps[turn_no] = pump
+        self.last_pump = pump
+
+    async def on_text(self, text: str) -> None:
+        if self.turn is None and not self.rejected:
+            await self.start_turn()
+        if self.turn is not None:
+            await self.turn.send_text(text)
+
+    async def on_flush(self) -> None:
+        if self.turn is not None:
+            await self.turn.flush()
+
+    async def on_end(self) -> None:
+        turn, self.turn = self.turn, None
+        self.rejected = False
+        if turn is not None:
+            await turn.end()
+
+    async def on_cancel(self) -> None:
+        """Stop all turns and drop their queued audio (barge-in)."""
+        self.cancelled_through = self.turn_no
+        self.turn = None
+        self.rejected = False
+        await self._stop_turns()
+        await self.send({"type": "cancelled", "turn": self.turn_no})
+
+    async def _stop_turns(self) -> None:
+        turns = list(self.turns.values())
+        for pump in list(self.pumps.values()):
+            pump.cancel()
+        for turn in turns:
+            try:
+                await turn.cancel()
+            except Exception as e:
+                logger.warning(f"Failed to cancel realtime turn: {str(e)}")
+
+    async def close(self) -> None:
+        await self._stop_turns()
+        try:
+            await self.provider.close()
+        except Exception as e:
+            logger.warning(f"Failed to close realtime provider connection: {str(e)}")
+
+
+@router.websocket("/tts")
+async def realtime_tts(websocket: WebSocket):
+    """
+    Realtime TTS over WebSocket.
+
+    Authenticate with the access_token cookie, a Bearer header or a token
+    query parameter. Client messages are JSON text frames:
+
+    - {"type": "start", "provider": "cartesia", "voice_id": ..., "model_id": ...,
+      "language": ..., "encoding": "pcm_s16le", "sample_rate": 24000, "speed": 1.0}
+      must be sent first (all fields optional; provider is cartesia or elevenlabs)
+    - {"type": "text", "text": "..."}: the next fragment of the current turn
+      (fragments are concatenated verbatim; the first one starts a turn)
+    - {"type": "flush"}: speak all text sent so far without waiting for more
+    - {"type": "end"}: last input of the turn; the next text starts a new turn
+    - {"type": "cancel"}: stop all turns and drop audio not yet sent (barge-in)
+
+    The server answers with {"type": "ready", ...} (the audio format), then
+    binary frames of raw PCM audio as they are produced, and JSON events:
+    "flushed" (Cartesia), "done" per turn (with audio_bytes and
+    first_audio_ms, the time from the turn's first text to its first
+    audio), "cancelled" and "error" (with an HTTP-style status_code;
+    errors end the turn, not the connection).
+    """
+    try:
+        await get_current_user_from_websocket(websocket)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    settings = get_settings()
+    idle_timeout = settings.realtime_idle_timeout_seconds
+    try:
+        config = await _receive_message(websocket, idle_timeout)
+        if config.get("type") != "start":
+            raise ValueError('The first message must be {"type": "start", ...}')
+        provider = create_realtime_provider(
+            provider=config.get("provider", "cartesia"),
+            voice_id=config.get("voice_id"),
+            model_id=config.get("model_id"),
+            language=config.get("language"),
+            encoding=config.get("encoding", DEFAULT_REALTIME_ENCODING),
+            sample_rate=int(config.get("sample_rate", DEFAULT_REALTIME_SAMPLE_RATE)),
+            speed=float(config.get("speed", 1.0))
+        )
+        # Connect now so the first turn does not pay for the handshake
+        await provider.connect()
+    except (WebSocketDisconnect, asyncio.TimeoutError):
+        await _close_quietly(websocket, status.WS_1000_NORMAL_CLOSURE)
+        return
+    except (ValueError, TypeError, ConfigurationError) as e:
+        await websocket.send_json(_error(str(e), status.HTTP_400_BAD_REQUEST))
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    except Exception as e:
+        logger.error(f"Failed to open realtime provider connection: {str(e)}")
+        await websocket.send_json(_error(f"Failed to connect to provider: {str(e)}", status.HTTP_502_BAD_GATEWAY))
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    session = _RealtimeSession(websocket, provider)
+    sender = asyncio.create_task(session.sender())
+    await session.send({
+        "type": "ready",
+        "provider": provider.name,
+        "voice_id": provider.voice_id,
+        "model_id": provider.model_id,
+        "encoding": provider.encoding,
+        "sample_rate": provider.sample_rate
+    })
+
+    handlers = {
+        "flush": session.on_flush,
+        "end": session.on_end,
+        "cancel": session.on_cancel,
+    }
+    try:
+        while True:
+            try:
+                message = await _receive_message(websocket, idle_timeout)
+            except ValueError as e:
+                await session.send(_error(str(e), status.HTTP_400_BAD_REQUEST))
+                continue
+
+            kind = message.get("type")
+            try:
+                if kind == "text":
+                    text = message.get("text")
+                    if not isinstance(text, str):
+                        await session.send(_error("text must be a string", status.HTTP_400_BAD_REQUEST))
+                        continue
+                    await session.on_text(text)
+                elif kind in handlers:
+                    await handlers[kind]()
+                else:
+                    await session.send(_error(f"Unknown message type '{kind}'", status.HTTP_400_BAD_REQUEST))
+            except Exception as e:
+                # Provider connection failed mid-turn; ignore the rest of the turn
+                logger.error(f"Realtime {kind} failed ({provider.name}): {str(e)}")
+                turn_no = session.turn_no
+                session.turn = None
+                session.rejected = kind != "end"
+                await session.send(_error(f"Realtime synthesis failed: {str(e)}", status.HTTP_502_BAD_GATEWAY, turn_no))
+    except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        logger.info("Closing idle realtime connection")
+        await _close_quietly(websocket, status.WS_1000_NORMAL_CLOSURE)
+    finally:
+        await session.close()
+        sender.cancel()
@@ -1,14 +1,148 @@
 """STT routes."""
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status, Request, Query
+from starlette.datastructures import UploadFile
+from app.api.deps import get_current_user_from_request, provider_busy_http_exception, get_queue_deadline
+from app.config import get_settings, ConfigurationError
+from app.schemas.stt import TranscriptionResponse, TranscriptionSegment, TranscriptionWord
+from app.services.rate_limiter import ProviderBusyError
+from app.services.stt_service import get_stt_engine, transcribe_recording
+from contextlib import AsyncExitStack
+from typing import Optional
+import logging
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/stt", tags=["stt"])
 
 
+def _transcription_http_exception(e: Exception) -> HTTPException:
+    """Map a transcription error to an HTTP error response."""
+    if isinstance(e, ProviderBusyError):
+        return provider_busy_http_exception(e)
+    if isinstance(e, (ConfigurationError, ValueError)):
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Failed to transcribe audio: {str(e)}"
+    )
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Audio must not exceed {get_settings().stt_max_upload_mb} MB"
+    )
+
+
 @router.get("/status")
 async def get_stt_status():
     """Get STT service status."""
+    settings = get_settings()
     return {
-        "status": "coming_soon",
-        "message": "Speech-to-Text feature is coming soon"
+        "status": "available",
+        "engine": settings.stt_engine,
+        "model_id": settings.stt_model_id if settings.stt_engine == "elevenlabs" else None,
+        "max_upload_mb": settings.stt_max_upload_mb,
+        "max_segment_seconds": settings.stt_max_segment_seconds
     }
 
+
+@router.post("/transcribe", response_model=TranscriptionResponse)
+async def transcribe(
+    request: Request,
+    language: Optional[str] = Query(None),
+    filename: Optional[str] = Query(None)
+):
+    """
+    Transcribe an audio recording.
+    
+    Send the audio as the request body (Content-Type: audio/wav, audio/mpeg,
+    ...) or as the file field of a multipart form. The body is streamed to
+    a temporary file, never held in memory as a whole.
+    
+    WAV recordings (PCM, float, mu-law or A-law) are split into speech
+    segments at pauses, which are transcribed concurrently; segments and
+    word times refer to the whole recording. Other formats are transcribed
+    in one request.
+    """
+    # Authenticate user using request-based dependency
+    await get_current_user_from_request(request)
+    
+    settings = get_settings()
+    max_bytes = settings.stt_max_upload_mb * 1024 * 1024
+    content_length = request.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise _upload_too_large()
+    deadline = get_queue_deadline(request)
+    try:
+        engine = get_stt_engine()
+    except ValueError as e:
+        raise _transcription_http_exception(e)
+    
+    content_type = request.headers.get("Content-Type", "")
+    started = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        if content_type.startswith("multipart/form-data"):
+            # Starlette spools uploaded files to disk
+            form = await request.form(max_files=1)
+            stack.push_async_callback(form.close)
+            upload = form.get("file")
+            if not isinstance(upload, UploadFile):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Multipart uploads must have a file field"
+                )
+            if upload.size is not None and upload.size > max_bytes:
+                raise _upload_too_large()
+            size = upload.size
+            file = upload.file
+            filename = upload.filename or filename
+            mime_type = upload.content_type
+        else:
+            file = stack.enter_context(tempfile.TemporaryFile())
+            size = 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _upload_too_large()
+                file.write(chunk)
+            mime_type = content_type.split(";")[0].strip()
+        if not size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Audio file is empty"
+            )
+        
+        try:
+            result = await transcribe_recording(
+                file,
+                filename or "audio",
+                mime_type or "application/octet-stream",
+                language,
+                engine,
+                deadline
+            )
+        except Exception as e:
+            raise _transcription_http_exception(e)
+    
+    return TranscriptionResponse(
+        text=result.text,
+        language=result.language,
+        duration=result.duration,
+        engine=engine.name,
+        segments=[
+            TranscriptionSegment(
+                start=segment.start,
+                end=segment.end,
+                text=segment.text,
+                words=[TranscriptionWord(**word._asdict()) for word in segment.words]
+            )
+            for segment in result.segments
+        ],
+        processing_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
@@ -0,0 +1,111 @@
+"""Provider-agnostic TTS routes."""
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.api.deps import (
+    get_current_user_from_request,
+    get_queue_deadline,
+    wants_binary_audio,
+    binary_audio_response,
+)
+from app.api.routes.tts import _generation_http_exception
+from app.schemas.tts import SynthesizeRequest, SynthesizeResponse
+from app.services.provider_registry import get_provider_registry, NoProviderError
+from app.services.tts_history_service import record_tts_request
+import base64
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/synthesize", tags=["synthesize"])
+
+
+@router.post(
+    "",
+    response_model=SynthesizeResponse,
+    responses={200: {"content": {"audio/mpeg": {}, "audio/wav": {}}}}
+)
+async def synthesize(
+    request_body: SynthesizeRequest,
+    request: Request,
+    binary: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Generate TTS audio with the fastest healthy provider.
+    
+    The provider is chosen per request from the configured providers that
+    support the language, by rolling latency and error rate; failures fail
+    over to the next provider. Voices and models are provider-specific, so
+    they are given per provider name (e.g. {"cartesia": "<voice id>"}) and
+    the provider default is used otherwise. Set provider to pin the request.
+    
+    With ?binary=true or Accept: audio/* the audio itself is returned;
+    the chosen provider is reported in the X-Provider header.
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    
+    # Validate text
+    if not request_body.text or len(request_body.text.strip()) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Text cannot be empty"
+        )
+    
+    try:
+        result = await get_provider_registry().synthesize(
+            text=request_body.text,
+            language=request_body.language,
+            voice_ids=request_body.voice_ids,
+            model_ids=request_body.model_ids,
+            provider=request_body.provider,
+            bypass_cache=request_body.bypass_cache,
+            deadline=get_queue_deadline(request)
+        )
+    except NoProviderError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise _generation_http_exception(e)
+    
+    voice_id = (request_body.voice_ids or {}).get(result.provider)
+    tts_request = await record_tts_request(
+        db,
+        user_id=user.id,
+        text=request_body.text,
+        voice_id=voice_id or f"{result.provider}-default",
+        audio_bytes=result.audio,
+        mime_type=result.mime_type
+    )
+    
+    if wants_binary_audio(request, binary):
+        return binary_audio_response(result.audio, result.mime_type, tts_request, {
+            "X-Provider": result.provider,
+            "X-Provider-Latency-Ms": f"{result.latency * 1000:.1f}",
+            "X-Hedged": "true" if result.hedged else "false",
+        })
+    
+    audio_base64 = base64.b64encode(result.audio).decode('utf-8')
+    return SynthesizeResponse(
+        request_id=tts_request.id,
+        provider=result.provider,
+        audio_url=f"data:{result.mime_type};base64,{audio_base64}",
+        mime_type=result.mime_type,
+        text=request_body.text,
+        voice_id=voice_id,
+        latency_ms=round(result.latency * 1000, 1),
+        hedged=result.hedged,
+        created_at=tts_request.created_at
+    )
+
+
+@router.get("/providers")
+async def get_providers(request: Request):
+    """Routing state of each provider (latency, error rate, health), best first."""
+    # Authenticate user using request-based dependency
+    await get_current_user_from_request(request)
+    
+    return {"providers": get_provider_registry().snapshot()}
@@ -1,32 +1,115 @@
 """TTS routes."""
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request, Query, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.schemas.tts import TTSGenerateRequest, TTSGenerateResponse, TTSHistoryResponse, TTSHistoryItem
-from app.api.deps import get_current_user, get_current_user_from_request
+from app.schemas.tts import (
+    TTSGenerateRequest,
+    TTSGenerateResponse,
+    TTSHistoryResponse,
+    TTSHistoryItem,
+    TTSBatchRequest,
+    TTSBatchItemResult,
+    TTSBatchResponse,
+    TTSJobResponse,
+)
+from app.api.deps import (
+    get_current_user,
+    get_current_user_from_request,
+    get_queue_deadline,
+    provider_busy_http_exception,
+    wants_binary_audio,
+    binary_audio_response,
+)
 from app.models.user import User
 from app.models.tts_request import TTSRequest
-from app.services.elevenlabs_service import generate_tts_audio, get_available_voices
-from app.config import ConfigurationError
+from app.services.elevenlabs_service import (
+    generate_tts_audio_async,
+    stream_tts_audio_async,
+    voice_catalog,
+)
+from app.services.catalog_cache import etag_matches, catalog_headers
+from app.services.tts_history_service import (
+    record_tts_request,
+    stream_and_record,
+    list_tts_history,
+    count_tts_history,
+)
+from app.services.audio_store import get_audio_store, AudioNotFoundError
+from app.services.batch_service import BatchOutcome, run_tts_batch
+from app.api.routes.jobs import queue_job_response
+from app.services.rate_limiter import ProviderBusyError
+from app.config import ConfigurationError, get_settings
 import io
 import logging
-from typing import Optional
+from typing import Callable, List, Optional, Literal
+from uuid import UUID
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tts", tags=["tts"])
 
 
-@router.post("/generate", response_model=TTSGenerateResponse)
+def _generation_http_exception(e: Exception) -> HTTPException:
+    """Map an ElevenLabs generation error to an HTTP error response."""
+    if isinstance(e, ProviderBusyError):
+        return provider_busy_http_exception(e)
+    
+    if isinstance(e, ConfigurationError):
+        # Handle configuration/API key errors with clear messages
+        error_detail = str(e)
+        # Check if it's a service unavailable or unusual activity error
+        if "temporarily unavailable" in error_detail.lower() or "unusual activity" in error_detail.lower():
+            return HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=error_detail
+            )
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_detail
+        )
+    
+    error_msg = str(e)
+    # Check for 401/unauthorized errors from ElevenLabs
+    if "401" in error_msg or "unauthorized" in error_msg.lower():
+        # If the error already contains a user-friendly message, use it
+        if "temporarily unavailable" in error_msg.lower():
+            return HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=error_msg
+            )
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ElevenLabs service temporarily unavailable. Please try again in a moment or contact support.\n\n"
+                   "If this persists, the service may be temporarily unavailable or your API key may need verification."
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Failed to generate audio: {error_msg}"
+    )
+
+
+@router.post(
+    "/generate",
+    response_model=TTSGenerateResponse,
+    responses={200: {"content": {"audio/mpeg": {}}}}
+)
 async def generate_tts(
     request_body: TTSGenerateRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    binary: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Generate TTS audio from text."""
+    """
+    Generate TTS audio from text.
+    
+    Returns JSON with the audio as a base64 data URL by default. With
+    ?binary=true or Accept: audio/* the MP3 itself is returned, with the
+    request id and duration in X-TTS-Request-Id / X-Audio-Duration headers.
+    """
     # Authenticate user using request-based dependency
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request(request, db)
     
     # Validate text
     if not request_body.text or len(request_body.text.strip()) == 0:
@@ -37,7 +120,7 @@ async def generate_tts(
     
     try:
         # Generate audio using ElevenLabs (with retry logic and voice settings)
-        audio_bytes = generate_tts_audio(
+        audio_bytes = await generate_tts_audio_async(
             text=request_body.text,
             voice_id=request_body.voice_id,
             max_retries=3,
@@ -46,29 +129,29 @@ async def generate_tts(
             style=request_body.style,
             use_speaker_boost=request_body.use_speaker_boost,
             model_id=request_body.model_id,
-            language=request_body.language
+            language=request_body.language,
+            bypass_cache=request_body.bypass_cache,
+            deadline=get_queue_deadline(request)
         )
         
-        # Store request in database
-        tts_request = TTSRequest(
+        # Store request in database (audio goes to the audio store)
+        tts_request = await record_tts_request(
+            db,
             user_id=user.id,
             text=request_body.text,
             voice_id=request_body.voice_id,
-            audio_url=None  # For POC, we return audio directly
+            audio_bytes=audio_bytes,
+            mime_type="audio/mpeg"
         )
-        db.add(tts_request)
-        db.commit()
-        db.refresh(tts_request)
+        
+        if wants_binary_audio(request, binary):
+            return binary_audio_response(audio_bytes, "audio/mpeg", tts_request)
         
         # Convert audio to base64 for response
         import base64
         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
         audio_url = f"data:audio/mpeg;base64,{audio_base64}"
         
-        # Update request with audio URL
-        tts_request.audio_url = audio_url
-        db.commit()
-        
         return TTSGenerateResponse(
             request_id=tts_request.id,
             audio_url=audio_url,
@@ -76,80 +159,297 @@ async def generate_tts(
             voice_id=request_body.voice_id,
             created_at=tts_request.created_at
         )
-    except ConfigurationError as e:
-        # Handle configuration/API key errors with clear messages
-        error_detail = str(e)
-        # Check if it's a service unavailable or unusual activity error
-        if "temporarily unavailable" in error_detail.lower() or "unusual activity" in error_detail.lower():
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=error_detail
-            )
+    except Exception as e:
+        raise _generation_http_exception(e)
+
+
+@router.post("/stream")
+async def stream_tts(
+    request_body: TTSGenerateRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream TTS audio (MP3) as ElevenLabs produces it.
+    
+    Provider errors that occur before any audio is available are returned
+    as regular HTTP errors. The request is added to history once the
+    stream has been fully sent.
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    
+    # Validate text
+    if not request_body.text or len(request_body.text.strip()) == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=error_detail
+            detail="Text cannot be empty"
         )
+    
+    chunks = stream_tts_audio_async(
+        text=request_body.text,
+        voice_id=request_body.voice_id,
+        max_retries=3,
+        stability=request_body.stability,
+        similarity_boost=request_body.similarity_boost,
+        style=request_body.style,
+        use_speaker_boost=request_body.use_speaker_boost,
+        model_id=request_body.model_id,
+        language=request_body.language,
+        bypass_cache=request_body.bypass_cache,
+        deadline=get_queue_deadline(request)
+    )
+    
+    # Pull the first chunk here so provider errors map to proper status codes
+    try:
+        first_chunk = await anext(chunks)
+    except StopAsyncIteration:
+        first_chunk = b""
     except Exception as e:
-        error_msg = str(e)
-        # Check for 401/unauthorized errors from ElevenLabs
-        if "401" in error_msg or "unauthorized" in error_msg.lower():
-            # If the error already contains a user-friendly message, use it
-            if "temporarily unavailable" in error_msg.lower():
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=error_msg
-                )
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="ElevenLabs service temporarily unavailable. Please try again in a moment or contact support.\n\n"
-                       "If this persists, the service may be temporarily unavailable or your API key may need verification."
-            )
+        await chunks.aclose()
+        raise _generation_http_exception(e)
+    
+    return StreamingResponse(
+        stream_and_record(
+            first_chunk,
+            chunks,
+            user_id=user.id,
+            text=request_body.text,
+            voice_id=request_body.voice_id,
+            mime_type="audio/mpeg"
+        ),
+        media_type="audio/mpeg"
+    )
+
+
+def _validate_batch_size(count: int) -> None:
+    """Reject empty or oversized batches."""
+    max_items = get_settings().batch_max_items
+    if count == 0 or count > max_items:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate audio: {error_msg}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch must contain between 1 and {max_items} items"
         )
 
 
+def _validate_batch_text(text: str) -> None:
+    """Reject an empty batch item (reported as that item's error)."""
+    if not text or len(text.strip()) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Text cannot be empty"
+        )
+
+
+def _batch_response(
+    outcomes: List[BatchOutcome],
+    error_to_http: Callable[[Exception], HTTPException]
+) -> TTSBatchResponse:
+    """Build the per-item batch response."""
+    results = []
+    for outcome in outcomes:
+        if outcome.error is not None:
+            http_error = outcome.error if isinstance(outcome.error, HTTPException) else error_to_http(outcome.error)
+            results.append(TTSBatchItemResult(
+                index=outcome.index,
+                status_code=http_error.status_code,
+                error=http_error.detail
+            ))
+        else:
+            tts_request = outcome.tts_request
+            results.append(TTSBatchItemResult(
+                index=outcome.index,
+                status_code=status.HTTP_200_OK,
+                request_id=tts_request.id,
+                audio_url=tts_request.audio_url,
+                audio_size=tts_request.audio_size,
+                audio_duration=tts_request.audio_duration,
+                created_at=tts_request.created_at
+            ))
+    failed = sum(1 for outcome in outcomes if outcome.error is not None)
+    return TTSBatchResponse(
+        results=results,
+        succeeded=len(outcomes) - failed,
+        failed=failed
+    )
+
+
+@router.post("/batch", response_model=TTSBatchResponse)
+async def generate_tts_batch(
+    request_body: TTSBatchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Generate TTS audio for many texts in one request.
+    
+    Items are generated concurrently (BATCH_CONCURRENCY at a time, within
+    the ElevenLabs rate limit; items wait for their slot rather than being
+    rejected) and stored with a single insert. Each result carries its own
+    status code; audio is downloaded from the returned audio_url.
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    _validate_batch_size(len(request_body.items))
+    
+    async def synthesize(item: TTSGenerateRequest) -> bytes:
+        _validate_batch_text(item.text)
+        return await generate_tts_audio_async(
+            text=item.text,
+            voice_id=item.voice_id,
+            max_retries=3,
+            stability=item.stability,
+            similarity_boost=item.similarity_boost,
+            style=item.style,
+            use_speaker_boost=item.use_speaker_boost,
+            model_id=item.model_id,
+            language=item.language,
+            bypass_cache=item.bypass_cache
+        )
+    
+    outcomes = await run_tts_batch(
+        db,
+        user_id=user.id,
+        items=request_body.items,
+        synthesize=synthesize,
+        concurrency=get_settings().batch_concurrency,
+        mime_type_of=lambda item: "audio/mpeg",
+        voice_id_of=lambda item: item.voice_id
+    )
+    return _batch_response(outcomes, _generation_http_exception)
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED, response_model=TTSJobResponse)
+async def queue_tts_job(
+    request_body: TTSGenerateRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue a TTS generation to run in the background.
+    
+    Returns 202 with the job id right away; poll (or long-poll with
+    ?wait=) the status_url until the job succeeded or failed. Failed
+    attempts are retried with backoff, and the result is added to history
+    even if the client has gone away.
+    """
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    
+    # Validate text
+    if not request_body.text or len(request_body.text.strip()) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Text cannot be empty"
+        )
+    
+    return await queue_job_response(
+        db,
+        user_id=user.id,
+        provider="elevenlabs",
+        payload=request_body.model_dump(mode="json")
+    )
+
+
 @router.get("/history", response_model=TTSHistoryResponse)
 async def get_tts_history(
     request: Request,
-    db: Session = Depends(get_db),
-    limit: int = 10,
-    offset: int = 0
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    total: Literal["none", "estimate", "exact"] = "none"
 ):
-    """Get user's TTS generation history."""
+    """
+    Get user's TTS generation history, newest first.
+    
+    Pass the returned next_cursor to fetch the following page. Items carry
+    audio metadata only; the audio itself is served by
+    /api/tts/history/{request_id}/audio. The total is omitted by default;
+    request it with total=estimate (planner estimate) or total=exact (full
+    count, cost grows with history size).
+    """
     # Authenticate user using request-based dependency
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request(request, db)
     
-    # Get user's TTS requests
-    requests = db.query(TTSRequest).filter(
-        TTSRequest.user_id == user.id
-    ).order_by(
-        TTSRequest.created_at.desc()
-    ).offset(offset).limit(limit).all()
+    try:
+        requests, next_cursor = await list_tts_history(
+            db, user.id, limit=limit, cursor=cursor, offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    total = db.query(TTSRequest).filter(
-        TTSRequest.user_id == user.id
-    ).count()
+    total_count = None
+    if total != "none":
+        total_count = await count_tts_history(db, user.id, exact=total == "exact")
     
     return TTSHistoryResponse(
         requests=[TTSHistoryItem.model_validate(req) for req in requests],
-        total=total
+        next_cursor=next_cursor,
+        total=total_count,
+        total_is_estimate=total == "estimate"
+    )
+
+
+@router.get("/history/{request_id}/audio")
+async def get_tts_history_audio(
+    request_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Download the audio of a TTS request from the user's history."""
+    # Authenticate user using request-based dependency
+    user = await get_current_user_from_request(request, db)
+    
+    result = await db.execute(
+        select(TTSRequest).where(
+            TTSRequest.id == request_id,
+            TTSRequest.user_id == user.id
+        )
+    )
+    tts_request = result.scalars().first()
+    if not tts_request or not tts_request.audio_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Audio not found"
+        )
+    
+    try:
+        chunks = get_audio_store().iter_chunks(tts_request.audio_key)
+    except AudioNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Audio not found"
+        )
+    
+    headers = {"Cache-Control": "private, max-age=31536000, immutable"}
+    if tts_request.audio_size is not None:
+        headers["Content-Length"] = str(tts_request.audio_size)
+    return StreamingResponse(
+        chunks,
+        media_type=tts_request.audio_mime_type or "application/octet-stream",
+        headers=headers
     )
 
 
 @router.get("/voices")
 async def get_voices(
     request: Request,
-    db: Session = Depends(get_db)
+    response: Response
 ):
-    """Get list of available ElevenLabs voices."""
+    """
+    Get list of available ElevenLabs voices.
+    
+    Served from the voice catalog cache; supports If-None-Match revalidation.
+    """
     # Authenticate user using request-based dependency
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request(request)
     
     try:
-        voices = get_available_voices()
-        return {"voices": voices}
+        catalog = await voice_catalog.get()
     except ConfigurationError as e:
         # Handle configuration/API key errors with clear messages
         raise HTTPException(
@@ -161,4 +461,8 @@ async def get_voices(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch voices: {str(e)}"
         )
-
+    
+    if etag_matches(request.headers.get("If-None-Match"), catalog.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=catalog_headers(catalog))
+    response.headers.update(catalog_headers(catalog))
+    return {"voices": catalog.value}
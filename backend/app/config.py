@@ -59,6 +59,25 @@ def get_env_or_error(key: str, default: Optional[str] = None, required: bool = F
     return value or ""
 
 
+def available_cpus() -> int:
+    """Number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def deployment_processes(settings: "Settings") -> int:
+    """
+    Processes that share the provider rate limits and the database budget.
+    
+    The WEB_CONCURRENCY server processes plus the JOB_WORKER_PROCESSES
+    standalone job workers (python -m app.worker). A job worker running
+    inside a server process uses that process's limiters and pool, so it
+    is not counted separately.
+    """
+    return max(1, settings.web_concurrency) + max(0, settings.job_worker_processes)
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
@@ -69,12 +88,103 @@ class Settings(BaseSettings):
     postgres_db: str = ""
     postgres_host: str = ""
     db_port: int = 5432
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 3600
+    db_startup_timeout_seconds: float = 60
+    db_max_connections: int = 100
+    db_reserved_connections: int = 10
+    
+    # Server processes (app/serve.py)
+    web_concurrency: int = 1
+    shutdown_grace_seconds: float = 30
     
     # ElevenLabs
     elevenlabs_api_key: str = ""
+    elevenlabs_base_url: str = ""
     
     # Cartesia AI
     cartesia_api_key: str = ""
+    cartesia_base_url: str = ""
+    
+    # Background health checks (served from memory by /health, /health/live, /health/ready)
+    health_db_interval_seconds: float = 5
+    health_provider_interval_seconds: float = 60
+    health_probe_timeout_seconds: float = 5
+    
+    # Provider calls (threads used to run blocking SDK calls off the event loop)
+    provider_max_workers: int = 16
+    
+    # Synthesis cache (repeated TTS requests are served without a provider call)
+    synthesis_cache_enabled: bool = True
+    synthesis_cache_memory_max_bytes: int = 64 * 1024 * 1024
+    synthesis_cache_dir: str = ""
+    synthesis_cache_disk_max_bytes: int = 1024 * 1024 * 1024
+    
+    # Authenticated principal cache (skips the users lookup per request)
+    principal_cache_ttl_seconds: int = 300
+    principal_cache_max_entries: int = 10000
+    
+    # Voice catalog cache
+    voice_catalog_ttl_seconds: int = 300
+    voice_catalog_stale_seconds: int = 3600
+    
+    # Audio blob storage (generated audio is kept out of the database)
+    audio_store_backend: str = "local"
+    audio_store_dir: str = ""
+    
+    # Outbound provider rate limits (0 requests/minute disables the limiter)
+    elevenlabs_requests_per_minute: float = 60
+    elevenlabs_burst: int = 5
+    cartesia_requests_per_minute: float = 120
+    cartesia_burst: int = 10
+    provider_queue_max_depth: int = 100
+    provider_queue_max_wait_seconds: float = 30
+    
+    # Long-text synthesis (texts over the budget are split and synthesized in parallel)
+    elevenlabs_chunk_chars: int = 1000
+    cartesia_chunk_chars: int = 500
+    long_text_parallelism: int = 4
+    
+    # Batch generation endpoints
+    batch_max_items: int = 100
+    batch_concurrency: int = 8
+    
+    # Background job queue (asynchronous generation)
+    job_worker_enabled: bool = True
+    job_worker_processes: int = 0
+    job_worker_concurrency: int = 4
+    job_poll_interval_seconds: float = 1.0
+    job_visibility_timeout_seconds: float = 120
+    job_max_attempts: int = 5
+    job_retry_base_seconds: float = 5
+    job_retry_max_seconds: float = 300
+    job_long_poll_max_seconds: float = 30
+    
+    # Realtime (WebSocket) TTS
+    realtime_send_queue_frames: int = 32
+    realtime_idle_timeout_seconds: float = 300
+    realtime_fake_provider_enabled: bool = False
+    
+    # Speech-to-text
+    stt_engine: str = "elevenlabs"
+    stt_model_id: str = "scribe_v1"
+    stt_max_upload_mb: int = 500
+    stt_max_segment_seconds: float = 30
+    stt_concurrency: int = 8
+    
+    # Audio post-processing (Cartesia PCM output)
+    audio_postprocess_enabled: bool = False
+    audio_silence_threshold_dbfs: float = -50
+    audio_normalize_loudness: bool = True
+    audio_target_loudness_dbfs: float = -20
+    audio_process_workers: int = 2
+    
+    # Provider routing for /api/synthesize
+    routing_hedge_enabled: bool = False
+    routing_failure_threshold: int = 3
+    routing_cooldown_seconds: int = 30
     
     # FastAPI
     secret_key: str = ""
@@ -93,6 +203,18 @@ class Settings(BaseSettings):
         self.postgres_db = get_env_or_error("POSTGRES_DB", "voicelab_pro")
         self.postgres_host = get_env_or_error("POSTGRES_HOST", "localhost")
         self.db_port = int(get_env_or_error("DB_PORT", "5432"))
+        self.db_pool_size = int(get_env_or_error("DB_POOL_SIZE", "10"))
+        self.db_max_overflow = int(get_env_or_error("DB_MAX_OVERFLOW", "20"))
+        self.db_pool_timeout = int(get_env_or_error("DB_POOL_TIMEOUT", "30"))
+        self.db_pool_recycle = int(get_env_or_error("DB_POOL_RECYCLE", "3600"))
+        self.db_startup_timeout_seconds = float(get_env_or_error("DB_STARTUP_TIMEOUT_SECONDS", "60"))
+        # Connection budget shared by all server and job worker processes (see app.database.pool_limits)
+        self.db_max_connections = int(get_env_or_error("DB_MAX_CONNECTIONS", "100"))
+        self.db_reserved_connections = int(get_env_or_error("DB_RESERVED_CONNECTIONS", "10"))
+        
+        # Server processes: app/serve.py sets WEB_CONCURRENCY for its workers (0 = one per CPU)
+        self.web_concurrency = int(get_env_or_error("WEB_CONCURRENCY", "1")) or available_cpus()
+        self.shutdown_grace_seconds = float(get_env_or_error("SHUTDOWN_GRACE_SECONDS", "30"))
         
         # Build DATABASE_URL if not provided, or fix hostname if needed
         database_url_from_env = os.getenv("DATABASE_URL", "")
@@ -123,10 +245,96 @@ class Settings(BaseSettings):
         # Check environment variable directly since env_file should have loaded it
         elevenlabs_key = os.getenv("ELEVENLABS_API_KEY", "").strip()
         self.elevenlabs_api_key = elevenlabs_key
+        # API address override (empty for the public API), e.g. a local stand-in for load tests
+        self.elevenlabs_base_url = get_env_or_error("ELEVENLABS_BASE_URL", "").rstrip("/")
         
         # Cartesia AI - get from environment
         cartesia_key = os.getenv("CARTESIA_API_KEY", "").strip()
         self.cartesia_api_key = cartesia_key
+        self.cartesia_base_url = get_env_or_error("CARTESIA_BASE_URL", "").rstrip("/")
+        
+        # Background health checks
+        self.health_db_interval_seconds = float(get_env_or_error("HEALTH_DB_INTERVAL_SECONDS", "5"))
+        self.health_provider_interval_seconds = float(get_env_or_error("HEALTH_PROVIDER_INTERVAL_SECONDS", "60"))
+        self.health_probe_timeout_seconds = float(get_env_or_error("HEALTH_PROBE_TIMEOUT_SECONDS", "5"))
+        
+        # Provider calls
+        self.provider_max_workers = int(get_env_or_error("PROVIDER_MAX_WORKERS", "16"))
+        
+        # Synthesis cache
+        self.synthesis_cache_enabled = get_env_or_error("SYNTHESIS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.synthesis_cache_memory_max_bytes = int(get_env_or_error("SYNTHESIS_CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.synthesis_cache_dir = get_env_or_error("SYNTHESIS_CACHE_DIR", "")
+        self.synthesis_cache_disk_max_bytes = int(get_env_or_error("SYNTHESIS_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+        
+        # Authenticated principal cache
+        self.principal_cache_ttl_seconds = int(get_env_or_error("PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+        self.principal_cache_max_entries = int(get_env_or_error("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+        
+        # Voice catalog cache
+        self.voice_catalog_ttl_seconds = int(get_env_or_error("VOICE_CATALOG_TTL_SECONDS", "300"))
+        self.voice_catalog_stale_seconds = int(get_env_or_error("VOICE_CATALOG_STALE_SECONDS", "3600"))
+        
+        # Audio blob storage
+        self.audio_store_backend = get_env_or_error("AUDIO_STORE_BACKEND", "local")
+        self.audio_store_dir = get_env_or_error(
+            "AUDIO_STORE_DIR",
+            str(Path(__file__).parent.parent / "data" / "audio")
+        )
+        
+        # Outbound provider rate limits
+        self.elevenlabs_requests_per_minute = float(get_env_or_error("ELEVENLABS_REQUESTS_PER_MINUTE", "60"))
+        self.elevenlabs_burst = int(get_env_or_error("ELEVENLABS_BURST", "5"))
+        self.cartesia_requests_per_minute = float(get_env_or_error("CARTESIA_REQUESTS_PER_MINUTE", "120"))
+        self.cartesia_burst = int(get_env_or_error("CARTESIA_BURST", "10"))
+        self.provider_queue_max_depth = int(get_env_or_error("PROVIDER_QUEUE_MAX_DEPTH", "100"))
+        self.provider_queue_max_wait_seconds = float(get_env_or_error("PROVIDER_QUEUE_MAX_WAIT_SECONDS", "30"))
+        
+        # Long-text synthesis
+        self.elevenlabs_chunk_chars = int(get_env_or_error("ELEVENLABS_CHUNK_CHARS", "1000"))
+        self.cartesia_chunk_chars = int(get_env_or_error("CARTESIA_CHUNK_CHARS", "500"))
+        self.long_text_parallelism = int(get_env_or_error("LONG_TEXT_PARALLELISM", "4"))
+        
+        # Batch generation
+        self.batch_max_items = int(get_env_or_error("BATCH_MAX_ITEMS", "100"))
+        self.batch_concurrency = int(get_env_or_error("BATCH_CONCURRENCY", "8"))
+        
+        # Background job queue
+        # Standalone workers (python -m app.worker); when there are any, API processes leave jobs to them by default
+        self.job_worker_processes = int(get_env_or_error("JOB_WORKER_PROCESSES", "0"))
+        job_worker_default = "false" if self.job_worker_processes > 0 else "true"
+        self.job_worker_enabled = get_env_or_error("JOB_WORKER_ENABLED", job_worker_default).lower() in ("1", "true", "yes")
+        self.job_worker_concurrency = int(get_env_or_error("JOB_WORKER_CONCURRENCY", "4"))
+        self.job_poll_interval_seconds = float(get_env_or_error("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+        self.job_visibility_timeout_seconds = float(get_env_or_error("JOB_VISIBILITY_TIMEOUT_SECONDS", "120"))
+        self.job_max_attempts = int(get_env_or_error("JOB_MAX_ATTEMPTS", "5"))
+        self.job_retry_base_seconds = float(get_env_or_error("JOB_RETRY_BASE_SECONDS", "5"))
+        self.job_retry_max_seconds = float(get_env_or_error("JOB_RETRY_MAX_SECONDS", "300"))
+        self.job_long_poll_max_seconds = float(get_env_or_error("JOB_LONG_POLL_MAX_SECONDS", "30"))
+        
+        # Realtime TTS
+        self.realtime_send_queue_frames = int(get_env_or_error("REALTIME_SEND_QUEUE_FRAMES", "32"))
+        self.realtime_idle_timeout_seconds = float(get_env_or_error("REALTIME_IDLE_TIMEOUT_SECONDS", "300"))
+        self.realtime_fake_provider_enabled = get_env_or_error("REALTIME_FAKE_PROVIDER_ENABLED", "false").lower() in ("1", "true", "yes")
+        
+        # Speech-to-text
+        self.stt_engine = get_env_or_error("STT_ENGINE", "elevenlabs")
+        self.stt_model_id = get_env_or_error("STT_MODEL_ID", "scribe_v1")
+        self.stt_max_upload_mb = int(get_env_or_error("STT_MAX_UPLOAD_MB", "500"))
+        self.stt_max_segment_seconds = float(get_env_or_error("STT_MAX_SEGMENT_SECONDS", "30"))
+        self.stt_concurrency = int(get_env_or_error("STT_CONCURRENCY", "8"))
+        
+        # Audio post-processing
+        self.audio_postprocess_enabled = get_env_or_error("AUDIO_POSTPROCESS_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.audio_silence_threshold_dbfs = float(get_env_or_error("AUDIO_SILENCE_THRESHOLD_DBFS", "-50"))
+        self.audio_normalize_loudness = get_env_or_error("AUDIO_NORMALIZE_LOUDNESS", "true").lower() in ("1", "true", "yes")
+        self.audio_target_loudness_dbfs = float(get_env_or_error("AUDIO_TARGET_LOUDNESS_DBFS", "-20"))
+        self.audio_process_workers = int(get_env_or_error("AUDIO_PROCESS_WORKERS", "2"))
+        
+        # Provider routing
+        self.routing_hedge_enabled = get_env_or_error("ROUTING_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.routing_failure_threshold = int(get_env_or_error("ROUTING_FAILURE_THRESHOLD", "3"))
+        self.routing_cooldown_seconds = int(get_env_or_error("ROUTING_COOLDOWN_SECONDS", "30"))
         
         # Only warn if truly missing (use logging instead of warnings for cleaner output)
         if not self.elevenlabs_api_key:
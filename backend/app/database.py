@@ -1,102 +1,219 @@
 """Database configuration and session management."""
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError, DisconnectionError
-from app.config import get_settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import deployment_processes, get_settings
+from app.services.metrics import db_pool_checkout_wait, db_pool_connection_held
+from typing import AsyncIterator, Tuple
+import asyncio
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Database engine will be initialized after settings are loaded
+# Database engines will be initialized after settings are loaded.
+# Request handlers use the async engine; the sync engine is kept for
+# scripts. Engines connect lazily, so the app can be imported without a
+# database; startup waits for it with wait_for_database().
 engine = None
+async_engine = None
+
+
+class _TimedPool:
+    """Pool mixin recording checkout wait and hold times (see app.services.metrics)."""
+    
+    metrics_label = ""
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, self.metrics_label)
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    metrics_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def _track_hold_time(engine, label: str) -> None:
+    """Record how long connections of engine's pool stay checked out."""
+    
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+    
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            db_pool_connection_held.observe(time.perf_counter() - checked_out_at, label)
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Convert a postgresql:// URL to use the asyncpg driver."""
+    scheme, separator, rest = database_url.partition("://")
+    if scheme in ("postgres", "postgresql") or scheme.startswith("postgresql+"):
+        return f"postgresql+asyncpg{separator}{rest}"
+    return database_url
+
+
+def pool_limits(settings) -> Tuple[int, int]:
+    """
+    Pool size and overflow for this process's engines.
+    
+    The WEB_CONCURRENCY server processes and JOB_WORKER_PROCESSES
+    standalone job workers share DB_MAX_CONNECTIONS minus
+    DB_RESERVED_CONNECTIONS (left for migrations and admin sessions). When the configured DB_POOL_SIZE + DB_MAX_OVERFLOW
+    would exceed a process's share, both are scaled down in proportion.
+    Only the async engine connects in these processes, so one pool is
+    counted per process.
+    
+    Returns:
+        (pool_size, max_overflow)
+    """
+    pool_size, max_overflow = settings.db_pool_size, settings.db_max_overflow
+    share = (settings.db_max_connections - settings.db_reserved_connections) // deployment_processes(settings)
+    if pool_size + max_overflow <= share:
+        return pool_size, max_overflow
+    scaled_pool_size = max(1, share * pool_size // max(1, pool_size + max_overflow))
+    return scaled_pool_size, max(0, share - scaled_pool_size)
 
 
 def init_database():
-    """Initialize database engine with settings."""
-    global engine, SessionLocal
+    """Initialize database engines with settings."""
+    global engine, async_engine, SessionLocal, AsyncSessionLocal
     settings = get_settings()
+    pool_size, max_overflow = pool_limits(settings)
     
     # Create database engine with connection retry logic
     engine = create_engine(
         settings.database_url,
+        poolclass=TimedQueuePool,
         pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
-        pool_recycle=3600,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
         connect_args={
             "connect_timeout": 10,
             "options": "-c statement_timeout=30000"
         }
     )
     
-    # Create session factory
+    # Create async database engine (asyncpg) used by request handlers
+    async_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        poolclass=TimedAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        connect_args={
+            "timeout": 10,
+            "server_settings": {"statement_timeout": "30000"}
+        }
+    )
+    
+    _track_hold_time(engine, TimedQueuePool.metrics_label)
+    _track_hold_time(async_engine.sync_engine, TimedAsyncQueuePool.metrics_label)
+    
+    # Create session factories
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 
+async def dispose_database():
+    """Close all pooled connections (used on application shutdown)."""
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
 
-def retry_db_connection(max_retries=5, delay=2):
+
+async def wait_for_database(timeout: float, delay: float = 0.5, max_delay: float = 5.0) -> None:
     """
-    Retry database connection with exponential backoff.
+    Wait until the database accepts connections, without blocking the event loop.
+    
+    Retries with exponential backoff (delay doubling up to max_delay) for
+    at most timeout seconds in total, so a slow database delays startup by
+    a bounded amount instead of hanging it.
     
     Args:
-        max_retries: Maximum number of retry attempts
-        delay: Initial delay in seconds
+        timeout: Maximum seconds to wait
+        delay: Initial delay between attempts in seconds
+        max_delay: Longest delay between attempts in seconds
     
-    Returns:
-        True if connection successful, False otherwise
+    Raises:
+        RuntimeError: If init_database() was not called
+        Exception: The last connection error, if the database is still
+            unreachable after timeout seconds
     """
-    if engine is None:
+    if async_engine is None:
         raise RuntimeError("Database engine not initialized. Call init_database() first.")
     
-    for attempt in range(max_retries):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempt = 0
+    while True:
+        attempt += 1
         try:
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            async with asyncio.timeout(max(0.1, deadline - loop.time())):
+                async with async_engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
             logger.info("Database connection successful")
-            return True
-        except (OperationalError, DisconnectionError) as e:
-            if attempt < max_retries - 1:
-                wait_time = delay * (2 ** attempt)
-                logger.warning(
-                    f"Database connection failed (attempt {attempt + 1}/{max_retries}). "
-                    f"Retrying in {wait_time} seconds... Error: {str(e)}"
-                )
-                time.sleep(wait_time)
-            else:
-                logger.error(
-                    f"Database connection failed after {max_retries} attempts. "
-                    f"Error: {str(e)}"
-                )
+            return
+        except (OperationalError, DisconnectionError, OSError) as e:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.error(f"Database connection failed after {attempt} attempts ({timeout:g}s). Error: {e}")
                 raise
-    return False
+            wait_time = min(max_delay, delay * (2 ** (attempt - 1)), remaining)
+            logger.warning(
+                f"Database connection failed (attempt {attempt}). "
+                f"Retrying in {wait_time:.1f} seconds... Error: {e}"
+            )
+            await asyncio.sleep(wait_time)
 
 
-# Session factory will be initialized by init_database()
+# Session factories will be initialized by init_database()
 SessionLocal = None
+AsyncSessionLocal = None
 
 # Base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency for getting database session with retry logic."""
-    if SessionLocal is None:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency for getting an async database session.
+    
+    The session is rolled back if the request fails and is always closed
+    (returning its connection to the pool). pool_pre_ping already replaces
+    dead connections at checkout, so there is no retry here.
+    """
+    if AsyncSessionLocal is None:
         raise RuntimeError("Database not initialized. Please ensure init_database() was called.")
     
-    db = SessionLocal()
-    try:
-        yield db
-    except (OperationalError, DisconnectionError) as e:
-        logger.error(f"Database session error: {e}")
-        db.rollback()
-        # Retry once
+    async with AsyncSessionLocal() as db:
         try:
-            db = SessionLocal()
             yield db
-        except Exception as retry_error:
-            logger.error(f"Database retry failed: {retry_error}")
+        except (OperationalError, DisconnectionError) as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+        except Exception:
+            await db.rollback()
             raise
-    finally:
-        db.close()
-
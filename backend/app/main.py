@@ -7,12 +7,17 @@ warnings.filterwarnings('ignore', category=SyntaxWarning, module='pydub')
 warnings.filterwarnings('ignore', message='.*invalid escape sequence.*', category=SyntaxWarning)
 warnings.filterwarnings('ignore', message='.*Couldn\'t find ffmpeg.*', category=RuntimeWarning)
 
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import get_settings, ConfigurationError
-from app.database import engine, Base, retry_db_connection
-from app.api.routes import auth, tts, stt, cartesia
+from app.database import init_database, wait_for_database, dispose_database
+from app.api.routes import auth, tts, stt, cartesia, synthesize, jobs, realtime
+from app.services.metrics import MetricsMiddleware, render_metrics
+from app.services.health import health_prober
+from app.utils.concurrency import run_in_provider_executor, shutdown_process_executor, shutdown_provider_executor
 
 # Configure logging
 logging.basicConfig(
@@ -27,27 +32,78 @@ except ConfigurationError as e:
     logger.error(f"Configuration error: {e}")
     raise
 
-# Initialize database
-from app.database import init_database, retry_db_connection
-try:
-    logger.info("Initializing database connection...")
-    init_database()
-    logger.info("Verifying database connection...")
-    retry_db_connection()
-    # Create database tables
-    from app.database import engine
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created/verified successfully")
-except Exception as e:
-    logger.error(f"Database initialization failed: {e}")
-    logger.error("Please check your database configuration in .env file")
-    raise
+# In-process job worker (started on startup when JOB_WORKER_ENABLED)
+job_worker = None
+# Background import of the provider SDKs (see load_provider_clients)
+provider_warmup = None
+
+
+def load_provider_clients() -> None:
+    """Create the provider clients, importing their SDKs (runs in the provider thread pool)."""
+    from app.services.elevenlabs_service import get_elevenlabs_client
+    from app.services.cartesia_service import get_cartesia_client
+    
+    try:
+        get_elevenlabs_client()
+        get_cartesia_client()
+    except Exception as e:
+        logger.warning(f"Provider client warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Connect to the database and start the health prober and job worker;
+    stop them on shutdown.
+    
+    Importing the app does no I/O: engines are created here, and startup
+    waits at most DB_STARTUP_TIMEOUT_SECONDS for the database without
+    blocking the event loop. The schema is not created at startup; apply
+    migrations first (alembic upgrade head). The provider SDKs are
+    imported in the background once the app is serving.
+    """
+    global job_worker, provider_warmup
+    try:
+        logger.info("Initializing database connection...")
+        init_database()
+        await wait_for_database(settings.db_startup_timeout_seconds)
+    except Exception as e:
+        logger.error(f"Database initialization failed: {e}")
+        logger.error("Please check your database configuration in .env file")
+        raise
+    
+    await health_prober.start()
+    
+    if settings.job_worker_enabled:
+        from app.services.job_queue import create_job_worker
+        job_worker = create_job_worker()
+        job_worker.start()
+    provider_warmup = asyncio.create_task(run_in_provider_executor(load_provider_clients))
+    
+    try:
+        yield
+    finally:
+        # Stop the provider warm-up, job worker and health checks; the provider threads,
+        # audio worker processes and pooled database connections are released even if that fails
+        try:
+            if provider_warmup is not None:
+                provider_warmup.cancel()
+                await asyncio.gather(provider_warmup, return_exceptions=True)
+            if job_worker is not None:
+                await job_worker.stop(settings.shutdown_grace_seconds)
+            await health_prober.stop()
+        finally:
+            shutdown_provider_executor()
+            shutdown_process_executor()
+            await dispose_database()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="VoiceLab Pro API",
     description="TTS and STT platform API",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -59,11 +115,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms (see /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(tts.router)
 app.include_router(stt.router)
 app.include_router(cartesia.router)
+app.include_router(synthesize.router)
+app.include_router(jobs.router)
+app.include_router(realtime.router)
 
 
 @app.get("/")
@@ -78,39 +140,72 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
-    try:
-        # Check database connection
-        from app.database import engine
-        from sqlalchemy import text
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        
-        # Check ElevenLabs API key (if set)
-        elevenlabs_status = "configured" if settings.elevenlabs_api_key else "not_configured"
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "elevenlabs": elevenlabs_status
+    """Health check endpoint (served from the background health checks, no I/O)."""
+    snapshot = health_prober.snapshot()
+    components = snapshot["components"]
+    return JSONResponse(
+        status_code=200 if snapshot["ready"] else 503,
+        content={
+            "status": "healthy" if snapshot["ready"] else "unhealthy",
+            "database": "connected" if snapshot["ready"] else "disconnected",
+            "elevenlabs": "configured" if settings.elevenlabs_api_key else "not_configured",
+            "components": components,
         }
-    except Exception as e:
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "unhealthy",
-                "database": "disconnected",
-                "error": str(e)
-            }
-        )
+    )
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and its event loop is responsive."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe, from the cached background health checks.
+    
+    Returns 503 while the database check is failing or stale. Failing
+    providers make the status "degraded" but keep the instance ready.
+    Each component reports its latency, check time and last error.
+    """
+    snapshot = health_prober.snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
+
+@app.get("/api/cache/stats")
+async def synthesis_cache_stats():
+    """Synthesis cache hit/miss counters and tier sizes."""
+    from app.services.synthesis_cache import get_synthesis_cache
+    
+    cache = get_synthesis_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Route, provider, database pool and cache metrics in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/rate-limits")
+async def provider_rate_limits():
+    """Outbound rate limiter queue depth, admissions and wait times per provider."""
+    from app.services.rate_limiter import rate_limiter_stats
+    
+    return rate_limiter_stats()
 
 
 @app.get("/api/elevenlabs/test")
 async def test_elevenlabs():
-    """Test ElevenLabs API key status and connectivity."""
-    from app.services.elevenlabs_service import get_elevenlabs_client, get_available_voices
-    from app.config import ConfigurationError
+    """
+    Test ElevenLabs API key status and connectivity.
     
+    Answers from the background health check (a cheap read call) and the
+    outcome of the last real generation; no test audio is generated.
+    """
     if not settings.elevenlabs_api_key:
         return JSONResponse(
             status_code=400,
@@ -122,84 +217,35 @@ async def test_elevenlabs():
             }
         )
     
-    try:
-        # Test 1: Can we read voices? (read operation)
-        client = get_elevenlabs_client()
-        if client is None:
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "status": "error",
-                    "message": "Failed to initialize ElevenLabs client",
-                    "can_read": False,
-                    "can_generate": False
-                }
-            )
-        
-        voices = get_available_voices()
-        can_read = True
-        voices_count = len(voices) if voices else 0
-        
-        # Test 2: Can we generate audio? (write operation - this is where the block happens)
-        can_generate = False
-        generate_error = None
-        try:
-            # Try a minimal test generation
-            audio_gen = client.text_to_speech.convert(
-                "JBFqnCBsd6RMkjVDRZzb",  # Default voice
-                text="Test",
-                model_id="eleven_multilingual_v2",
-                output_format="mp3_44100_128"
-            )
-            # Try to get first chunk (this triggers the actual API call)
-            try:
-                next(audio_gen)
-                can_generate = True
-            except StopIteration:
-                can_generate = True  # Empty generator means it worked
-            except Exception as e:
-                error_msg = str(e)
-                if "detected_unusual_activity" in error_msg:
-                    generate_error = "Account/IP flagged for unusual activity"
-                else:
-                    generate_error = error_msg
-        except Exception as e:
-            error_msg = str(e)
-            if "detected_unusual_activity" in error_msg:
-                generate_error = "Account/IP flagged for unusual activity"
-            else:
-                generate_error = error_msg
-        
-        return {
-            "status": "success",
-            "api_key_configured": True,
-            "can_read": can_read,
-            "can_generate": can_generate,
-            "voices_available": voices_count,
-            "generate_error": generate_error,
-            "message": "Can read voices but cannot generate audio" if can_read and not can_generate else "All operations working" if can_generate else "API key issue"
-        }
-        
-    except ConfigurationError as e:
-        return JSONResponse(
-            status_code=400,
-            content={
-                "status": "error",
-                "message": str(e),
-                "can_read": False,
-                "can_generate": False
-            }
-        )
-    except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "status": "error",
-                "message": f"Unexpected error: {str(e)}",
-                "can_read": False,
-                "can_generate": False
-            }
-        )
+    component = health_prober.snapshot()["components"]["elevenlabs"]
+    can_read = component["status"] == "ok"
+    # Unknown until a generation has been attempted
+    can_generate = None
+    generate_error = None
+    if "last_generation_at" in component:
+        generate_error = component["last_generation_error"]
+        if generate_error and "detected_unusual_activity" in generate_error:
+            generate_error = "Account/IP flagged for unusual activity"
+        can_generate = generate_error is None
+    
+    if can_generate:
+        message = "All operations working"
+    elif can_read and can_generate is False:
+        message = "Can read voices but cannot generate audio"
+    elif can_read:
+        message = "API reachable; no generation attempted yet"
+    else:
+        message = "API key issue"
+    return {
+        "status": "success" if can_read else "error",
+        "api_key_configured": True,
+        "can_read": can_read,
+        "can_generate": can_generate,
+        "generate_error": generate_error,
+        "read_error": component["last_error"] if not can_read else None,
+        "checked_at": component["checked_at"],
+        "message": message
+    }
 
 
 @app.exception_handler(ConfigurationError)
@@ -1,6 +1,7 @@
 """Database models."""
 from app.models.user import User
 from app.models.tts_request import TTSRequest
+from app.models.tts_job import TTSJob
 
-__all__ = ["User", "TTSRequest"]
+__all__ = ["User", "TTSRequest", "TTSJob"]
 
@@ -0,0 +1,56 @@
+"""TTS Job model."""
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, SmallInteger, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+import uuid
+from app.database import Base
+
+# Job states; queued and running jobs are the ones workers can claim
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class TTSJob(Base):
+    """
+    Asynchronous TTS generation job.
+    
+    available_at is when a worker may next claim the job: the scheduled
+    (or retry) time of a queued job, and the lease expiry (visibility
+    timeout) of a running one, so jobs of a crashed worker are picked up
+    again once their lease runs out.
+    """
+    __tablename__ = "tts_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    provider = Column(String(20), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default=JOB_QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String(100), nullable=True)
+    last_error = Column(Text, nullable=True)
+    error_status_code = Column(SmallInteger, nullable=True)
+    tts_request_id = Column(UUID(as_uuid=True), ForeignKey("tts_requests.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    user = relationship("User")
+    tts_request = relationship("TTSRequest", lazy="joined")
+    
+    def __repr__(self):
+        return f"<TTSJob(id={self.id}, status={self.status})>"
+
+
+# Claim queue: only unfinished jobs, in the order they become available
+Index(
+    "ix_tts_jobs_claimable",
+    TTSJob.available_at,
+    postgresql_where=text("status IN ('queued', 'running')"),
+)
@@ -1,7 +1,8 @@
 """TTS Request model."""
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, BigInteger, Float, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from typing import Optional
 import uuid
 from app.database import Base
 
@@ -11,15 +12,34 @@ class TTSRequest(Base):
     __tablename__ = "tts_requests"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     text = Column(Text, nullable=False)
     voice_id = Column(String(100), nullable=True)
-    audio_url = Column(Text, nullable=True)
+    # Generated audio lives in the audio store; the row only keeps its metadata
+    audio_key = Column(String(64), nullable=True)
+    audio_size = Column(BigInteger, nullable=True)
+    audio_mime_type = Column(String(50), nullable=True)
+    audio_duration = Column(Float, nullable=True)  # Seconds
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationship
     user = relationship("User", backref="tts_requests")
     
+    @property
+    def audio_url(self) -> Optional[str]:
+        """API path the stored audio can be downloaded from."""
+        if not self.audio_key:
+            return None
+        return f"/api/tts/history/{self.id}/audio"
+    
     def __repr__(self):
         return f"<TTSRequest(id={self.id}, user_id={self.user_id})>"
 
+
+# Serves per-user history pages (keyset on created_at, id, newest first)
+Index(
+    "ix_tts_requests_user_created_at_id",
+    TTSRequest.user_id,
+    TTSRequest.created_at.desc(),
+    TTSRequest.id.desc(),
+)
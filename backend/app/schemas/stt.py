@@ -0,0 +1,28 @@
+"""STT schemas."""
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class TranscriptionWord(BaseModel):
+    """A recognized word (times in seconds from the start of the recording)."""
+    text: str
+    start: float
+    end: float
+
+
+class TranscriptionSegment(BaseModel):
+    """Transcript of one speech segment."""
+    start: float
+    end: float
+    text: str
+    words: List[TranscriptionWord]
+
+
+class TranscriptionResponse(BaseModel):
+    """Transcription response schema."""
+    text: str
+    language: Optional[str] = None
+    duration: Optional[float] = None
+    engine: str
+    segments: List[TranscriptionSegment]
+    processing_ms: float
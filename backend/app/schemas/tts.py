@@ -2,7 +2,7 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Literal, Optional
 
 
 class TTSGenerateRequest(BaseModel):
@@ -16,6 +16,7 @@ class TTSGenerateRequest(BaseModel):
     model_id: Optional[str] = None
     language: Optional[str] = None
     is_multi_speaker: Optional[bool] = False
+    bypass_cache: bool = False
 
 
 class TTSGenerateResponse(BaseModel):
@@ -33,6 +34,9 @@ class TTSHistoryItem(BaseModel):
     text: str
     voice_id: Optional[str] = None
     audio_url: Optional[str] = None
+    audio_size: Optional[int] = None
+    audio_mime_type: Optional[str] = None
+    audio_duration: Optional[float] = None
     created_at: datetime
     
     class Config:
@@ -42,5 +46,74 @@ class TTSHistoryItem(BaseModel):
 class TTSHistoryResponse(BaseModel):
     """TTS history response schema."""
     requests: list[TTSHistoryItem]
-    total: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
 
+
+
+class TTSBatchRequest(BaseModel):
+    """Batch TTS generation request schema."""
+    items: list[TTSGenerateRequest]
+
+
+class TTSBatchItemResult(BaseModel):
+    """Result of one batch item (request fields on success, error otherwise)."""
+    index: int
+    status_code: int
+    request_id: Optional[UUID] = None
+    audio_url: Optional[str] = None
+    audio_size: Optional[int] = None
+    audio_duration: Optional[float] = None
+    created_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class TTSBatchResponse(BaseModel):
+    """Batch TTS generation response schema."""
+    results: list[TTSBatchItemResult]
+    succeeded: int
+    failed: int
+
+
+class SynthesizeRequest(BaseModel):
+    """Provider-agnostic TTS request schema (routed to the best provider)."""
+    text: str
+    language: Optional[str] = None
+    provider: Optional[Literal["elevenlabs", "cartesia"]] = None
+    voice_ids: Optional[Dict[str, str]] = None
+    model_ids: Optional[Dict[str, str]] = None
+    bypass_cache: bool = False
+
+
+class SynthesizeResponse(BaseModel):
+    """Provider-agnostic TTS response schema."""
+    request_id: UUID
+    provider: str
+    audio_url: str
+    mime_type: str
+    text: str
+    voice_id: Optional[str] = None
+    latency_ms: float
+    hedged: bool = False
+    created_at: datetime
+
+
+class TTSJobResponse(BaseModel):
+    """Asynchronous TTS job schema (result fields once the job succeeded)."""
+    job_id: UUID
+    provider: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    status_url: str
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    request_id: Optional[UUID] = None
+    audio_url: Optional[str] = None
+    audio_size: Optional[int] = None
+    audio_mime_type: Optional[str] = None
+    audio_duration: Optional[float] = None
+    error: Optional[str] = None
+    error_status_code: Optional[int] = None
@@ -0,0 +1,121 @@
+"""
+Production server: several uvicorn worker processes, no reloader.
+
+Runs WEB_CONCURRENCY workers (default: one per CPU) on one port. Each
+worker sizes its database pool so that all of them together stay within
+DB_MAX_CONNECTIONS minus DB_RESERVED_CONNECTIONS (see
+app.database.pool_limits()), and the outbound provider rate limits are
+split between them. Standalone job workers (JOB_WORKER_PROCESSES) get a
+share of both as well; the API processes then leave jobs to them. When DB_MAX_CONNECTIONS is not set, the database's
+max_connections is read at startup.
+
+On SIGTERM/SIGINT each worker stops accepting connections and lets
+in-flight requests, including audio streams, finish for up to
+SHUTDOWN_GRACE_SECONDS before cancelling them; running background jobs
+get the same grace period. Realtime WebSocket sessions are closed (code
+1012) so that clients reconnect to another instance. SIGHUP restarts
+the workers one at a time.
+
+Usage (from backend/):
+    python -m app.serve
+    WEB_CONCURRENCY=4 python -m app.serve --port 8000
+"""
+import argparse
+import logging
+import os
+import uvicorn
+from app.config import ConfigurationError, available_cpus, deployment_processes
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def read_max_connections(database_url: str) -> int:
+    """Read max_connections from the database (raises if it is unreachable)."""
+    import psycopg2
+
+    with psycopg2.connect(database_url, connect_timeout=5) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW max_connections")
+            return int(cursor.fetchone()[0])
+
+
+def configure_workers() -> int:
+    """
+    Export the worker count and connection budget to the workers' environment.
+
+    Importing app.config has loaded .env, which the workers load again on
+    top of the inherited environment, so only values .env does not set are
+    exported here; the workers then derive the same settings.
+
+    Returns:
+        The number of workers to start
+    """
+    if not os.environ.get("WEB_CONCURRENCY"):
+        os.environ["WEB_CONCURRENCY"] = str(available_cpus())
+
+    from app.config import get_settings
+    from app.database import pool_limits
+
+    settings = get_settings()
+    try:
+        server_max_connections = read_max_connections(settings.database_url)
+    except Exception as e:
+        server_max_connections = None
+        logger.warning(f"Could not read max_connections from the database: {e}")
+    if not os.environ.get("DB_MAX_CONNECTIONS") and server_max_connections is not None:
+        os.environ["DB_MAX_CONNECTIONS"] = str(server_max_connections)
+        get_settings.cache_clear()
+        settings = get_settings()
+    elif server_max_connections is not None and server_max_connections < settings.db_max_connections:
+        logger.warning(
+            f"DB_MAX_CONNECTIONS={settings.db_max_connections} exceeds the database's "
+            f"max_connections={server_max_connections}"
+        )
+
+    workers = settings.web_concurrency
+    processes = deployment_processes(settings)
+    if settings.db_max_connections - settings.db_reserved_connections < processes:
+        raise ConfigurationError(
+            f"{workers} workers and {settings.job_worker_processes} job workers need at least "
+            f"{processes + settings.db_reserved_connections} database connections "
+            f"(DB_MAX_CONNECTIONS={settings.db_max_connections}, "
+            f"DB_RESERVED_CONNECTIONS={settings.db_reserved_connections}); "
+            f"lower WEB_CONCURRENCY or JOB_WORKER_PROCESSES"
+        )
+    pool_size, max_overflow = pool_limits(settings)
+    logger.info(
+        f"Starting {workers} workers with database pools of {pool_size} + {max_overflow} overflow "
+        f"({processes * (pool_size + max_overflow)} connections with {settings.job_worker_processes} "
+        f"job workers, of DB_MAX_CONNECTIONS={settings.db_max_connections}, "
+        f"{settings.db_reserved_connections} reserved)"
+    )
+    if settings.job_worker_enabled and settings.job_worker_processes:
+        logger.warning("JOB_WORKER_ENABLED=true: the API workers also run jobs alongside the job workers")
+    return workers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    from app.config import get_settings
+
+    workers = configure_workers()
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=get_settings().shutdown_grace_seconds,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
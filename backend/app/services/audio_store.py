@@ -0,0 +1,137 @@
+"""Audio blob storage for generated TTS audio."""
+import hashlib
+import logging
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Optional
+from app.config import get_settings, ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+_KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class AudioNotFoundError(Exception):
+    """Raised when a requested audio blob does not exist."""
+    pass
+
+
+class AudioStore(ABC):
+    """
+    Content-addressed storage for audio blobs.
+
+    Keys are the SHA-256 hex digest of the audio bytes, so storing the same
+    clip twice yields the same key and only one copy.
+    """
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        """Return the content key for audio bytes."""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def validate_key(key: str) -> None:
+        """Reject keys that are not content hashes (e.g. path traversal)."""
+        if not _KEY_PATTERN.fullmatch(key or ""):
+            raise ValueError(f"Invalid audio key: {key!r}")
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store audio bytes and return their key."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the audio bytes for key (raises AudioNotFoundError)."""
+
+    @abstractmethod
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Yield the audio for key in chunks (raises AudioNotFoundError)."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Return whether audio for key is stored."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete the audio for key (no-op if missing)."""
+
+
+class LocalAudioStore(AudioStore):
+    """Audio store backed by a local (or mounted) directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        self.validate_key(key)
+        return self.root / key[:2] / key[2:4] / key
+
+    def put(self, data: bytes) -> str:
+        key = self.key_for(data)
+        path = self._path(key)
+        if path.exists():
+            return key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            raise AudioNotFoundError(f"Audio not found: {key}")
+
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        try:
+            f = open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise AudioNotFoundError(f"Audio not found: {key}")
+        return self._read_chunks(f, chunk_size)
+
+    @staticmethod
+    def _read_chunks(f, chunk_size: int) -> Iterator[bytes]:
+        with f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Available backends (name -> factory taking the settings object)
+AUDIO_STORE_BACKENDS = {
+    "local": lambda settings: LocalAudioStore(settings.audio_store_dir),
+}
+
+# Process-wide store instance (lazy initialization)
+_audio_store: Optional[AudioStore] = None
+
+
+def get_audio_store() -> AudioStore:
+    """Get or initialize the configured audio store."""
+    global _audio_store
+    if _audio_store is None:
+        settings = get_settings()
+        factory = AUDIO_STORE_BACKENDS.get(settings.audio_store_backend)
+        if factory is None:
+            raise ConfigurationError(
+                f"Unknown AUDIO_STORE_BACKEND '{settings.audio_store_backend}'. "
+                f"Available backends: {', '.join(AUDIO_STORE_BACKENDS)}"
+            )
+        _audio_store = factory(settings)
+        logger.info(f"Audio store initialized ({settings.audio_store_backend})")
+    return _audio_store
@@ -1,42 +1,101 @@
 """Authentication service."""
+import hmac
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from app.schemas.auth import UserResponse
 from app.models.user import User
-from sqlalchemy.orm import Session
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
+CREDENTIALS_PATH = Path(__file__).parent.parent / "utils" / "credentials.json"
+
+# Get-or-create in one round trip. Existing users are read without a write
+# (no row lock, WAL flush or dead tuple per login); a missing user is
+# inserted, and ON CONFLICT DO UPDATE returns the row when a concurrent
+# first login inserted it in the meantime. Written as text() because the
+# PostgreSQL insert() construct is not in SQLAlchemy's compiled cache.
+UPSERT_USER = select(User).from_statement(text("""
+    WITH existing AS (
+        SELECT * FROM users WHERE username = :username
+    ), inserted AS (
+        INSERT INTO users (id, username)
+        SELECT :id, :username WHERE NOT EXISTS (SELECT 1 FROM existing)
+        ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username
+        RETURNING *
+    )
+    SELECT * FROM existing UNION ALL SELECT * FROM inserted
+"""))
+
 
 def load_credentials() -> dict:
     """Load hardcoded credentials from JSON file."""
-    credentials_path = Path(__file__).parent.parent / "utils" / "credentials.json"
-    with open(credentials_path, "r") as f:
+    with open(CREDENTIALS_PATH, "r") as f:
         return json.load(f)
 
 
+class CredentialStore:
+    """
+    In-memory index of the credentials file, keyed by username.
+    
+    The file is parsed again only when its modification time or size
+    changes, so edits are picked up without a restart while logins cost a
+    stat() and a dict lookup. Passwords are compared in constant time, and
+    unknown usernames are compared against a dummy value so that their
+    timing matches a wrong password.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._passwords: Dict[str, bytes] = {}
+        self._version: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+    
+    def _refresh(self) -> None:
+        stat = os.stat(self.path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            with open(self.path, "r") as f:
+                credentials = json.load(f)
+            self._passwords = {
+                user["username"]: str(user.get("password", "")).encode()
+                for user in credentials.get("users", []) if user.get("username")
+            }
+            self._version = version
+    
+    def validate(self, username: str, password: str) -> bool:
+        """Return whether username exists with this password."""
+        self._refresh()
+        stored = self._passwords.get(username)
+        matches = hmac.compare_digest(password.encode(), stored if stored is not None else b"\0")
+        return stored is not None and matches
+
+
+credential_store = CredentialStore(CREDENTIALS_PATH)
+
+
 def validate_credentials(username: str, password: str) -> bool:
     """Validate user credentials against hardcoded JSON file."""
-    credentials = load_credentials()
-    for user in credentials.get("users", []):
-        if user.get("username") == username and user.get("password") == password:
-            return True
-    return False
-
-
-def get_or_create_user(db: Session, username: str) -> User:
-    """Get existing user or create new one in database."""
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        user = User(username=username)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    return credential_store.validate(username, password)
+
+
+async def get_or_create_user(db: AsyncSession, username: str) -> User:
+    """Get existing user or create new one in database (one statement, safe under concurrent logins)."""
+    result = await db.execute(UPSERT_USER, {"id": uuid.uuid4(), "username": username})
+    user = result.scalars().one()
+    await db.commit()
     return user
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """Get user by username."""
-    return db.query(User).filter(User.username == username).first()
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
@@ -0,0 +1,93 @@
+"""Batch TTS generation: bounded fan-out and bulk persistence."""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, TypeVar
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tts_request import TTSRequest
+from app.services.tts_history_service import record_tts_requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BatchOutcome(NamedTuple):
+    """Result of one batch item: the stored request, or the error."""
+    index: int
+    tts_request: Optional[TTSRequest]
+    error: Optional[Exception]
+
+
+async def run_tts_batch(
+    db: AsyncSession,
+    user_id: UUID,
+    items: Sequence[T],
+    synthesize: Callable[[T], Awaitable[bytes]],
+    concurrency: int,
+    mime_type_of: Callable[[T], str],
+    voice_id_of: Callable[[T], Optional[str]],
+    output_format_of: Optional[Callable[[T], Dict]] = None,
+) -> List[BatchOutcome]:
+    """
+    Generate audio for every item and store the successes in one insert.
+
+    Items are fanned out over at most concurrency concurrent provider calls.
+    Provider rate limits still apply to every call (queued calls wait for
+    their slot), so concurrency only needs to cover provider latency. A
+    failed item does not affect the others.
+
+    Args:
+        db: Database session
+        user_id: Owner of the requests
+        items: Batch items (each must have a text attribute)
+        synthesize: Coroutine function generating the audio of one item
+        concurrency: Maximum number of items in flight
+        mime_type_of: MIME type of an item's generated audio
+        voice_id_of: Voice to record for an item
+        output_format_of: Output format of an item's audio, needed for the
+            duration of raw PCM (see record_tts_request)
+
+    Returns:
+        One BatchOutcome per item, in input order
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item: T):
+        async with semaphore:
+            try:
+                return await synthesize(item)
+            except Exception as e:
+                return e
+
+    results = await asyncio.gather(*(run(item) for item in items))
+
+    succeeded = [
+        (index, audio) for index, audio in enumerate(results)
+        if not isinstance(audio, Exception)
+    ]
+    rows = await record_tts_requests(
+        db,
+        user_id,
+        [
+            (
+                items[index].text,
+                voice_id_of(items[index]),
+                audio,
+                mime_type_of(items[index]),
+                output_format_of(items[index]) if output_format_of else None,
+            )
+            for index, audio in succeeded
+        ],
+    ) if succeeded else []
+    stored = {index: row for (index, _), row in zip(succeeded, rows)}
+
+    logger.info(f"Batch of {len(items)} items: {len(succeeded)} generated, {len(items) - len(succeeded)} failed")
+    return [
+        BatchOutcome(
+            index=index,
+            tts_request=stored.get(index),
+            error=result if isinstance(result, Exception) else None,
+        )
+        for index, result in enumerate(results)
+    ]
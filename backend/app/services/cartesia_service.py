@@ -1,14 +1,31 @@
 """Cartesia AI TTS service integration."""
-from cartesia import Cartesia
 from app.config import get_settings, ConfigurationError
-from typing import Optional, List, Dict
+from app.utils.concurrency import (
+    run_in_provider_executor, iterate_in_provider_executor, run_in_process_executor, SingleFlight, StreamFanout,
+)
+from app.utils.audio import wav_header, concat_wav, concat_mp3
+from app.utils.pcm import PostProcessOptions, POSTPROCESS_ENCODINGS, postprocess_wav
+from app.services.synthesis_cache import get_synthesis_cache, synthesis_cache_key
+from app.services.catalog_cache import CatalogCache
+from app.services.rate_limiter import get_rate_limiter, is_rate_limit_error
+from app.services.metrics import coalesced_requests, collect_audio, count_provider_error, observe_synthesis
+from app.services.long_text import split_text, synthesize_in_order
+from contextlib import aclosing
+from typing import Optional, List, Dict, Tuple, AsyncIterator
+import asyncio
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Initialize Cartesia client (lazy initialization)
+# Identical in-flight syntheses (same cache key) share one provider call
+_generate_flight = SingleFlight()
+_stream_fanout = StreamFanout()
+
+# Initialize Cartesia client (lazy initialization; the SDK is imported on first use
+# to keep app startup fast)
 cartesia_client = None
 
 def get_cartesia_client():
@@ -16,21 +33,60 @@ def get_cartesia_client():
     global cartesia_client
     if cartesia_client is None:
         if settings.cartesia_api_key:
-            cartesia_client = Cartesia(api_key=settings.cartesia_api_key)
+            from cartesia import Cartesia
+            cartesia_client = Cartesia(
+                api_key=settings.cartesia_api_key,
+                base_url=settings.cartesia_base_url or None,
+            )
             logger.info("Cartesia client initialized successfully")
         else:
             logger.warning("Cartesia API key not set. TTS functionality will not work.")
     return cartesia_client
 
+
+# Async client, used for WebSocket (realtime) sessions
+async_cartesia_client = None
+
+def get_async_cartesia_client():
+    """Get or initialize the async Cartesia client."""
+    global async_cartesia_client
+    if async_cartesia_client is None and settings.cartesia_api_key:
+        from cartesia import AsyncCartesia
+        async_cartesia_client = AsyncCartesia(
+            api_key=settings.cartesia_api_key,
+            base_url=settings.cartesia_base_url or None,
+        )
+    return async_cartesia_client
+
 # Cartesia API configuration
 CARTESIA_VERSION = "2025-04-16"
 CARTESIA_API_BASE = "https://api.cartesia.ai"  # For voices endpoint (not in SDK yet)
 
-# Available models
+# Output formats: PCM encodings (WAV or raw container), sample rates and MP3 bit rates
+CARTESIA_PCM_ENCODINGS = ["pcm_f32le", "pcm_s16le", "pcm_mulaw", "pcm_alaw"]
+CARTESIA_SAMPLE_RATES = [8000, 16000, 22050, 24000, 44100, 48000]
+CARTESIA_MP3_BIT_RATES = [32000, 64000, 96000, 128000, 192000]
+DEFAULT_MP3_BIT_RATE = 128000
+
+# Post-processed audio is made from a float32 master at this rate (48 kHz for
+# 48 kHz output), so one cached master serves every output format
+POSTPROCESS_SOURCE_SAMPLE_RATE = 44100
+
+# MIME type of each output container
+CARTESIA_CONTAINER_MIME_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "raw": "audio/pcm",
+}
+
+# Available models (with the output containers each supports)
 CARTESIA_MODELS = [
-    {"id": "sonic-3", "name": "Sonic 3", "description": "World's fastest, most emotive, ultra-realistic TTS (90ms latency)"},
-    {"id": "sonic-turbo", "name": "Sonic Turbo", "description": "Ultra-fast performance (40ms latency)"},
-    {"id": "sonic-multilingual", "name": "Sonic Multilingual", "description": "Multilingual support"},
+    {"id": "sonic-3", "name": "Sonic 3", "description": "World's fastest, most emotive, ultra-realistic TTS (90ms latency)",
+     "containers": ["wav", "raw", "mp3"]},
+    {"id": "sonic-turbo", "name": "Sonic Turbo", "description": "Ultra-fast performance (40ms latency)",
+     "containers": ["wav", "raw", "mp3"]},
+    {"id": "sonic-multilingual", "name": "Sonic Multilingual", "description": "Multilingual support",
+     "containers": ["wav", "raw"]},
 ]
 
 # Available languages
@@ -55,8 +111,108 @@ CARTESIA_LANGUAGES = [
 
 
 
+def resolve_output_format(
+    model_id: str = "sonic-3",
+    container: str = "wav",
+    encoding: Optional[str] = None,
+    sample_rate: int = 44100,
+    bit_rate: Optional[int] = None,
+) -> Dict:
+    """
+    Validate a requested output format and build Cartesia's output_format.
+    
+    Args:
+        model_id: Model the audio is generated with
+        container: wav, raw or mp3 (if the model supports it)
+        encoding: PCM encoding for wav/raw (default pcm_f32le); not used for mp3
+        sample_rate: Sample rate in Hz
+        bit_rate: MP3 bit rate in bits/s (default 128000); not used for PCM
+    
+    Returns:
+        output_format dict for tts.bytes()
+    
+    Raises:
+        ValueError: If the combination is not supported
+    """
+    model = next((m for m in CARTESIA_MODELS if m["id"] == model_id), None)
+    containers = model["containers"] if model else ["wav", "raw"]
+    if container not in containers:
+        raise ValueError(
+            f"Container '{container}' is not supported by {model_id} "
+            f"(supported: {', '.join(containers)})"
+        )
+    if sample_rate not in CARTESIA_SAMPLE_RATES:
+        raise ValueError(
+            f"Unsupported sample rate {sample_rate} "
+            f"(supported: {', '.join(str(rate) for rate in CARTESIA_SAMPLE_RATES)})"
+        )
+    
+    if container == "mp3":
+        if encoding is not None:
+            raise ValueError("encoding does not apply to mp3 output")
+        bit_rate = bit_rate or DEFAULT_MP3_BIT_RATE
+        if bit_rate not in CARTESIA_MP3_BIT_RATES:
+            raise ValueError(
+                f"Unsupported mp3 bit rate {bit_rate} "
+                f"(supported: {', '.join(str(rate) for rate in CARTESIA_MP3_BIT_RATES)})"
+            )
+        return {"container": "mp3", "sample_rate": sample_rate, "bit_rate": bit_rate}
+    
+    if bit_rate is not None:
+        raise ValueError("bit_rate only applies to mp3 output")
+    encoding = encoding or "pcm_f32le"
+    if encoding not in CARTESIA_PCM_ENCODINGS:
+        raise ValueError(
+            f"Unsupported encoding '{encoding}' "
+            f"(supported: {', '.join(CARTESIA_PCM_ENCODINGS)})"
+        )
+    return {"container": container, "encoding": encoding, "sample_rate": sample_rate}
 
-def generate_tts_audio(
+
+def resolve_postprocess(
+    container: str = "wav",
+    encoding: Optional[str] = None,
+    requested: Optional[bool] = None,
+) -> Optional[PostProcessOptions]:
+    """
+    Decide whether a request's audio is post-processed (see generate_tts_audio_async).
+    
+    Args:
+        container: Requested container
+        encoding: Requested PCM encoding (None for the default)
+        requested: True/False from the request, or None to follow
+            AUDIO_POSTPROCESS_ENABLED (formats that cannot be
+            post-processed, mp3 and 8-bit PCM, are then left alone)
+    
+    Returns:
+        Options built from the AUDIO_* settings, or None to return the
+        audio as generated
+    
+    Raises:
+        ValueError: If post-processing is requested for mp3 or 8-bit PCM
+    """
+    enabled = settings.audio_postprocess_enabled if requested is None else requested
+    if not enabled:
+        return None
+    if container == "mp3" or (encoding is not None and encoding not in POSTPROCESS_ENCODINGS):
+        if requested:
+            raise ValueError(
+                f"postprocess is only supported for {' and '.join(POSTPROCESS_ENCODINGS)} output"
+            )
+        return None
+    return PostProcessOptions(
+        trim_silence=True,
+        silence_threshold_dbfs=settings.audio_silence_threshold_dbfs,
+        target_loudness_dbfs=settings.audio_target_loudness_dbfs if settings.audio_normalize_loudness else None,
+    )
+
+
+def output_format_mime_type(output_format: Optional[Dict]) -> str:
+    """MIME type of audio produced with output_format (None is the WAV default)."""
+    return CARTESIA_CONTAINER_MIME_TYPES[(output_format or {}).get("container", "wav")]
+
+
+def _prepare_tts_request(
     text: str,
     voice_id: Optional[str] = None,
     model_id: str = "sonic-3",
@@ -65,28 +221,16 @@ def generate_tts_audio(
     volume: float = 1.0,
     emotion: str = "neutral",
     output_format: Optional[Dict] = None,
-    max_retries: int = 3,
-) -> bytes:
+) -> Tuple[object, Dict]:
     """
-    Generate TTS audio using Cartesia AI API.
-    
-    Args:
-        text: Text to convert to speech
-        voice_id: Voice ID (defaults to a popular voice if not provided)
-        model_id: Model to use (sonic-3, sonic-turbo, etc.)
-        language: Language code (e.g., 'en', 'es', 'fr')
-        speed: Speech speed (0.5-2.0, default: 1.0)
-        volume: Speech volume (0.0-2.0, default: 1.0)
-        emotion: Emotion for sonic-3 (neutral, happy, sad, angry, etc.)
-        output_format: Custom output format dict
-        max_retries: Maximum number of retry attempts
+    Validate inputs and build the arguments for client.tts.bytes().
     
     Returns:
-        Audio bytes (WAV format by default)
+        Tuple of (client, tts parameters)
     
     Raises:
         ConfigurationError: If API key is not set
-        Exception: If generation fails after retries
+        ValueError: If text is empty
     """
     if not settings.cartesia_api_key:
         raise ConfigurationError(
@@ -109,160 +253,526 @@ def generate_tts_audio(
     
     # Default output format (WAV, PCM, 44.1kHz)
     if output_format is None:
-        output_format = {
-            "container": "wav",
-            "encoding": "pcm_f32le",
-            "sample_rate": 44100,
-        }
+        output_format = resolve_output_format(model_id)
+    
+    # Use official Cartesia SDK - client.tts.bytes() returns a chunk iterator
+    # Reference: https://docs.cartesia.ai/use-an-sdk/python
+    # Build parameters dict - only include language if provided
+    tts_params = {
+        "model_id": model_id,
+        "transcript": text,
+        "voice": {
+            "mode": "id",
+            "id": default_voice_id,
+        },
+        "output_format": output_format,
+        "generation_config": {
+            "speed": speed,
+            "volume": volume,
+            "emotion": emotion,
+        },
+    }
+    
+    # Only add language if provided (optional parameter)
+    if language:
+        tts_params["language"] = language
+    
+    return client, tts_params
+
+
+def _synthesis_cache_key(tts_params: Dict) -> str:
+    """Build the synthesis cache key from resolved tts.bytes() arguments."""
+    return synthesis_cache_key(
+        provider="cartesia",
+        model_id=tts_params["model_id"],
+        voice_id=tts_params["voice"]["id"],
+        language=tts_params.get("language"),
+        output_format=tts_params["output_format"],
+        voice_settings=tts_params["generation_config"],
+        text=tts_params["transcript"],
+    )
+
+
+def _bytes_once(client, tts_params: Dict) -> bytes:
+    """Run a single blocking tts.bytes() call and collect the audio bytes."""
+    started = time.perf_counter()
+    chunk_iter = client.tts.bytes(**tts_params)
+    
+    # Collect all chunks from the iterator into bytes
+    return collect_audio("cartesia", tts_params["model_id"], chunk_iter, started)
+
+
+def _splice_audio(parts: List[bytes], container: str) -> bytes:
+    """Join audio of consecutive chunks produced with the same output format."""
+    if container == "wav":
+        return concat_wav(parts)
+    if container == "mp3":
+        return concat_mp3(parts)
+    return b"".join(parts)
+
+
+def _get_retry_delay(e: Exception, attempt: int, max_retries: int) -> float:
+    """
+    Decide how to handle a failed generation attempt.
+    
+    Args:
+        e: Exception raised by the attempt
+        attempt: Zero-based attempt number
+        max_retries: Maximum number of retry attempts
+    
+    Returns:
+        Seconds to wait before the next attempt
+    
+    Raises:
+        ConfigurationError: For errors that should not be retried
+        Exception: If this was the last attempt
+    """
+    error_msg = str(e)
+    
+    # Handle specific errors
+    if "401" in error_msg or "unauthorized" in error_msg.lower():
+        raise ConfigurationError(
+            f"Invalid Cartesia API key. Please check your CARTESIA_API_KEY in .env file. "
+            f"Get your API key from https://play.cartesia.ai/keys\n"
+            f"Error: {error_msg}"
+        )
+    
+    if is_rate_limit_error(e):
+        wait_time = (attempt + 1) * 2
+        logger.warning(f"Rate limit hit. Waiting {wait_time} seconds before retry...")
+        return wait_time
+    
+    if attempt < max_retries - 1:
+        wait_time = (attempt + 1) * 1
+        logger.warning(
+            f"Cartesia TTS generation failed (attempt {attempt + 1}/{max_retries}). "
+            f"Retrying in {wait_time} seconds... Error: {error_msg}"
+        )
+        return wait_time
+    
+    logger.error(f"Cartesia TTS generation failed after {max_retries} attempts")
+    raise Exception(
+        f"Failed to generate Cartesia TTS audio after {max_retries} attempts: {error_msg}"
+    )
+
+
+def generate_tts_audio(
+    text: str,
+    voice_id: Optional[str] = None,
+    model_id: str = "sonic-3",
+    language: Optional[str] = None,
+    speed: float = 1.0,
+    volume: float = 1.0,
+    emotion: str = "neutral",
+    output_format: Optional[Dict] = None,
+    max_retries: int = 3,
+    bypass_cache: bool = False,
+) -> bytes:
+    """
+    Generate TTS audio using Cartesia AI API.
+    
+    This call blocks; from async code use generate_tts_audio_async().
+    
+    Args:
+        text: Text to convert to speech
+        voice_id: Voice ID (defaults to a popular voice if not provided)
+        model_id: Model to use (sonic-3, sonic-turbo, etc.)
+        language: Language code (e.g., 'en', 'es', 'fr')
+        speed: Speech speed (0.5-2.0, default: 1.0)
+        volume: Speech volume (0.0-2.0, default: 1.0)
+        emotion: Emotion for sonic-3 (neutral, happy, sad, angry, etc.)
+        output_format: Output format dict (see resolve_output_format());
+            defaults to 44.1 kHz pcm_f32le WAV
+        max_retries: Maximum number of retry attempts
+        bypass_cache: Skip the synthesis cache lookup (the fresh result is still cached)
+    
+    Returns:
+        Audio bytes (WAV format by default)
+    
+    Raises:
+        ConfigurationError: If API key is not set
+        Exception: If generation fails after retries
+    """
+    client, tts_params = _prepare_tts_request(
+        text, voice_id, model_id, language, speed, volume, emotion, output_format
+    )
+    
+    cache = get_synthesis_cache()
+    cache_key = _synthesis_cache_key(tts_params) if cache else None
+    if cache and not bypass_cache:
+        audio = cache.get(cache_key)
+        if audio is not None:
+            logger.info("Cartesia TTS audio served from synthesis cache")
+            return audio
     
     last_error = None
     for attempt in range(max_retries):
         try:
             logger.info(f"Generating Cartesia TTS audio (attempt {attempt + 1}/{max_retries})")
-            
-            # Use official Cartesia SDK - client.tts.bytes() returns a chunk iterator
-            # Reference: https://docs.cartesia.ai/use-an-sdk/python
-            # Build parameters dict - only include language if provided
-            tts_params = {
-                "model_id": model_id,
-                "transcript": text,
-                "voice": {
-                    "mode": "id",
-                    "id": default_voice_id,
-                },
-                "output_format": output_format,
-                "generation_config": {
-                    "speed": speed,
-                    "volume": volume,
-                    "emotion": emotion,
-                },
-            }
-            
-            # Only add language if provided (optional parameter)
-            if language:
-                tts_params["language"] = language
-            
-            chunk_iter = client.tts.bytes(**tts_params)
-            
-            # Collect all chunks from the iterator into bytes
-            audio = b"".join(chunk_iter)
-            
+            audio = _bytes_once(client, tts_params)
             logger.info("Cartesia TTS audio generated successfully")
+            if cache:
+                cache.put(cache_key, audio)
             return audio
-            
         except Exception as e:
             last_error = e
-            error_msg = str(e)
-            
-            # Handle specific errors
-            if "401" in error_msg or "unauthorized" in error_msg.lower():
-                raise ConfigurationError(
-                    f"Invalid Cartesia API key. Please check your CARTESIA_API_KEY in .env file. "
-                    f"Get your API key from https://play.cartesia.ai/keys\n"
-                    f"Error: {error_msg}"
-                )
-            
-            if "429" in error_msg or "rate limit" in error_msg.lower():
-                wait_time = (attempt + 1) * 2
-                logger.warning(f"Rate limit hit. Waiting {wait_time} seconds before retry...")
-                import time
-                time.sleep(wait_time)
-                continue
-            
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 1
-                logger.warning(
-                    f"Cartesia TTS generation failed (attempt {attempt + 1}/{max_retries}). "
-                    f"Retrying in {wait_time} seconds... Error: {error_msg}"
-                )
-                import time
-                time.sleep(wait_time)
+            count_provider_error("cartesia", e, attempt, max_retries)
+            time.sleep(_get_retry_delay(e, attempt, max_retries))
+    
+    raise Exception(f"Failed to generate Cartesia TTS audio: {str(last_error)}")
+
+
+async def generate_tts_audio_async(
+    text: str,
+    voice_id: Optional[str] = None,
+    model_id: str = "sonic-3",
+    language: Optional[str] = None,
+    speed: float = 1.0,
+    volume: float = 1.0,
+    emotion: str = "neutral",
+    output_format: Optional[Dict] = None,
+    max_retries: int = 3,
+    bypass_cache: bool = False,
+    deadline: Optional[float] = None,
+    postprocess: Optional[PostProcessOptions] = None,
+) -> bytes:
+    """
+    Async variant of generate_tts_audio() for use in request handlers.
+    
+    The blocking SDK call runs in the bounded provider thread pool and retry
+    backoff uses asyncio.sleep(). Arguments, return value and errors are the
+    same as generate_tts_audio(). Cache hits return without a provider call.
+    
+    Every provider call first takes a slot from the Cartesia rate limiter.
+    deadline (a time.monotonic() value) bounds that wait: ProviderBusyError
+    is raised as soon as a slot cannot be had in time.
+    
+    Texts longer than CARTESIA_CHUNK_CHARS are split at sentence boundaries;
+    the chunks are synthesized concurrently (each retried and cached on its
+    own) and spliced in order: PCM samples under one rewritten WAV header,
+    or MP3 frames.
+    
+    Concurrent calls with the same cache key share one provider call (and
+    its retries, under the first caller's deadline) unless bypass_cache is
+    set. A caller that is cancelled leaves the call running for the others.
+    
+    With postprocess (see resolve_postprocess()), a float32 WAV master is
+    generated (and cached) at POSTPROCESS_SOURCE_SAMPLE_RATE, then trimmed
+    of silence, normalized, resampled and converted to output_format in
+    the worker process pool. output_format must then be pcm_f32le or
+    pcm_s16le (wav or raw).
+    """
+    if postprocess is not None:
+        output_format = output_format or resolve_output_format(model_id)
+        if output_format.get("encoding") not in POSTPROCESS_ENCODINGS:
+            raise ValueError(f"Cannot post-process {output_format['container']} output")
+        source_rate = 48000 if output_format["sample_rate"] == 48000 else POSTPROCESS_SOURCE_SAMPLE_RATE
+        master = await generate_tts_audio_async(
+            text, voice_id, model_id, language, speed, volume, emotion,
+            resolve_output_format(model_id, "wav", "pcm_f32le", source_rate),
+            max_retries, bypass_cache, deadline
+        )
+        audio = await run_in_process_executor(
+            postprocess_wav,
+            master,
+            output_format["encoding"],
+            output_format["sample_rate"],
+            output_format["container"],
+            postprocess,
+        )
+        logger.info(f"Post-processed Cartesia TTS audio: {len(master)} -> {len(audio)} bytes")
+        return audio
+    
+    client, tts_params = _prepare_tts_request(
+        text, voice_id, model_id, language, speed, volume, emotion, output_format
+    )
+    
+    # Long text: synthesize sentence chunks in parallel and splice them
+    chunks = split_text(text, settings.cartesia_chunk_chars)
+    if len(chunks) > 1:
+        output_format = tts_params["output_format"]
+        parts = synthesize_in_order(
+            chunks,
+            lambda chunk: generate_tts_audio_async(
+                chunk, voice_id, model_id, language, speed, volume, emotion,
+                output_format, max_retries, bypass_cache, deadline
+            ),
+            settings.long_text_parallelism,
+        )
+        async with aclosing(parts):
+            audio_parts = [part async for part in parts]
+        return _splice_audio(audio_parts, output_format["container"])
+    
+    cache = get_synthesis_cache()
+    cache_key = _synthesis_cache_key(tts_params)
+    if bypass_cache:
+        return await _bytes_with_retries(client, tts_params, cache_key, max_retries, deadline)
+    if cache:
+        audio = await cache.get_async(cache_key)
+        if audio is not None:
+            logger.info("Cartesia TTS audio served from synthesis cache")
+            return audio
+    
+    if _generate_flight.in_flight(cache_key):
+        coalesced_requests.inc("cartesia", "generate")
+    return await _generate_flight.do(
+        cache_key, lambda: _bytes_with_retries(client, tts_params, cache_key, max_retries, deadline)
+    )
+
+
+async def _bytes_with_retries(
+    client,
+    tts_params: Dict,
+    cache_key: str,
+    max_retries: int,
+    deadline: Optional[float],
+) -> bytes:
+    """Run tts.bytes() with rate limiting and retries, and cache the audio."""
+    cache = get_synthesis_cache()
+    limiter = get_rate_limiter("cartesia")
+    last_error = None
+    for attempt in range(max_retries):
+        # Wait for an outbound slot (raises ProviderBusyError past the deadline)
+        await limiter.acquire(deadline)
+        try:
+            logger.info(f"Generating Cartesia TTS audio (attempt {attempt + 1}/{max_retries})")
+            audio = await run_in_provider_executor(_bytes_once, client, tts_params)
+            logger.info("Cartesia TTS audio generated successfully")
+            if cache:
+                await cache.put_async(cache_key, audio)
+            return audio
+        except Exception as e:
+            last_error = e
+            count_provider_error("cartesia", e, attempt, max_retries)
+            delay = _get_retry_delay(e, attempt, max_retries)
+            if is_rate_limit_error(e) and limiter.enabled:
+                # The next acquire() waits out the penalty with every other queued call
+                limiter.penalize(delay)
             else:
-                logger.error(f"Cartesia TTS generation failed after {max_retries} attempts")
-                raise Exception(
-                    f"Failed to generate Cartesia TTS audio after {max_retries} attempts: {error_msg}"
-                )
+                await asyncio.sleep(delay)
     
     raise Exception(f"Failed to generate Cartesia TTS audio: {str(last_error)}")
 
 
+async def stream_tts_audio_async(
+    text: str,
+    voice_id: Optional[str] = None,
+    model_id: str = "sonic-3",
+    language: Optional[str] = None,
+    speed: float = 1.0,
+    volume: float = 1.0,
+    emotion: str = "neutral",
+    encoding: str = "pcm_f32le",
+    sample_rate: int = 44100,
+    include_wav_header: bool = True,
+    max_retries: int = 3,
+    bypass_cache: bool = False,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream Cartesia TTS audio chunks as they are produced.
+    
+    Raw PCM is requested from Cartesia. When include_wav_header is set, a
+    streaming WAV header (unknown length) is sent in front of the first
+    chunk so the result plays as a regular WAV file; otherwise the caller
+    receives bare PCM frames in the given encoding and sample rate.
+    
+    Failures before the first chunk are retried like generate_tts_audio();
+    once audio has been yielded a failure is raised immediately. deadline
+    is handled as in generate_tts_audio_async().
+    
+    Long texts are chunked like generate_tts_audio_async(); the first
+    chunk is sent as soon as it is ready while later chunks are generated.
+    
+    Concurrent streams with the same cache key share one provider stream
+    (whatever their include_wav_header) unless bypass_cache is set: a
+    stream joining late first receives the chunks already produced. The
+    provider stream is closed once every consumer has stopped.
+    
+    Yields:
+        Audio chunks (WAV header + PCM, or raw PCM)
+    """
+    output_format = resolve_output_format(model_id, "raw", encoding, sample_rate)
+    client, tts_params = _prepare_tts_request(
+        text, voice_id, model_id, language, speed, volume, emotion, output_format
+    )
+    header = wav_header(sample_rate, encoding) if include_wav_header else b""
+    
+    # Long text: stream each chunk's PCM as soon as it (and all before it) is ready
+    chunks = split_text(text, settings.cartesia_chunk_chars)
+    if len(chunks) > 1:
+        parts = synthesize_in_order(
+            chunks,
+            lambda chunk: generate_tts_audio_async(
+                chunk, voice_id, model_id, language, speed, volume, emotion,
+                output_format, max_retries, bypass_cache, deadline
+            ),
+            settings.long_text_parallelism,
+        )
+        async with aclosing(parts):
+            async for part in parts:
+                yield header + part
+                header = b""
+        return
+    
+    # Cached entries hold the raw PCM; the header is added per response
+    cache = get_synthesis_cache()
+    cache_key = _synthesis_cache_key(tts_params)
+    if cache and not bypass_cache:
+        audio = await cache.get_async(cache_key)
+        if audio is not None:
+            logger.info("Cartesia TTS audio stream served from synthesis cache")
+            yield header + audio
+            return
+    
+    if bypass_cache:
+        audio_chunks = _stream_with_retries(client, tts_params, cache_key, max_retries, deadline)
+    else:
+        if _stream_fanout.in_flight(cache_key):
+            coalesced_requests.inc("cartesia", "stream")
+        audio_chunks = _stream_fanout.stream(
+            cache_key, lambda: _stream_with_retries(client, tts_params, cache_key, max_retries, deadline)
+        )
+    async with aclosing(audio_chunks):
+        async for chunk in audio_chunks:
+            yield header + chunk
+            header = b""
+
+
+async def _stream_with_retries(
+    client,
+    tts_params: Dict,
+    cache_key: str,
+    max_retries: int,
+    deadline: Optional[float],
+) -> AsyncIterator[bytes]:
+    """Stream tts.bytes() with rate limiting and retries, and cache the PCM."""
+    cache = get_synthesis_cache()
+    limiter = get_rate_limiter("cartesia")
+    last_error = None
+    for attempt in range(max_retries):
+        # Wait for an outbound slot (raises ProviderBusyError past the deadline)
+        await limiter.acquire(deadline)
+        started = False
+        collected = []
+        call_started = time.perf_counter()
+        first_chunk_seconds = None
+        try:
+            logger.info(f"Streaming Cartesia TTS audio (attempt {attempt + 1}/{max_retries})")
+            chunks = iterate_in_provider_executor(client.tts.bytes, **tts_params)
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    collected.append(chunk)
+                    if not started:
+                        started = True
+                        first_chunk_seconds = time.perf_counter() - call_started
+                    yield chunk
+            logger.info("Cartesia TTS audio stream completed")
+            observe_synthesis(
+                "cartesia", tts_params["model_id"], "stream",
+                time.perf_counter() - call_started, sum(len(chunk) for chunk in collected), first_chunk_seconds
+            )
+            if cache:
+                await cache.put_async(cache_key, b"".join(collected))
+            return
+        except Exception as e:
+            if started:
+                raise
+            last_error = e
+            count_provider_error("cartesia", e, attempt, max_retries)
+            delay = _get_retry_delay(e, attempt, max_retries)
+            if is_rate_limit_error(e) and limiter.enabled:
+                # The next acquire() waits out the penalty with every other queued call
+                limiter.penalize(delay)
+            else:
+                await asyncio.sleep(delay)
+    
+    raise Exception(f"Failed to stream Cartesia TTS audio: {str(last_error)}")
+
+
+# Voice offered by /api/cartesia/voices when no catalog has been fetched yet
+DEFAULT_VOICES = [
+    {
+        "voice_id": "6ccbfb76-1fc6-48f7-b71d-91ac6298247b",
+        "name": "Default Voice",
+        "description": "High-quality default voice",
+    }
+]
+
+
 def get_available_voices() -> List[Dict]:
     """
     Get list of available voices from Cartesia API.
-    Returns default voices if API call fails or returns empty.
+    
+    Errors (including an empty list) are raised rather than answered with
+    DEFAULT_VOICES, so that the voice catalog cache keeps serving its last
+    good list; the route falls back to DEFAULT_VOICES only when it has none.
     
     Returns:
         List of voice objects with id, name, and metadata
-    """
-    # Default voices to use if API call fails or returns empty
-    DEFAULT_VOICES = [
-        {
-            "voice_id": "6ccbfb76-1fc6-48f7-b71d-91ac6298247b",
-            "name": "Default Voice",
-            "description": "High-quality default voice",
-        }
-    ]
     
+    Raises:
+        ConfigurationError: If API key is not set or invalid
+        Exception: If fetching voices fails or returns no voices
+    """
     client = get_cartesia_client()
     if not settings.cartesia_api_key or client is None:
-        logger.warning("Cartesia API key not set. Returning default voices.")
-        return DEFAULT_VOICES
+        raise ConfigurationError(
+            "CARTESIA_API_KEY is not set. Please set it in your .env file. "
+            "Get your API key from https://play.cartesia.ai/keys"
+        )
+    
+    logger.info("Fetching available voices from Cartesia")
+    
+    # The voices endpoint is not exposed by the SDK; call the API directly
+    import requests
+    
+    headers = {
+        "Cartesia-Version": CARTESIA_VERSION,
+        "X-API-Key": settings.cartesia_api_key,
+        "Content-Type": "application/json",
+    }
+    url = f"{settings.cartesia_base_url or CARTESIA_API_BASE}/voices"
     
     try:
-        logger.info("Fetching available voices from Cartesia")
-        
-        # Use official Cartesia SDK to fetch voices
-        # Note: The SDK may have a voices.list() method, but if not, we'll use the API directly
-        # For now, we'll use requests as a fallback since the SDK might not expose voices endpoint
-        import requests
-        
-        headers = {
-            "Cartesia-Version": CARTESIA_VERSION,
-            "X-API-Key": settings.cartesia_api_key,
-            "Content-Type": "application/json",
-        }
-        url = "https://api.cartesia.ai/voices"
-        
         response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            error_msg = response.text
-            logger.warning(f"Cartesia API returned status {response.status_code}: {error_msg}")
-            if response.status_code == 401:
-                logger.warning("Invalid Cartesia API key. Returning default voices.")
-                return DEFAULT_VOICES
-            # For other errors, return default voices instead of raising
-            logger.warning("Returning default voices due to API error")
-            return DEFAULT_VOICES
-        
-        data = response.json()
-        voices = data.get("voices", [])
-        
-        # If API returns empty list, use default voices
-        if not voices or len(voices) == 0:
-            logger.warning("Cartesia API returned 0 voices. Using default voices.")
-            return DEFAULT_VOICES
-        
-        # Format voice data
-        voice_list = []
-        for voice in voices:
-            voice_data = {
-                "voice_id": voice.get("id"),
-                "name": voice.get("name", "Unknown"),
-                "description": voice.get("description", ""),
-                "preview_url": voice.get("preview_url"),
-            }
-            voice_list.append(voice_data)
-        
-        # Sort by name
-        voice_list.sort(key=lambda v: v["name"].lower())
-        
-        logger.info(f"Retrieved {len(voice_list)} voices from Cartesia")
-        return voice_list
-        
-    except Exception as e:
-        logger.warning(f"Failed to fetch Cartesia voices: {str(e)}. Returning default voices.")
-        return DEFAULT_VOICES
+    except requests.RequestException as e:
+        raise Exception(f"Failed to fetch Cartesia voices: {str(e)}")
+    
+    if response.status_code == 401:
+        raise ConfigurationError("Invalid Cartesia API key. Please check CARTESIA_API_KEY in your .env file.")
+    if response.status_code != 200:
+        raise Exception(f"Cartesia API returned status {response.status_code}: {response.text}")
+    
+    voices = response.json().get("voices", [])
+    if not voices:
+        raise Exception("Cartesia API returned 0 voices")
+    
+    # Format voice data
+    voice_list = []
+    for voice in voices:
+        voice_data = {
+            "voice_id": voice.get("id"),
+            "name": voice.get("name", "Unknown"),
+            "description": voice.get("description", ""),
+            "preview_url": voice.get("preview_url"),
+        }
+        voice_list.append(voice_data)
+    
+    # Sort by name
+    voice_list.sort(key=lambda v: v["name"].lower())
+    
+    logger.info(f"Retrieved {len(voice_list)} voices from Cartesia")
+    return voice_list
+
+
+# Voice catalog cache (TTL + stale-while-revalidate, see app.services.catalog_cache)
+voice_catalog = CatalogCache(
+    "cartesia_voices",
+    get_available_voices,
+    ttl=settings.voice_catalog_ttl_seconds,
+    stale_ttl=settings.voice_catalog_stale_seconds,
+)
 
 
 def get_available_models() -> List[Dict]:
@@ -270,6 +780,15 @@ def get_available_models() -> List[Dict]:
     return CARTESIA_MODELS
 
 
+def get_output_format_options() -> Dict:
+    """Output format options (containers per model are listed with the models)."""
+    return {
+        "encodings": CARTESIA_PCM_ENCODINGS,
+        "sample_rates": CARTESIA_SAMPLE_RATES,
+        "mp3_bit_rates": CARTESIA_MP3_BIT_RATES,
+    }
+
+
 def get_available_languages() -> List[Dict]:
     """Get list of available languages."""
     return CARTESIA_LANGUAGES
@@ -0,0 +1,119 @@
+"""Cache for provider catalogs (voices) with stale-while-revalidate."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, NamedTuple, Optional
+from app.utils.concurrency import SingleFlight, run_in_provider_executor
+from app.services.metrics import catalog_fetch_duration
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogEntry(NamedTuple):
+    """A cached catalog value with its validator."""
+    value: Any
+    etag: str
+    fetched_at: float  # time.monotonic() of the fetch
+
+
+def catalog_etag(value: Any) -> str:
+    """Return a strong ETag for a JSON-serializable catalog value."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+class CatalogCache:
+    """
+    Per-provider catalog cache with TTL and stale-while-revalidate.
+
+    - Fresh entries (younger than ttl) are returned directly.
+    - Stale entries (up to ttl + stale_ttl old) are returned immediately
+      while a background refresh runs.
+    - Missing or expired entries are fetched before returning.
+
+    Concurrent fetches are coalesced, so a burst of requests on a cold or
+    expired cache makes a single upstream call. The loader is a blocking
+    function and runs in the provider thread pool. If a background refresh
+    fails the stale entry keeps being served until it expires.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        ttl: float,
+        stale_ttl: float,
+    ):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entry: Optional[CatalogEntry] = None
+        self._flight = SingleFlight()
+
+    async def get(self) -> CatalogEntry:
+        """Return the catalog, fetching or revalidating as needed."""
+        entry = self._entry
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                return entry
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background()
+                return entry
+        return await self._flight.do(self.name, self._refresh)
+
+    def last(self) -> Optional[CatalogEntry]:
+        """Return the last fetched entry, however old (None if never fetched)."""
+        return self._entry
+
+    def invalidate(self) -> None:
+        """Drop the cached entry so the next get() fetches again."""
+        self._entry = None
+
+    async def _refresh(self) -> CatalogEntry:
+        started = time.perf_counter()
+        try:
+            value = await run_in_provider_executor(self.loader)
+        except BaseException:
+            catalog_fetch_duration.observe(time.perf_counter() - started, self.name, "error")
+            raise
+        catalog_fetch_duration.observe(time.perf_counter() - started, self.name, "ok")
+        entry = CatalogEntry(value=value, etag=catalog_etag(value), fetched_at=time.monotonic())
+        self._entry = entry
+        logger.info(f"Refreshed {self.name} catalog in {time.perf_counter() - started:.3f}s")
+        return entry
+
+    def _refresh_in_background(self) -> None:
+        if self._flight.in_flight(self.name):
+            return
+        task = asyncio.ensure_future(self._flight.do(self.name, self._refresh))
+        task.add_done_callback(self._log_background_failure)
+
+    def _log_background_failure(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                f"Background refresh of {self.name} catalog failed, serving stale data: "
+                f"{task.exception()}"
+            )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return whether an If-None-Match header matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    strip_weak = lambda tag: tag[2:] if tag.startswith("W/") else tag
+    return strip_weak(etag) in {strip_weak(candidate) for candidate in candidates}
+
+
+def catalog_headers(entry: CatalogEntry) -> dict:
+    """Response headers that let browsers revalidate a catalog with 304s."""
+    return {
+        "ETag": entry.etag,
+        "Cache-Control": "private, no-cache",
+    }
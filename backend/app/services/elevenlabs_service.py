@@ -1,8 +1,15 @@
 """ElevenLabs TTS service integration."""
-from elevenlabs.client import ElevenLabs
-from elevenlabs import VoiceSettings
 from app.config import get_settings, ConfigurationError
-from typing import Optional
+from app.utils.concurrency import run_in_provider_executor, iterate_in_provider_executor, SingleFlight, StreamFanout
+from app.services.synthesis_cache import get_synthesis_cache, synthesis_cache_key
+from app.services.catalog_cache import CatalogCache
+from app.services.rate_limiter import get_rate_limiter, is_rate_limit_error
+from app.services.metrics import coalesced_requests, collect_audio, count_provider_error, observe_synthesis
+from app.services.long_text import split_text, synthesize_in_order
+from app.utils.audio import concat_mp3, mp3_audio_frames
+from contextlib import aclosing
+from typing import Optional, Dict, Tuple, AsyncIterator, BinaryIO, Union
+import asyncio
 import time
 import logging
 
@@ -10,7 +17,12 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Initialize ElevenLabs client (lazy initialization to avoid import-time issues)
+# Identical in-flight syntheses (same cache key) share one provider call
+_generate_flight = SingleFlight()
+_stream_fanout = StreamFanout()
+
+# Initialize ElevenLabs client (lazy initialization; the SDK is imported on first use
+# to keep app startup fast)
 elevenlabs_client = None
 
 def get_elevenlabs_client():
@@ -18,13 +30,218 @@ def get_elevenlabs_client():
     global elevenlabs_client
     if elevenlabs_client is None:
         if settings.elevenlabs_api_key:
-            elevenlabs_client = ElevenLabs(api_key=settings.elevenlabs_api_key)
+            from elevenlabs.client import ElevenLabs
+            elevenlabs_client = ElevenLabs(
+                api_key=settings.elevenlabs_api_key,
+                base_url=settings.elevenlabs_base_url or None,
+            )
             logger.info("ElevenLabs client initialized successfully")
         else:
             logger.warning("ElevenLabs API key not set. TTS functionality will not work.")
     return elevenlabs_client
 
 
+# Language codes supported by the multilingual models (Multilingual v2 / Flash v2.5)
+ELEVENLABS_LANGUAGES = [
+    "en", "ja", "zh", "de", "hi", "fr", "ko", "pt", "it", "es", "id", "nl",
+    "tr", "fil", "pl", "sv", "bg", "ro", "ar", "cs", "el", "fi", "hr", "ms",
+    "sk", "da", "ta", "uk", "ru", "hu", "no", "vi",
+]
+
+
+def _prepare_convert_request(
+    text: str,
+    voice_id: Optional[str] = None,
+    stability: Optional[float] = None,
+    similarity_boost: Optional[float] = None,
+    style: Optional[float] = None,
+    use_speaker_boost: Optional[bool] = None,
+    model_id: Optional[str] = None,
+    language: Optional[str] = None
+) -> Tuple[object, str, Dict]:
+    """
+    Validate inputs and build the arguments for text_to_speech.convert().
+    
+    Returns:
+        Tuple of (client, voice_id, convert parameters)
+    
+    Raises:
+        ConfigurationError: If API key is not set
+        ValueError: If text is empty
+    """
+    client = get_elevenlabs_client()
+    if not settings.elevenlabs_api_key or client is None:
+        raise ConfigurationError(
+            "ELEVENLABS_API_KEY is not set. Please set it in your .env file. "
+            "Get your API key from https://elevenlabs.io/"
+        )
+    
+    if not text or len(text.strip()) == 0:
+        raise ValueError("Text cannot be empty")
+    
+    # Configure voice settings with defaults based on ElevenLabs best practices
+    # Reference: https://elevenlabs.io/docs/product-guides/playground/text-to-speech
+    # Default: stability=0.5, similarity=0.75, style=0.0, speaker_boost=True
+    from elevenlabs import VoiceSettings
+    voice_settings = VoiceSettings(
+        stability=stability if stability is not None else 0.5,
+        similarity_boost=similarity_boost if similarity_boost is not None else 0.75,
+        style=style if style is not None else 0.0,
+        use_speaker_boost=use_speaker_boost if use_speaker_boost is not None else True
+    )
+    
+    # Determine model_id - use provided or default to v3 (most expressive)
+    # Note: v3 is alpha and may have higher latency, but offers best quality
+    selected_model = model_id or "eleven_v3"
+    
+    # Get voice_id (use default if not provided)
+    selected_voice_id = voice_id or "JBFqnCBsd6RMkjVDRZzb"  # Default voice from docs
+    
+    # Build convert parameters according to ElevenLabs SDK v3 signature:
+    # convert(voice_id: str, *, text: str, model_id: Optional[str], 
+    #         voice_settings: Optional[VoiceSettings], output_format: Optional[str],
+    #         language_code: Optional[str], ...)
+    convert_params = {
+        "text": text,
+        "model_id": selected_model,
+        "output_format": "mp3_44100_128",
+        "voice_settings": voice_settings
+    }
+    
+    # Add language_code if provided (note: parameter is language_code, not language)
+    if language:
+        convert_params["language_code"] = language
+    
+    return client, selected_voice_id, convert_params
+
+
+def _synthesis_cache_key(voice_id: str, convert_params: Dict) -> str:
+    """Build the synthesis cache key from resolved convert() arguments."""
+    voice_settings = convert_params["voice_settings"]
+    return synthesis_cache_key(
+        provider="elevenlabs",
+        model_id=convert_params["model_id"],
+        voice_id=voice_id,
+        language=convert_params.get("language_code"),
+        output_format=convert_params["output_format"],
+        voice_settings={
+            "stability": voice_settings.stability,
+            "similarity_boost": voice_settings.similarity_boost,
+            "style": voice_settings.style,
+            "use_speaker_boost": voice_settings.use_speaker_boost,
+        },
+        text=convert_params["text"],
+    )
+
+
+def _convert_once(client, voice_id: str, convert_params: Dict) -> bytes:
+    """Run a single blocking convert() call and collect the audio bytes."""
+    # Generate audio using the latest ElevenLabs API
+    # Reference: https://elevenlabs.io/docs/quickstart
+    # The convert() method returns a generator that yields audio chunks
+    started = time.perf_counter()
+    audio_generator = client.text_to_speech.convert(voice_id, **convert_params)
+    
+    # Collect all audio chunks from the generator into bytes
+    return collect_audio("elevenlabs", convert_params.get("model_id"), audio_generator, started)
+
+
+def _get_retry_delay(e: Exception, attempt: int, max_retries: int) -> float:
+    """
+    Decide how to handle a failed generation attempt.
+    
+    Args:
+        e: Exception raised by the attempt
+        attempt: Zero-based attempt number
+        max_retries: Maximum number of retry attempts
+    
+    Returns:
+        Seconds to wait before the next attempt
+    
+    Raises:
+        ConfigurationError: For errors that should not be retried
+        Exception: If this was the last attempt
+    """
+    error_msg = str(e)
+    
+    # Handle abuse detection specifically - don't retry
+    if "detected_unusual_activity" in error_msg.lower():
+        raise ConfigurationError(
+            "ElevenLabs Free Tier disabled due to unusual activity detected.\n\n"
+            "Quick fixes:\n"
+            "• Disable VPN/Proxy (Free Tier doesn't work with VPNs)\n"
+            "• Upgrade to Paid Plan ($5/month) - removes restrictions\n"
+            "• Contact support: https://elevenlabs.io/help\n\n"
+            "Common causes: VPN/Proxy usage, multiple free accounts, or rate limiting."
+        )
+    
+    # Don't retry on certain errors
+    if "401" in error_msg or "unauthorized" in error_msg.lower():
+        # Try to extract more details from the exception
+        error_details = error_msg
+        if hasattr(e, 'response'):
+            try:
+                if hasattr(e.response, 'text'):
+                    import json
+                    try:
+                        error_data = json.loads(e.response.text)
+                        if 'detail' in error_data:
+                            error_details = str(error_data['detail'])
+                        elif isinstance(error_data, dict):
+                            error_details = str(error_data)
+                    except:
+                        error_details = e.response.text
+                elif hasattr(e.response, 'json'):
+                    error_data = e.response.json()
+                    if 'detail' in error_data:
+                        error_details = str(error_data['detail'])
+            except:
+                pass
+        
+        # Check for other unusual activity indicators
+        if "unusual" in error_details.lower() or "abuse" in error_details.lower() or "free tier" in error_details.lower() or "temporarily unavailable" in error_details.lower() or "service" in error_details.lower():
+            raise ConfigurationError(
+                "ElevenLabs service temporarily unavailable.\n\n"
+                "This may be due to:\n"
+                "1. Using a VPN/Proxy (Free Tier doesn't work with VPNs)\n"
+                "2. Multiple free accounts from the same IP\n"
+                "3. Rate limiting or abuse detection\n"
+                "4. Service maintenance or temporary outage\n\n"
+                "Solutions:\n"
+                "• Disable VPN/Proxy if using one\n"
+                "• Wait a few minutes and try again\n"
+                "• Consider upgrading to a Paid Plan\n"
+                "• Contact ElevenLabs support: https://elevenlabs.io/help"
+            )
+        else:
+            raise ConfigurationError(
+                f"ElevenLabs service temporarily unavailable.\n\n"
+                f"Please check your ELEVENLABS_API_KEY in .env file.\n"
+                f"Get your API key from https://elevenlabs.io/\n\n"
+                f"If this persists, the service may be temporarily unavailable or your API key may need verification."
+            )
+    
+    if is_rate_limit_error(e):
+        wait_time = (attempt + 1) * 2
+        logger.warning(
+            f"Rate limit hit. Waiting {wait_time} seconds before retry..."
+        )
+        return wait_time
+    
+    if attempt < max_retries - 1:
+        wait_time = (attempt + 1) * 1
+        logger.warning(
+            f"TTS generation failed (attempt {attempt + 1}/{max_retries}). "
+            f"Retrying in {wait_time} seconds... Error: {error_msg}"
+        )
+        return wait_time
+    
+    logger.error(f"TTS generation failed after {max_retries} attempts")
+    raise Exception(
+        f"Failed to generate TTS audio after {max_retries} attempts: {error_msg}"
+    )
+
+
 def generate_tts_audio(
     text: str, 
     voice_id: Optional[str] = None, 
@@ -34,11 +251,14 @@ def generate_tts_audio(
     style: Optional[float] = None,
     use_speaker_boost: Optional[bool] = None,
     model_id: Optional[str] = None,
-    language: Optional[str] = None
+    language: Optional[str] = None,
+    bypass_cache: bool = False
 ) -> bytes:
     """
     Generate TTS audio using ElevenLabs API with retry logic.
     
+    This call blocks; from async code use generate_tts_audio_async().
+    
     Supports ElevenLabs v3 Audio Tags for enhanced control:
     - Use square brackets [] for emotional and vocal control: [excited], [whispers], [laughs]
     - Place tags before text: [whispers] Hello there
@@ -59,6 +279,7 @@ def generate_tts_audio(
         use_speaker_boost: Boost similarity to original speaker. Default: True
         model_id: Model to use (eleven_v3, eleven_multilingual_v2, eleven_monolingual_v1, eleven_flash_v2_5, eleven_turbo_v2_5, eleven_turbo_v2). Default: eleven_v3
         language: Language code (e.g., 'en', 'es', 'fr'). Optional, model will auto-detect if not provided. Note: Passed as 'language_code' to API
+        bypass_cache: Skip the synthesis cache lookup (the fresh result is still cached)
     
     Returns:
         Audio bytes
@@ -67,152 +288,351 @@ def generate_tts_audio(
         ConfigurationError: If API key is not set
         Exception: If generation fails after retries
     """
-    client = get_elevenlabs_client()
-    if not settings.elevenlabs_api_key or client is None:
-        raise ConfigurationError(
-            "ELEVENLABS_API_KEY is not set. Please set it in your .env file. "
-            "Get your API key from https://elevenlabs.io/"
-        )
+    client, selected_voice_id, convert_params = _prepare_convert_request(
+        text, voice_id, stability, similarity_boost, style,
+        use_speaker_boost, model_id, language
+    )
     
-    if not text or len(text.strip()) == 0:
-        raise ValueError("Text cannot be empty")
+    cache = get_synthesis_cache()
+    cache_key = _synthesis_cache_key(selected_voice_id, convert_params) if cache else None
+    if cache and not bypass_cache:
+        audio = cache.get(cache_key)
+        if audio is not None:
+            logger.info("TTS audio served from synthesis cache")
+            return audio
     
-    # Configure voice settings with defaults based on ElevenLabs best practices
-    # Reference: https://elevenlabs.io/docs/product-guides/playground/text-to-speech
-    # Default: stability=0.5, similarity=0.75, style=0.0, speaker_boost=True
-    voice_settings = VoiceSettings(
-        stability=stability if stability is not None else 0.5,
-        similarity_boost=similarity_boost if similarity_boost is not None else 0.75,
-        style=style if style is not None else 0.0,
-        use_speaker_boost=use_speaker_boost if use_speaker_boost is not None else True
+    last_error = None
+    for attempt in range(max_retries):
+        try:
+            logger.info(f"Generating TTS audio (attempt {attempt + 1}/{max_retries})")
+            audio = _convert_once(client, selected_voice_id, convert_params)
+            logger.info("TTS audio generated successfully")
+            if cache:
+                cache.put(cache_key, audio)
+            return audio
+        except Exception as e:
+            last_error = e
+            count_provider_error("elevenlabs", e, attempt, max_retries)
+            time.sleep(_get_retry_delay(e, attempt, max_retries))
+    
+    # Should not reach here, but just in case
+    raise Exception(f"Failed to generate TTS audio: {str(last_error)}")
+
+
+async def generate_tts_audio_async(
+    text: str, 
+    voice_id: Optional[str] = None, 
+    max_retries: int = 3,
+    stability: Optional[float] = None,
+    similarity_boost: Optional[float] = None,
+    style: Optional[float] = None,
+    use_speaker_boost: Optional[bool] = None,
+    model_id: Optional[str] = None,
+    language: Optional[str] = None,
+    bypass_cache: bool = False,
+    deadline: Optional[float] = None
+) -> bytes:
+    """
+    Async variant of generate_tts_audio() for use in request handlers.
+    
+    The blocking SDK call runs in the bounded provider thread pool and retry
+    backoff uses asyncio.sleep(), so a slow or rate-limited generation never
+    stalls the event loop. Arguments, return value and errors are the same
+    as generate_tts_audio(). Cache hits return without a provider call.
+    
+    Every provider call first takes a slot from the ElevenLabs rate limiter.
+    deadline (a time.monotonic() value) bounds that wait: ProviderBusyError
+    is raised as soon as a slot cannot be had in time.
+    
+    Texts longer than ELEVENLABS_CHUNK_CHARS are split at sentence
+    boundaries; the chunks are synthesized concurrently (each retried and
+    cached on its own) and their MP3 frames joined in order.
+    
+    Concurrent calls with the same cache key share one provider call (and
+    its retries, under the first caller's deadline) unless bypass_cache is
+    set. A caller that is cancelled leaves the call running for the others.
+    """
+    client, selected_voice_id, convert_params = _prepare_convert_request(
+        text, voice_id, stability, similarity_boost, style,
+        use_speaker_boost, model_id, language
     )
     
+    # Long text: synthesize sentence chunks in parallel and join the MP3 frames
+    chunks = split_text(text, settings.elevenlabs_chunk_chars)
+    if len(chunks) > 1:
+        parts = synthesize_in_order(
+            chunks,
+            lambda chunk: generate_tts_audio_async(
+                chunk, voice_id, max_retries, stability, similarity_boost, style,
+                use_speaker_boost, model_id, language, bypass_cache, deadline
+            ),
+            settings.long_text_parallelism,
+        )
+        async with aclosing(parts):
+            return concat_mp3([part async for part in parts])
+    
+    cache = get_synthesis_cache()
+    cache_key = _synthesis_cache_key(selected_voice_id, convert_params)
+    if bypass_cache:
+        return await _convert_with_retries(client, selected_voice_id, convert_params, cache_key, max_retries, deadline)
+    if cache:
+        audio = await cache.get_async(cache_key)
+        if audio is not None:
+            logger.info("TTS audio served from synthesis cache")
+            return audio
+    
+    if _generate_flight.in_flight(cache_key):
+        coalesced_requests.inc("elevenlabs", "generate")
+    return await _generate_flight.do(
+        cache_key,
+        lambda: _convert_with_retries(client, selected_voice_id, convert_params, cache_key, max_retries, deadline),
+    )
+
+
+async def _convert_with_retries(
+    client,
+    voice_id: str,
+    convert_params: Dict,
+    cache_key: str,
+    max_retries: int,
+    deadline: Optional[float]
+) -> bytes:
+    """Run convert() with rate limiting and retries, and cache the audio."""
+    cache = get_synthesis_cache()
+    limiter = get_rate_limiter("elevenlabs")
     last_error = None
     for attempt in range(max_retries):
+        # Wait for an outbound slot (raises ProviderBusyError past the deadline)
+        await limiter.acquire(deadline)
         try:
             logger.info(f"Generating TTS audio (attempt {attempt + 1}/{max_retries})")
-            
-            # Generate audio using the latest ElevenLabs API
-            # Reference: https://elevenlabs.io/docs/quickstart
-            # The convert() method returns a generator that yields audio chunks
-            
-            # Determine model_id - use provided or default to v3 (most expressive)
-            # Note: v3 is alpha and may have higher latency, but offers best quality
-            selected_model = model_id or "eleven_v3"
-            
-            # Get voice_id (use default if not provided)
-            selected_voice_id = voice_id or "JBFqnCBsd6RMkjVDRZzb"  # Default voice from docs
-            
-            # Build convert parameters according to ElevenLabs SDK v3 signature:
-            # convert(voice_id: str, *, text: str, model_id: Optional[str], 
-            #         voice_settings: Optional[VoiceSettings], output_format: Optional[str],
-            #         language_code: Optional[str], ...)
-            convert_params = {
-                "text": text,
-                "model_id": selected_model,
-                "output_format": "mp3_44100_128",
-                "voice_settings": voice_settings
-            }
-            
-            # Add language_code if provided (note: parameter is language_code, not language)
-            if language:
-                convert_params["language_code"] = language
-            
-            # Call convert with voice_id as positional argument (first parameter)
-            audio_generator = client.text_to_speech.convert(selected_voice_id, **convert_params)
-            
-            # Collect all audio chunks from the generator into bytes
-            audio = b"".join(audio_generator)
-            
+            audio = await run_in_provider_executor(
+                _convert_once, client, voice_id, convert_params
+            )
             logger.info("TTS audio generated successfully")
+            if cache:
+                await cache.put_async(cache_key, audio)
             return audio
-            
         except Exception as e:
             last_error = e
-            error_msg = str(e)
-            
-            # Handle abuse detection specifically - don't retry
-            if "detected_unusual_activity" in error_msg.lower():
-                raise ConfigurationError(
-                    "ElevenLabs Free Tier disabled due to unusual activity detected.\n\n"
-                    "Quick fixes:\n"
-                    "• Disable VPN/Proxy (Free Tier doesn't work with VPNs)\n"
-                    "• Upgrade to Paid Plan ($5/month) - removes restrictions\n"
-                    "• Contact support: https://elevenlabs.io/help\n\n"
-                    "Common causes: VPN/Proxy usage, multiple free accounts, or rate limiting."
-                )
-            
-            # Don't retry on certain errors
-            if "401" in error_msg or "unauthorized" in error_msg.lower():
-                # Try to extract more details from the exception
-                error_details = error_msg
-                if hasattr(e, 'response'):
-                    try:
-                        if hasattr(e.response, 'text'):
-                            import json
-                            try:
-                                error_data = json.loads(e.response.text)
-                                if 'detail' in error_data:
-                                    error_details = str(error_data['detail'])
-                                elif isinstance(error_data, dict):
-                                    error_details = str(error_data)
-                            except:
-                                error_details = e.response.text
-                        elif hasattr(e.response, 'json'):
-                            error_data = e.response.json()
-                            if 'detail' in error_data:
-                                error_details = str(error_data['detail'])
-                    except:
-                        pass
-                
-                # Check for other unusual activity indicators
-                if "unusual" in error_details.lower() or "abuse" in error_details.lower() or "free tier" in error_details.lower() or "temporarily unavailable" in error_details.lower() or "service" in error_details.lower():
-                    raise ConfigurationError(
-                        "ElevenLabs service temporarily unavailable.\n\n"
-                        "This may be due to:\n"
-                        "1. Using a VPN/Proxy (Free Tier doesn't work with VPNs)\n"
-                        "2. Multiple free accounts from the same IP\n"
-                        "3. Rate limiting or abuse detection\n"
-                        "4. Service maintenance or temporary outage\n\n"
-                        "Solutions:\n"
-                        "• Disable VPN/Proxy if using one\n"
-                        "• Wait a few minutes and try again\n"
-                        "• Consider upgrading to a Paid Plan\n"
-                        "• Contact ElevenLabs support: https://elevenlabs.io/help"
-                    )
-                else:
-                    raise ConfigurationError(
-                        f"ElevenLabs service temporarily unavailable.\n\n"
-                        f"Please check your ELEVENLABS_API_KEY in .env file.\n"
-                        f"Get your API key from https://elevenlabs.io/\n\n"
-                        f"If this persists, the service may be temporarily unavailable or your API key may need verification."
-                    )
-            
-            if "429" in error_msg or "rate limit" in error_msg.lower():
-                wait_time = (attempt + 1) * 2
-                logger.warning(
-                    f"Rate limit hit. Waiting {wait_time} seconds before retry..."
-                )
-                time.sleep(wait_time)
-                continue
-            
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 1
-                logger.warning(
-                    f"TTS generation failed (attempt {attempt + 1}/{max_retries}). "
-                    f"Retrying in {wait_time} seconds... Error: {error_msg}"
-                )
-                time.sleep(wait_time)
+            count_provider_error("elevenlabs", e, attempt, max_retries)
+            delay = _get_retry_delay(e, attempt, max_retries)
+            if is_rate_limit_error(e) and limiter.enabled:
+                # The next acquire() waits out the penalty with every other queued call
+                limiter.penalize(delay)
             else:
-                logger.error(f"TTS generation failed after {max_retries} attempts")
-                raise Exception(
-                    f"Failed to generate TTS audio after {max_retries} attempts: {error_msg}"
-                )
+                await asyncio.sleep(delay)
     
-    # Should not reach here, but just in case
     raise Exception(f"Failed to generate TTS audio: {str(last_error)}")
 
 
+async def stream_tts_audio_async(
+    text: str, 
+    voice_id: Optional[str] = None, 
+    max_retries: int = 3,
+    stability: Optional[float] = None,
+    similarity_boost: Optional[float] = None,
+    style: Optional[float] = None,
+    use_speaker_boost: Optional[bool] = None,
+    model_id: Optional[str] = None,
+    language: Optional[str] = None,
+    bypass_cache: bool = False,
+    deadline: Optional[float] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream TTS audio (MP3) chunks from ElevenLabs as they are produced.
+    
+    Uses the text_to_speech.stream() endpoint. Failures before the first
+    chunk are retried like generate_tts_audio(); once audio has been
+    yielded a failure is raised immediately, since retrying would repeat
+    audio the caller already received. Arguments match generate_tts_audio();
+    deadline is handled as in generate_tts_audio_async().
+    
+    Long texts are chunked like generate_tts_audio_async(); the first
+    chunk is sent as soon as it is ready while later chunks are generated.
+    
+    Concurrent streams with the same cache key share one provider stream
+    unless bypass_cache is set: a stream joining late first receives the
+    chunks already produced. The provider stream is closed once every
+    consumer has stopped.
+    
+    Yields:
+        MP3 audio chunks
+    """
+    client, selected_voice_id, convert_params = _prepare_convert_request(
+        text, voice_id, stability, similarity_boost, style,
+        use_speaker_boost, model_id, language
+    )
+    
+    # Long text: stream each chunk's frames as soon as it (and all before it) is ready
+    chunks = split_text(text, settings.elevenlabs_chunk_chars)
+    if len(chunks) > 1:
+        parts = synthesize_in_order(
+            chunks,
+            lambda chunk: generate_tts_audio_async(
+                chunk, voice_id, max_retries, stability, similarity_boost, style,
+                use_speaker_boost, model_id, language, bypass_cache, deadline
+            ),
+            settings.long_text_parallelism,
+        )
+        async with aclosing(parts):
+            first = True
+            async for part in parts:
+                yield concat_mp3([part]) if first else mp3_audio_frames(part)
+                first = False
+        return
+    
+    cache = get_synthesis_cache()
+    cache_key = _synthesis_cache_key(selected_voice_id, convert_params)
+    if cache and not bypass_cache:
+        audio = await cache.get_async(cache_key)
+        if audio is not None:
+            logger.info("TTS audio stream served from synthesis cache")
+            yield audio
+            return
+    
+    if bypass_cache:
+        audio_chunks = _stream_with_retries(client, selected_voice_id, convert_params, cache_key, max_retries, deadline)
+    else:
+        if _stream_fanout.in_flight(cache_key):
+            coalesced_requests.inc("elevenlabs", "stream")
+        audio_chunks = _stream_fanout.stream(
+            cache_key,
+            lambda: _stream_with_retries(client, selected_voice_id, convert_params, cache_key, max_retries, deadline),
+        )
+    async with aclosing(audio_chunks):
+        async for chunk in audio_chunks:
+            yield chunk
+
+
+async def _stream_with_retries(
+    client,
+    voice_id: str,
+    convert_params: Dict,
+    cache_key: str,
+    max_retries: int,
+    deadline: Optional[float]
+) -> AsyncIterator[bytes]:
+    """Run stream() with rate limiting and retries, and cache the audio."""
+    cache = get_synthesis_cache()
+    limiter = get_rate_limiter("elevenlabs")
+    last_error = None
+    for attempt in range(max_retries):
+        # Wait for an outbound slot (raises ProviderBusyError past the deadline)
+        await limiter.acquire(deadline)
+        started = False
+        collected = []
+        call_started = time.perf_counter()
+        first_chunk_seconds = None
+        try:
+            logger.info(f"Streaming TTS audio (attempt {attempt + 1}/{max_retries})")
+            chunks = iterate_in_provider_executor(
+                client.text_to_speech.stream, voice_id, **convert_params
+            )
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if not started:
+                        first_chunk_seconds = time.perf_counter() - call_started
+                    started = True
+                    collected.append(chunk)
+                    yield chunk
+            logger.info("TTS audio stream completed")
+            observe_synthesis(
+                "elevenlabs", convert_params.get("model_id"), "stream",
+                time.perf_counter() - call_started, sum(len(chunk) for chunk in collected), first_chunk_seconds
+            )
+            if cache:
+                await cache.put_async(cache_key, b"".join(collected))
+            return
+        except Exception as e:
+            if started:
+                raise
+            last_error = e
+            count_provider_error("elevenlabs", e, attempt, max_retries)
+            delay = _get_retry_delay(e, attempt, max_retries)
+            if is_rate_limit_error(e) and limiter.enabled:
+                # The next acquire() waits out the penalty with every other queued call
+                limiter.penalize(delay)
+            else:
+                await asyncio.sleep(delay)
+    
+    raise Exception(f"Failed to stream TTS audio: {str(last_error)}")
+
+
+def _transcribe_once(client, audio: Union[bytes, BinaryIO], filename: str, mime_type: str, params: Dict):
+    """Run one Scribe request."""
+    if not isinstance(audio, bytes):
+        audio.seek(0)
+    return client.speech_to_text.convert(file=(filename, audio, mime_type), **params)
+
+
+async def transcribe_audio_async(
+    audio: Union[bytes, BinaryIO],
+    filename: str = "audio.wav",
+    mime_type: str = "audio/wav",
+    language: Optional[str] = None,
+    max_retries: int = 3,
+    deadline: Optional[float] = None
+):
+    """
+    Transcribe audio with ElevenLabs Scribe.
+    
+    Like generate_tts_audio_async(), the blocking SDK call runs in the
+    provider thread pool and every attempt takes a slot from the
+    ElevenLabs rate limiter first (deadline bounds that wait).
+    
+    Args:
+        audio: Audio file contents, or a seekable file object (streamed
+            to the API and rewound for retries)
+        filename: File name sent with the upload
+        mime_type: MIME type of the audio
+        language: ISO language code, or None to detect the language
+        max_retries: Maximum number of attempts
+        deadline: time.monotonic() value after which no slot is waited for
+    
+    Returns:
+        The Scribe response (text, language_code, words with start/end times)
+    
+    Raises:
+        ConfigurationError: If API key is not set or the error is permanent
+        ProviderBusyError: If no rate limiter slot is available by deadline
+        Exception: If all attempts fail
+    """
+    client = get_elevenlabs_client()
+    if not settings.elevenlabs_api_key or client is None:
+        raise ConfigurationError(
+            "ELEVENLABS_API_KEY is not set. Please set it in your .env file. "
+            "Get your API key from https://elevenlabs.io/"
+        )
+    
+    params = {
+        "model_id": settings.stt_model_id,
+        "timestamps_granularity": "word",
+        "tag_audio_events": False,
+    }
+    if language:
+        params["language_code"] = language
+    
+    limiter = get_rate_limiter("elevenlabs")
+    last_error = None
+    for attempt in range(max_retries):
+        await limiter.acquire(deadline)
+        try:
+            return await run_in_provider_executor(
+                _transcribe_once, client, audio, filename, mime_type, params
+            )
+        except Exception as e:
+            last_error = e
+            count_provider_error("elevenlabs", e, attempt, max_retries)
+            delay = _get_retry_delay(e, attempt, max_retries)
+            if is_rate_limit_error(e) and limiter.enabled:
+                limiter.penalize(delay)
+            else:
+                await asyncio.sleep(delay)
+    
+    raise Exception(f"Failed to transcribe audio: {str(last_error)}")
+
+
 def get_available_voices():
     """
     Get list of available voices from ElevenLabs API.
@@ -314,3 +734,11 @@ def get_available_voices():
         
         raise Exception(f"Failed to fetch voices: {error_msg}")
 
+
+# Voice catalog cache (TTL + stale-while-revalidate, see app.services.catalog_cache)
+voice_catalog = CatalogCache(
+    "elevenlabs_voices",
+    get_available_voices,
+    ttl=settings.voice_catalog_ttl_seconds,
+    stale_ttl=settings.voice_catalog_stale_seconds,
+)
@@ -0,0 +1,220 @@
+"""
+Background health prober with cached results.
+
+The database and each provider are checked on an interval with cheap
+calls (SELECT 1, ElevenLabs GET /v1/models, Cartesia GET /) and the
+results are kept in memory with their timestamps, so /health,
+/health/live and /health/ready answer without any I/O and aggressive
+probing costs nothing upstream.
+
+Provider generation outcomes are also recorded passively from the real
+traffic (record_generation), so the last generation error is reported
+without making test generations.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.config import get_settings
+from app.services.metrics import register_collector
+from app.utils.concurrency import run_in_provider_executor
+
+logger = logging.getLogger(__name__)
+
+# A result older than this many probe intervals counts as stale (prober stuck)
+STALE_INTERVALS = 3
+
+
+class ComponentHealth:
+    """Latest probe result of one dependency, plus its last error."""
+
+    def __init__(self, name: str, interval: float, configured: bool = True):
+        self.name = name
+        self.interval = interval
+        self.configured = configured
+        self.ok: Optional[bool] = None
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_ok_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+        # Outcome of the last real generation (providers only)
+        self.last_generation_at: Optional[float] = None
+        self.last_generation_error: Optional[str] = None
+
+    def record(self, latency: float, error: Optional[BaseException] = None) -> None:
+        now = time.time()
+        self.latency_ms = round(latency * 1000, 1)
+        self.checked_at = now
+        self.ok = error is None
+        if error is None:
+            self.last_ok_at = now
+        else:
+            self.last_error = str(error) or type(error).__name__
+            self.last_error_at = now
+
+    def is_stale(self, now: float) -> bool:
+        return self.checked_at is None or now - self.checked_at > self.interval * STALE_INTERVALS
+
+    def healthy(self, now: float) -> bool:
+        return bool(self.ok) and not self.is_stale(now)
+
+    def status(self, now: float) -> str:
+        if not self.configured:
+            return "not_configured"
+        if self.checked_at is None:
+            return "unknown"
+        if self.is_stale(now):
+            return "stale"
+        return "ok" if self.ok else "error"
+
+    def to_dict(self, now: float) -> Dict:
+        result = {
+            "status": self.status(now),
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at,
+            "age_seconds": round(now - self.checked_at, 1) if self.checked_at is not None else None,
+            "last_ok_at": self.last_ok_at,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+        if self.last_generation_at is not None:
+            result["last_generation_at"] = self.last_generation_at
+            result["last_generation_error"] = self.last_generation_error
+        return result
+
+
+async def check_database() -> None:
+    from sqlalchemy import text
+    from app import database
+
+    if database.async_engine is None:
+        raise RuntimeError("Database not initialized")
+    async with database.async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_elevenlabs() -> None:
+    from app.services.elevenlabs_service import get_elevenlabs_client
+
+    timeout = get_settings().health_probe_timeout_seconds
+    client = get_elevenlabs_client()
+    await run_in_provider_executor(client.models.list, request_options={"timeout_in_seconds": int(timeout) or 1})
+
+
+async def check_cartesia() -> None:
+    from app.services.cartesia_service import get_cartesia_client
+
+    timeout = get_settings().health_probe_timeout_seconds
+    client = get_cartesia_client()
+    await run_in_provider_executor(client.get_status, timeout=timeout)
+
+
+class HealthProber:
+    """
+    Runs each dependency check on its own interval in the background.
+
+    The database gates readiness. Providers are reported (and make the
+    overall status "degraded" when failing) but do not: a provider outage
+    affects every replica alike, so taking them out of rotation would not
+    help.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, ComponentHealth] = {}
+        self._checks: Dict[str, Callable[[], Awaitable[None]]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, check: Callable[[], Awaitable[None]], interval: float, configured: bool = True) -> None:
+        self.components[name] = ComponentHealth(name, interval, configured)
+        self._checks[name] = check
+
+    async def probe(self, name: str) -> None:
+        """Run one check now and record the result."""
+        component = self.components[name]
+        was_ok = component.ok
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._checks[name](), get_settings().health_probe_timeout_seconds)
+        except Exception as e:
+            component.record(time.perf_counter() - started, e)
+            # Log transitions only, not every failed probe of an outage
+            if was_ok is not False:
+                logger.warning(f"Health check {name} failed: {component.last_error}")
+        else:
+            component.record(time.perf_counter() - started)
+            if was_ok is False:
+                logger.info(f"Health check {name} recovered")
+
+    async def _run(self, name: str) -> None:
+        component = self.components[name]
+        while True:
+            await self.probe(name)
+            await asyncio.sleep(component.interval)
+
+    async def start(self) -> None:
+        """Check the database once (so readiness is known at startup), then probe in the background."""
+        if "database" in self.components:
+            await self.probe("database")
+        self._tasks = [
+            asyncio.create_task(self._run(name), name=f"health-{name}")
+            for name, component in self.components.items() if component.configured
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def record_generation(self, provider: str, error: Optional[BaseException] = None) -> None:
+        """Note the outcome of a real generation call (any thread)."""
+        component = self.components.get(provider)
+        if component is None:
+            return
+        component.last_generation_at = time.time()
+        component.last_generation_error = None if error is None else (str(error) or type(error).__name__)
+
+    def is_ready(self) -> bool:
+        database = self.components.get("database")
+        return database is None or database.healthy(time.time())
+
+    def snapshot(self) -> Dict:
+        """Cached status of every component (no I/O)."""
+        now = time.time()
+        ready = self.is_ready()
+        degraded = any(
+            component.configured and not component.healthy(now)
+            for name, component in self.components.items() if name != "database"
+        )
+        return {
+            "status": "not_ready" if not ready else "degraded" if degraded else "ready",
+            "ready": ready,
+            "components": {name: component.to_dict(now) for name, component in self.components.items()},
+        }
+
+
+def create_health_prober() -> HealthProber:
+    """Build the prober for the database and the configured providers."""
+    settings = get_settings()
+    prober = HealthProber()
+    prober.add("database", check_database, settings.health_db_interval_seconds)
+    prober.add("elevenlabs", check_elevenlabs, settings.health_provider_interval_seconds,
+               configured=bool(settings.elevenlabs_api_key))
+    prober.add("cartesia", check_cartesia, settings.health_provider_interval_seconds,
+               configured=bool(settings.cartesia_api_key))
+    return prober
+
+
+health_prober = create_health_prober()
+
+
+def _health_samples():
+    now = time.time()
+    return [
+        ({"component": name}, 1.0 if component.healthy(now) else 0.0)
+        for name, component in health_prober.components.items() if component.configured
+    ]
+
+
+register_collector("health_component_up", "Whether the last health check of a dependency passed", "gauge", _health_samples)
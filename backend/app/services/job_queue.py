@@ -0,0 +1,522 @@
+"""Durable TTS job queue backed by Postgres."""
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import database
+from app.config import ConfigurationError, get_settings
+from app.models.tts_job import (
+    TTSJob,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JOB_FAILED,
+    JOB_FINISHED_STATES,
+)
+from app.services.rate_limiter import ProviderBusyError
+from app.services.tts_history_service import record_tts_request
+
+logger = logging.getLogger(__name__)
+
+
+class JobKind(NamedTuple):
+    """How to run the jobs of one provider."""
+    generate: Callable[..., Awaitable[bytes]]
+    params: Tuple[str, ...]
+    default_voice_id: Optional[str]
+    # Extra generate() arguments, and the MIME type and output format of the audio, from the payload
+    extra_arguments: Callable[[Dict[str, Any]], Dict[str, Any]]
+    mime_type: Callable[[Dict[str, Any]], str]
+    output_format: Callable[[Dict[str, Any]], Optional[Dict]]
+
+
+class ClaimedJob(NamedTuple):
+    """A job leased to this worker; attempt doubles as the lease's fencing token."""
+    id: UUID
+    user_id: UUID
+    provider: str
+    payload: Dict[str, Any]
+    attempt: int
+    max_attempts: int
+
+
+def _job_kinds() -> Dict[str, JobKind]:
+    """Job kinds by provider (provider services are imported on first use)."""
+    from app.services import cartesia_service, elevenlabs_service
+
+    return {
+        "elevenlabs": JobKind(
+            generate=elevenlabs_service.generate_tts_audio_async,
+            params=(
+                "text", "voice_id", "stability", "similarity_boost", "style",
+                "use_speaker_boost", "model_id", "language", "bypass_cache",
+            ),
+            default_voice_id=None,
+            extra_arguments=lambda payload: {},
+            mime_type=lambda payload: "audio/mpeg",
+            output_format=lambda payload: None,
+        ),
+        "cartesia": JobKind(
+            generate=cartesia_service.generate_tts_audio_async,
+            params=(
+                "text", "voice_id", "model_id", "language", "speed", "volume",
+                "emotion", "bypass_cache",
+            ),
+            default_voice_id="cartesia-default",
+            extra_arguments=lambda payload: {
+                "output_format": _cartesia_output_format(payload),
+                "postprocess": _cartesia_postprocess(payload),
+            },
+            mime_type=lambda payload: cartesia_service.output_format_mime_type(_cartesia_output_format(payload)),
+            output_format=_cartesia_output_format,
+        ),
+    }
+
+
+def _cartesia_postprocess(payload: Dict[str, Any]):
+    from app.services.cartesia_service import resolve_postprocess
+
+    return resolve_postprocess(
+        payload.get("container") or "wav",
+        payload.get("encoding"),
+        payload.get("postprocess"),
+    )
+
+
+def _cartesia_output_format(payload: Dict[str, Any]) -> Dict:
+    from app.services.cartesia_service import resolve_output_format
+
+    encoding = payload.get("encoding")
+    if encoding is None and _cartesia_postprocess(payload) is not None:
+        encoding = "pcm_s16le"
+    return resolve_output_format(
+        payload.get("model_id") or "sonic-3",
+        payload.get("container") or "wav",
+        encoding,
+        payload.get("sample_rate") or 44100,
+        payload.get("bit_rate"),
+    )
+
+
+# Long-poll waiters by job (woken as soon as the worker of this process finishes it)
+_job_waiters: Dict[UUID, Set[asyncio.Event]] = {}
+# Worker running in this process, if any (woken when a job is enqueued here)
+_local_worker: Optional["JobWorker"] = None
+
+
+def _notify_job_finished(job_id: UUID) -> None:
+    for event in _job_waiters.get(job_id, ()):
+        event.set()
+
+
+async def enqueue_job(db: AsyncSession, user_id: UUID, provider: str, payload: Dict[str, Any]) -> TTSJob:
+    """
+    Queue a TTS generation for a worker.
+
+    Args:
+        db: Database session
+        user_id: Owner of the job
+        provider: Job kind (elevenlabs, cartesia)
+        payload: Generation request fields (JSON-serializable)
+
+    Returns:
+        The queued TTSJob row
+    """
+    if provider not in _job_kinds():
+        raise ValueError(f"Unknown job provider: {provider}")
+
+    job = TTSJob(
+        user_id=user_id,
+        provider=provider,
+        payload=payload,
+        status=JOB_QUEUED,
+        attempts=0,
+        max_attempts=max(1, get_settings().job_max_attempts),
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    if _local_worker is not None:
+        _local_worker.wakeup()
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: UUID, user_id: UUID) -> Optional[TTSJob]:
+    """Load a user's job with its current state from the database."""
+    result = await db.execute(
+        select(TTSJob).where(
+            TTSJob.id == job_id,
+            TTSJob.user_id == user_id
+        ).execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def wait_for_job(db: AsyncSession, job_id: UUID, user_id: UUID, timeout: float) -> Optional[TTSJob]:
+    """
+    Long-poll a job until it finishes or timeout seconds pass.
+
+    Jobs run by this process wake the waiter as soon as they finish; jobs
+    run by other workers are noticed within JOB_POLL_INTERVAL_SECONDS. The
+    session's connection is returned to the pool between checks.
+
+    Args:
+        db: Database session
+        job_id: Job to wait for
+        user_id: Owner of the job
+        timeout: Maximum seconds to wait
+
+    Returns:
+        The job in its latest state, or None if the user has no such job
+    """
+    deadline = time.monotonic() + timeout
+    poll_interval = get_settings().job_poll_interval_seconds
+    event = asyncio.Event()
+    _job_waiters.setdefault(job_id, set()).add(event)
+    try:
+        while True:
+            job = await get_job(db, job_id, user_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.status in JOB_FINISHED_STATES or remaining <= 0:
+                return job
+            # Release the connection while waiting (objects stay loaded)
+            await db.commit()
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        waiters = _job_waiters.get(job_id)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del _job_waiters[job_id]
+
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    """Backoff before retrying a job after its attempt-th failure (jittered)."""
+    settings = get_settings()
+    delay = min(settings.job_retry_max_seconds, settings.job_retry_base_seconds * 2 ** (attempt - 1))
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    if isinstance(error, ProviderBusyError):
+        delay = max(delay, error.retry_after)
+    return delay
+
+
+def classify_job_error(error: Exception) -> Tuple[bool, int]:
+    """
+    Decide whether a failed job attempt is worth retrying.
+
+    Returns:
+        (retryable, HTTP status code to report if the job fails)
+    """
+    if isinstance(error, ProviderBusyError):
+        return True, error.status_code
+    if isinstance(error, ConfigurationError):
+        # Invalid requests and bad API keys fail the same way on every attempt
+        message = str(error).lower()
+        if "temporarily unavailable" in message:
+            return True, 503
+        return False, 400
+    return True, 500
+
+
+async def claim_jobs(worker_id: str, limit: int, visibility_timeout: float) -> List[ClaimedJob]:
+    """
+    Lease up to limit available jobs to worker_id.
+
+    Queued jobs that are due and running jobs whose lease has expired are
+    claimed in one UPDATE over SELECT ... FOR UPDATE SKIP LOCKED, so any
+    number of workers (in any number of processes or hosts) can claim
+    concurrently without blocking each other or taking the same job. The
+    lease lasts visibility_timeout seconds unless the worker extends it.
+    """
+    claimable = select(TTSJob.id).where(
+        TTSJob.status.in_((JOB_QUEUED, JOB_RUNNING)),
+        TTSJob.available_at <= func.now()
+    ).order_by(TTSJob.available_at).limit(limit).with_for_update(skip_locked=True)
+
+    async with database.AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(TTSJob).where(TTSJob.id.in_(claimable)).values(
+                status=JOB_RUNNING,
+                attempts=TTSJob.attempts + 1,
+                locked_by=worker_id,
+                available_at=func.now() + timedelta(seconds=visibility_timeout),
+                updated_at=func.now(),
+            ).returning(
+                TTSJob.id,
+                TTSJob.user_id,
+                TTSJob.provider,
+                TTSJob.payload,
+                TTSJob.attempts,
+                TTSJob.max_attempts,
+            ).execution_options(synchronize_session=False)
+        )
+        jobs = [ClaimedJob(*row) for row in result.all()]
+        await db.commit()
+    return jobs
+
+
+async def _update_leased_job(job: ClaimedJob, **values) -> bool:
+    """
+    Update a job only while this worker still holds its lease.
+
+    Returns:
+        False if the lease was lost (the job was claimed again after its
+        visibility timeout ran out)
+    """
+    async with database.AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(TTSJob).where(
+                TTSJob.id == job.id,
+                TTSJob.status == JOB_RUNNING,
+                TTSJob.attempts == job.attempt
+            ).values(updated_at=func.now(), **values).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    return result.rowcount == 1
+
+
+async def _complete_job(job: ClaimedJob, kind: JobKind, audio_bytes: bytes) -> bool:
+    """Store the audio in the user's history and mark the job succeeded, atomically."""
+    async with database.AsyncSessionLocal() as db:
+        tts_request = await record_tts_request(
+            db,
+            user_id=job.user_id,
+            text=job.payload["text"],
+            voice_id=job.payload.get("voice_id") or kind.default_voice_id,
+            audio_bytes=audio_bytes,
+            mime_type=kind.mime_type(job.payload),
+            commit=False,
+            output_format=kind.output_format(job.payload)
+        )
+        result = await db.execute(
+            update(TTSJob).where(
+                TTSJob.id == job.id,
+                TTSJob.status == JOB_RUNNING,
+                TTSJob.attempts == job.attempt
+            ).values(
+                status=JOB_SUCCEEDED,
+                tts_request_id=tts_request.id,
+                locked_by=None,
+                last_error=None,
+                error_status_code=None,
+                updated_at=func.now(),
+                finished_at=func.now(),
+            ).execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            return False
+        await db.commit()
+    return True
+
+
+async def _fail_job(job: ClaimedJob, error: Exception) -> None:
+    """Reschedule a failed attempt with backoff, or fail the job for good."""
+    retryable, status_code = classify_job_error(error)
+    message = str(error) or error.__class__.__name__
+    if retryable and job.attempt < job.max_attempts:
+        delay = retry_delay(job.attempt, error)
+        logger.warning(f"Job {job.id} attempt {job.attempt}/{job.max_attempts} failed, retrying in {delay:.1f}s: {message}")
+        await _update_leased_job(
+            job,
+            status=JOB_QUEUED,
+            locked_by=None,
+            available_at=func.now() + timedelta(seconds=delay),
+            last_error=message,
+            error_status_code=status_code,
+        )
+        return
+
+    logger.error(f"Job {job.id} failed after {job.attempt} attempt(s): {message}")
+    if await _update_leased_job(
+        job,
+        status=JOB_FAILED,
+        locked_by=None,
+        last_error=message,
+        error_status_code=status_code,
+        finished_at=func.now(),
+    ):
+        _notify_job_finished(job.id)
+
+
+async def _release_job(job: ClaimedJob) -> None:
+    """Hand an unfinished job back to the queue without using up an attempt."""
+    await _update_leased_job(
+        job,
+        status=JOB_QUEUED,
+        attempts=job.attempt - 1,
+        locked_by=None,
+        available_at=func.now(),
+    )
+
+
+class JobWorker:
+    """
+    Claims and runs queued TTS jobs.
+
+    Runs up to concurrency jobs at a time. The lease of a running job is
+    renewed every third of the visibility timeout, so slow generations are
+    not handed to another worker; if this process dies, its jobs become
+    claimable again when their lease expires. Start one per API process
+    (JOB_WORKER_ENABLED) and/or any number of dedicated processes with
+    ``python -m app.worker``.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        poll_interval: float,
+        visibility_timeout: float,
+        worker_id: Optional[str] = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.visibility_timeout = visibility_timeout
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.succeeded = 0
+        self.failed = 0
+
+    def wakeup(self) -> None:
+        """Check for jobs now instead of at the next poll."""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Start claiming jobs in the background."""
+        global _local_worker
+        self._task = asyncio.create_task(self.run())
+        _local_worker = self
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop claiming jobs and wait up to timeout seconds for running ones.
+
+        Jobs still running afterwards are cancelled and handed back to the
+        queue for another worker.
+        """
+        global _local_worker
+        if _local_worker is self:
+            _local_worker = None
+        self._stopping = True
+        self.wakeup()
+        if self._task is not None:
+            await self._task
+        if self._running:
+            done, pending = await asyncio.wait(self._running, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def run(self) -> None:
+        """Claim loop: fill free slots, then sleep until woken or the next poll."""
+        logger.info(f"Job worker {self.worker_id} started (concurrency {self.concurrency})")
+        while not self._stopping:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._running)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await claim_jobs(self.worker_id, free, self.visibility_timeout)
+                except Exception as e:
+                    logger.error(f"Failed to claim jobs: {e}")
+            for job in claimed:
+                task = asyncio.create_task(self._process(job))
+                self._running.add(task)
+                task.add_done_callback(self._job_done)
+            if claimed and len(claimed) == free:
+                # Possibly more waiting; claim again once a slot frees up
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _job_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self.wakeup()
+
+    async def _heartbeat(self, job: ClaimedJob) -> None:
+        """Extend the lease of job until cancelled."""
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                if not await _update_leased_job(
+                    job,
+                    available_at=func.now() + timedelta(seconds=self.visibility_timeout)
+                ):
+                    logger.warning(f"Job {job.id}: lease lost to another worker")
+                    return
+            except Exception as e:
+                logger.warning(f"Job {job.id}: failed to extend lease: {e}")
+
+    async def _process(self, job: ClaimedJob) -> None:
+        try:
+            await self._run_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Database unreachable: the lease expires and the job is retried
+            logger.error(f"Job {job.id}: failed to record outcome: {e}")
+
+    async def _run_job(self, job: ClaimedJob) -> None:
+        if job.attempt > job.max_attempts:
+            # Claimed again after a worker died holding the last attempt
+            await _fail_job(job, TimeoutError("Job timed out (worker lease expired)"))
+            self.failed += 1
+            return
+
+        kind = _job_kinds()[job.provider]
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            audio_bytes = await kind.generate(
+                **{name: job.payload[name] for name in kind.params if name in job.payload},
+                **kind.extra_arguments(job.payload)
+            )
+        except asyncio.CancelledError:
+            heartbeat.cancel()
+            await _release_job(job)
+            raise
+        except Exception as e:
+            heartbeat.cancel()
+            await _fail_job(job, e)
+            self.failed += 1
+            return
+
+        heartbeat.cancel()
+        try:
+            completed = await _complete_job(job, kind, audio_bytes)
+        except Exception as e:
+            await _fail_job(job, e)
+            self.failed += 1
+            return
+        if completed:
+            self.succeeded += 1
+            logger.info(f"Job {job.id} succeeded on attempt {job.attempt}")
+            _notify_job_finished(job.id)
+        else:
+            logger.warning(f"Job {job.id}: lease lost before completion, result discarded")
+
+
+def create_job_worker() -> JobWorker:
+    """Build a worker from the JOB_* settings."""
+    settings = get_settings()
+    return JobWorker(
+        concurrency=settings.job_worker_concurrency,
+        poll_interval=settings.job_poll_interval_seconds,
+        visibility_timeout=settings.job_visibility_timeout_seconds,
+    )
@@ -0,0 +1,124 @@
+"""Long-text synthesis: split at sentence boundaries, synthesize chunks in parallel."""
+import asyncio
+import logging
+import re
+from typing import AsyncIterator, Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# Sentence ends: Latin punctuation followed by whitespace, or CJK full stops
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])")
+_CLAUSE_END = re.compile(r"(?<=[,;:，；、])\s*")
+
+
+def _split_to_budget(sentence: str, max_chars: int) -> List[str]:
+    """Split a sentence longer than max_chars at clauses, then words."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    pieces = []
+    for separator, pattern in ((" ", _CLAUSE_END), (" ", re.compile(r"\s+"))):
+        parts = [part for part in pattern.split(sentence) if part]
+        if len(parts) > 1:
+            current = ""
+            for part in parts:
+                candidate = f"{current}{separator}{part}" if current else part
+                if len(candidate) <= max_chars:
+                    current = candidate
+                    continue
+                if current:
+                    pieces.extend(_split_to_budget(current, max_chars))
+                current = part
+            if current:
+                pieces.extend(_split_to_budget(current, max_chars))
+            return pieces
+    # No usable boundary (e.g. a very long token): hard split
+    return [sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)]
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars characters.
+
+    Chunks end at paragraph or sentence boundaries where possible; a
+    sentence longer than the budget is split at clause punctuation, then
+    at whitespace. Consecutive sentences (and short paragraphs) are packed
+    into one chunk while they fit, so chunks stay close to the budget.
+
+    Args:
+        text: Text to split
+        max_chars: Character budget per chunk
+
+    Returns:
+        List of chunks, in order (a single chunk if text fits the budget)
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    current = ""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        separator = "\n\n"
+        for sentence in _SENTENCE_END.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            for piece in _split_to_budget(sentence, max_chars):
+                candidate = f"{current}{separator}{piece}" if current else piece
+                if len(candidate) <= max_chars:
+                    current = candidate
+                else:
+                    chunks.append(current)
+                    current = piece
+                # CJK text has no spaces between sentences
+                separator = "" if piece[-1] in "。！？" else " "
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def synthesize_in_order(
+    chunks: List[str],
+    synthesize: Callable[[str], Awaitable[bytes]],
+    parallelism: int,
+) -> AsyncIterator[bytes]:
+    """
+    Synthesize chunks concurrently and yield their audio in order.
+
+    At most parallelism chunks are in flight; chunks start in order, so
+    the first chunk's audio is yielded as soon as it is ready while later
+    chunks are still being generated. Each chunk is an independent call,
+    so a transient failure is retried for that chunk only (by the provider
+    service's retry loop). If a chunk still fails, or the consumer stops
+    early, the remaining chunks are cancelled.
+
+    Args:
+        chunks: Text chunks, in order
+        synthesize: Coroutine function turning one chunk into audio
+        parallelism: Maximum number of concurrent chunk calls
+
+    Yields:
+        Audio of each chunk, in order
+    """
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+
+    async def run(index: int, chunk: str) -> bytes:
+        async with semaphore:
+            logger.info(f"Synthesizing chunk {index + 1}/{len(chunks)} ({len(chunk)} chars)")
+            return await synthesize(chunk)
+
+    tasks = [asyncio.ensure_future(run(index, chunk)) for index, chunk in enumerate(chunks)]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Mark failures of chunks we never awaited as retrieved
+                task.exception()
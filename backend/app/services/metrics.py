@@ -0,0 +1,432 @@
+"""
+Process metrics in the Prometheus text exposition format.
+
+Counters and histograms are updated in place by the code they measure
+(request handling, provider calls, the database pool, catalog fetches)
+and are safe to update from worker threads. Values that already live
+elsewhere (cache sizes, rate limiter queues, pool occupancy) are read
+when /metrics is scraped. Each server process reports its own metrics.
+"""
+import bisect
+import threading
+from abc import ABC, abstractmethod
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+
+# Route label of requests that matched no route (keeps label values bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """A named metric family with fixed label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence) -> Labels:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(value) for value in labels)
+
+    @abstractmethod
+    def samples(self) -> List[Sample]:
+        """Current samples as (sample name, labels, value)."""
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in values]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf)], sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class _Collected(_Metric):
+    """A metric family whose samples are produced at scrape time."""
+
+    def __init__(self, name: str, documentation: str, kind: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, labels, value) for labels, value in self._collect()]
+
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Get or create a counter."""
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = LATENCY_BUCKETS,
+) -> Histogram:
+    """Get or create a histogram."""
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_collector(
+    name: str,
+    documentation: str,
+    kind: str,
+    collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]],
+) -> None:
+    """
+    Report a gauge or counter whose value is read when metrics are scraped.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        kind: gauge or counter
+        collect: Returns (labels, value) pairs; an exception skips the metric
+    """
+    with _registry_lock:
+        _registry[name] = _Collected(name, documentation, kind, collect)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text format (version 0.0.4)."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        try:
+            samples = metric.samples()
+        except Exception:
+            continue
+        lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+
+http_request_duration = histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request, until the response body is sent",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request by route template.
+
+    Streaming responses are timed until their last chunk. WebSocket
+    connections are not timed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+            )
+
+
+# Providers
+
+synthesis_duration = histogram(
+    "tts_synthesis_duration_seconds",
+    "Duration of successful provider synthesis calls (cache hits excluded)",
+    ("provider", "model", "mode"),
+)
+time_to_first_chunk = histogram(
+    "tts_time_to_first_chunk_seconds",
+    "Time from a provider call (or realtime turn) starting to its first audio",
+    ("provider", "model", "mode"),
+)
+audio_bytes = counter(
+    "tts_audio_bytes_total",
+    "Audio bytes produced by providers (cache hits excluded)",
+    ("provider", "model", "mode"),
+)
+provider_retries = counter(
+    "tts_provider_retries_total",
+    "Failed provider attempts that were retried",
+    ("provider",),
+)
+provider_rate_limited = counter(
+    "tts_provider_rate_limited_total",
+    "Provider attempts rejected with a rate limit (429) error",
+    ("provider",),
+)
+provider_failures = counter(
+    "tts_provider_failures_total",
+    "Provider calls that failed after their last attempt",
+    ("provider",),
+)
+coalesced_requests = counter(
+    "tts_coalesced_requests_total",
+    "Synthesis requests that joined an identical request already in flight",
+    ("provider", "mode"),
+)
+
+
+def observe_synthesis(
+    provider: str,
+    model: Optional[str],
+    mode: str,
+    seconds: float,
+    size: int,
+    first_chunk_seconds: Optional[float] = None,
+) -> None:
+    """
+    Record a successful provider call (also noted by the health prober).
+
+    Args:
+        provider: elevenlabs or cartesia
+        model: Model ID
+        mode: generate, stream or realtime
+        seconds: Call duration
+        size: Audio bytes produced
+        first_chunk_seconds: Time to the first audio chunk, if known
+    """
+    from app.services.health import health_prober
+
+    model = model or ""
+    health_prober.record_generation(provider)
+    synthesis_duration.observe(seconds, provider, model, mode)
+    audio_bytes.inc(provider, model, mode, amount=size)
+    if first_chunk_seconds is not None:
+        time_to_first_chunk.observe(first_chunk_seconds, provider, model, mode)
+
+
+def collect_audio(provider: str, model: Optional[str], chunks: Iterable[bytes], started: float) -> bytes:
+    """
+    Join a provider's audio chunks, recording the call's latencies and size.
+
+    Args:
+        provider: elevenlabs or cartesia
+        model: Model ID
+        chunks: Audio chunks as the SDK yields them
+        started: time.perf_counter() when the call was made
+    """
+    parts = []
+    first_chunk_seconds = None
+    for chunk in chunks:
+        if first_chunk_seconds is None:
+            first_chunk_seconds = time.perf_counter() - started
+        parts.append(chunk)
+    audio = b"".join(parts)
+    observe_synthesis(provider, model, "generate", time.perf_counter() - started, len(audio), first_chunk_seconds)
+    return audio
+
+
+def count_provider_error(provider: str, error: Exception, attempt: int, max_retries: int) -> None:
+    """Count a failed provider attempt (as a retry unless it was the last one)."""
+    from app.services.health import health_prober
+    from app.services.rate_limiter import is_rate_limit_error
+
+    health_prober.record_generation(provider, error)
+    if is_rate_limit_error(error):
+        provider_rate_limited.inc(provider)
+    if attempt < max_retries - 1:
+        provider_retries.inc(provider)
+    else:
+        provider_failures.inc(provider)
+
+
+# Database pool
+
+db_pool_checkout_wait = histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to check a connection out of the pool (waiting, connecting and pre-ping)",
+    ("pool",),
+    POOL_WAIT_BUCKETS,
+)
+db_pool_connection_held = histogram(
+    "db_pool_connection_held_seconds",
+    "Time a connection stayed checked out",
+    ("pool",),
+)
+
+
+# Voice catalogs
+
+catalog_fetch_duration = histogram(
+    "catalog_fetch_duration_seconds",
+    "Duration of upstream voice catalog fetches",
+    ("catalog", "outcome"),
+)
+
+
+# Values read at scrape time
+
+def _synthesis_cache_stats() -> Optional[Dict]:
+    from app.services.synthesis_cache import get_synthesis_cache
+
+    cache = get_synthesis_cache()
+    return cache.stats() if cache is not None else None
+
+
+def _cache_samples(*fields: Tuple[str, Dict[str, str]]) -> Callable[[], List[Tuple[Dict[str, str], float]]]:
+    def collect():
+        stats = _synthesis_cache_stats()
+        if stats is None:
+            return []
+        return [(labels, stats[field]) for field, labels in fields if stats[field] is not None]
+    return collect
+
+
+def _limiter_samples(field: str) -> Callable[[], List[Tuple[Dict[str, str], float]]]:
+    def collect():
+        from app.services.rate_limiter import rate_limiter_stats
+
+        return [({"provider": provider}, stats[field]) for provider, stats in rate_limiter_stats().items()]
+    return collect
+
+
+def _db_pool_samples(read: Callable) -> Callable[[], List[Tuple[Dict[str, str], float]]]:
+    def collect():
+        from app import database
+
+        engines = (("async", database.async_engine), ("sync", database.engine))
+        return [({"pool": name}, read(engine.pool)) for name, engine in engines if engine is not None]
+    return collect
+
+
+register_collector(
+    "synthesis_cache_hits_total", "Synthesis cache hits by tier", "counter",
+    _cache_samples(("memory_hits", {"tier": "memory"}), ("disk_hits", {"tier": "disk"})),
+)
+register_collector("synthesis_cache_misses_total", "Synthesis cache misses", "counter", _cache_samples(("misses", {})))
+register_collector(
+    "synthesis_cache_bytes", "Synthesis cache size by tier", "gauge",
+    _cache_samples(("memory_bytes", {"tier": "memory"}), ("disk_bytes", {"tier": "disk"})),
+)
+register_collector("provider_queue_depth", "Calls waiting for an outbound rate limiter slot", "gauge", _limiter_samples("queue_depth"))
+register_collector("provider_queue_admitted_total", "Calls admitted by the outbound rate limiter", "counter", _limiter_samples("admitted"))
+register_collector("provider_queue_rejected_total", "Calls rejected by the outbound rate limiter", "counter", _limiter_samples("rejected"))
+register_collector("db_pool_size", "Configured database pool size", "gauge", _db_pool_samples(lambda pool: pool.size()))
+register_collector(
+    "db_pool_checked_out", "Database connections currently checked out", "gauge",
+    _db_pool_samples(lambda pool: pool.checkedout()),
+)
+register_collector(
+    "db_pool_overflow", "Database connections open beyond the pool size", "gauge",
+    _db_pool_samples(lambda pool: max(0, pool.overflow())),
+)
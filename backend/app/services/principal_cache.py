@@ -0,0 +1,98 @@
+"""Cache of authenticated principals (users resolved from JWTs)."""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+from uuid import UUID
+from app.config import get_settings
+
+
+class Principal(NamedTuple):
+    """
+    Identity of an authenticated caller.
+
+    An immutable snapshot of the user row, safe to share between requests
+    and sessions (unlike a User instance, which is bound to its session).
+    """
+    id: UUID
+    username: str
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """Snapshot a User row."""
+        return cls(id=user.id, username=user.username, created_at=user.created_at)
+
+
+class PrincipalCache:
+    """
+    Size-capped LRU cache of principals with a per-entry TTL.
+
+    Keys are the user_id claim of the access token (falling back to the
+    username), so every token of a user shares one entry.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Principal]:
+        """Return the cached principal for key, or None if missing or expired."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            principal, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, key: str, principal: Principal) -> None:
+        """Cache principal under key."""
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Drop the entry for key (user_id claim or username)."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, username: str) -> None:
+        """Drop every entry that resolves to username."""
+        with self._lock:
+            for key in [key for key, (principal, _) in self._entries.items() if principal.username == username]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache instance (lazy initialization)
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or initialize the principal cache."""
+    global _principal_cache
+    if _principal_cache is None:
+        settings = get_settings()
+        _principal_cache = PrincipalCache(
+            ttl=settings.principal_cache_ttl_seconds,
+            max_entries=settings.principal_cache_max_entries,
+        )
+    return _principal_cache
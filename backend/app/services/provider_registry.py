@@ -0,0 +1,422 @@
+"""Registry of TTS providers with latency-aware routing."""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+from app.config import get_settings
+from app.services.rate_limiter import ProviderBusyError, get_rate_limiter
+from app.utils.concurrency import provider_call_timer
+
+logger = logging.getLogger(__name__)
+
+# Minimum latency samples before a provider's p95 is trusted for hedging
+HEDGE_MIN_SAMPLES = 20
+
+
+class ProviderStats:
+    """
+    Rolling latency and error statistics for one provider.
+
+    Latency is tracked as an EWMA (for ranking) and as a window of recent
+    samples (for percentiles). A provider is marked unhealthy for a cooldown
+    period after failure_threshold consecutive failures, then gets traffic
+    again; one success makes it healthy.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        window: int = 200,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.last_error: Optional[str] = None
+        self._latencies = deque(maxlen=window)
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful generation that took latency seconds."""
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self._latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.alpha * (latency - self.latency_ewma)
+        self.error_rate *= 1 - self.alpha
+
+    def record_failure(self, error: Exception) -> None:
+        """Record a failed generation."""
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        self.error_rate += self.alpha * (1 - self.error_rate)
+        if self.consecutive_failures >= self.failure_threshold:
+            self.unhealthy_until = time.monotonic() + self.cooldown
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th percentile (0-100) of recent latencies, if any."""
+        if not self._latencies:
+            return None
+        samples = sorted(self._latencies)
+        index = max(0, math.ceil(q / 100 * len(samples)) - 1)
+        return samples[index]
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def score(self) -> float:
+        """
+        Expected cost of routing a request here (lower is better).
+
+        Latency is inflated by the recent error rate, since a failure costs
+        a full attempt plus a failover. Providers without samples score 0 so
+        they are tried (and measured) first.
+        """
+        if self.latency_ewma is None:
+            return 0.0
+        return self.latency_ewma / max(1 - self.error_rate, 0.05)
+
+    def snapshot(self) -> Dict:
+        """Current statistics as a JSON-serializable dict."""
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "healthy": self.healthy,
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 4),
+            "latency_ewma_ms": ms(self.latency_ewma),
+            "latency_p50_ms": ms(self.percentile(50)),
+            "latency_p95_ms": ms(self.percentile(95)),
+            "samples": self.samples,
+            "last_error": self.last_error,
+        }
+
+
+class TTSProvider(NamedTuple):
+    """A TTS backend behind the unified synthesis interface."""
+    name: str
+    mime_type: str
+    languages: frozenset
+    # async (text, voice_id, model_id, language, bypass_cache, deadline) -> audio bytes
+    generate: Callable[..., Awaitable[bytes]]
+    # Whether the provider is configured (e.g. has an API key)
+    available: Callable[[], bool]
+    # Seconds a new request would currently queue for the provider
+    queue_wait: Callable[[], float] = lambda: 0.0
+
+    def supports(self, language: Optional[str]) -> bool:
+        """Return whether the provider can synthesize language (None = any)."""
+        return language is None or normalize_language(language) in self.languages
+
+
+class SynthesisResult(NamedTuple):
+    """Audio produced by a routed synthesis request."""
+    provider: str
+    audio: bytes
+    mime_type: str
+    latency: float
+    hedged: bool
+
+
+class NoProviderError(Exception):
+    """Raised when no configured provider can serve a request."""
+
+
+def normalize_language(language: str) -> str:
+    """Reduce a language tag to its primary subtag (e.g. 'en-US' -> 'en')."""
+    return language.replace("_", "-").split("-")[0].lower()
+
+
+class ProviderRegistry:
+    """
+    Routes synthesis requests to the fastest healthy provider.
+
+    Candidates are the available providers that support the requested
+    language, ordered by score plus current queue wait (healthy first). A
+    provider that cannot admit the request before its deadline is skipped
+    without counting as a failure. A failed request fails over
+    to the next candidate. With hedging enabled, a second request is sent to
+    the next candidate when the first has not finished within its own p95
+    latency; the first result wins and the other request is cancelled.
+    """
+
+    def __init__(self, hedge: bool = False, stats_factory: Callable[[], ProviderStats] = ProviderStats):
+        self.hedge = hedge
+        self._stats_factory = stats_factory
+        self._providers: Dict[str, TTSProvider] = {}
+        self._stats: Dict[str, ProviderStats] = {}
+
+    def register(self, provider: TTSProvider) -> None:
+        """Add a provider (registration order breaks score ties)."""
+        self._providers[provider.name] = provider
+        self._stats[provider.name] = self._stats_factory()
+
+    @property
+    def providers(self) -> List[TTSProvider]:
+        return list(self._providers.values())
+
+    def get(self, name: str) -> Optional[TTSProvider]:
+        return self._providers.get(name)
+
+    def stats(self, name: str) -> ProviderStats:
+        return self._stats[name]
+
+    def candidates(self, language: Optional[str] = None) -> List[TTSProvider]:
+        """Available providers that support language, best first."""
+        eligible = [
+            provider for provider in self._providers.values()
+            if provider.available() and provider.supports(language)
+        ]
+        return sorted(
+            eligible,
+            key=lambda provider: (
+                not self._stats[provider.name].healthy,
+                self._stats[provider.name].score() + provider.queue_wait(),
+            ),
+        )
+
+    async def synthesize(
+        self,
+        text: str,
+        language: Optional[str] = None,
+        voice_ids: Optional[Dict[str, str]] = None,
+        model_ids: Optional[Dict[str, str]] = None,
+        provider: Optional[str] = None,
+        bypass_cache: bool = False,
+        deadline: Optional[float] = None,
+    ) -> SynthesisResult:
+        """
+        Synthesize text with the best provider for language.
+
+        Args:
+            text: Text to convert to speech
+            language: Language code, or None to let the provider detect it
+            voice_ids: Voice to use per provider name (provider default otherwise)
+            model_ids: Model to use per provider name (provider default otherwise)
+            provider: Restrict routing to this provider
+            bypass_cache: Skip synthesis cache lookups
+            deadline: time.monotonic() by which provider calls must be admitted
+
+        Returns:
+            SynthesisResult of the winning provider
+
+        Raises:
+            NoProviderError: If no configured provider supports the request
+            Exception: The last provider error if every candidate failed
+        """
+        candidates = self.candidates(language)
+        if provider is not None:
+            candidates = [candidate for candidate in candidates if candidate.name == provider]
+        if not candidates:
+            target = f"provider '{provider}'" if provider else "provider"
+            raise NoProviderError(
+                f"No configured {target} supports language '{language}'" if language
+                else f"No configured {target} available"
+            )
+
+        voice_ids = voice_ids or {}
+        model_ids = model_ids or {}
+
+        def attempt(candidate: TTSProvider) -> "asyncio.Task":
+            return asyncio.ensure_future(self._timed_generate(
+                candidate, text, voice_ids.get(candidate.name),
+                model_ids.get(candidate.name), language, bypass_cache, deadline,
+            ))
+
+        last_error: Optional[Exception] = None
+        remaining = list(candidates)
+        while remaining:
+            primary = remaining.pop(0)
+            primary_task = attempt(primary)
+            tasks = {primary_task: primary}
+
+            hedge_delay = self._hedge_delay(primary) if remaining else None
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait({primary_task}, timeout=hedge_delay)
+                if not done:
+                    secondary = remaining.pop(0)
+                    logger.info(
+                        f"{primary.name} exceeded p95 ({hedge_delay * 1000:.0f}ms), "
+                        f"hedging with {secondary.name}"
+                    )
+                    tasks[attempt(secondary)] = secondary
+
+            try:
+                result = await self._first_success(tasks)
+                return result._replace(hedged=len(tasks) > 1)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Synthesis failed on {', '.join(p.name for p in tasks.values())}: {e}")
+
+        raise last_error
+
+    def _hedge_delay(self, provider: TTSProvider) -> Optional[float]:
+        if not self.hedge:
+            return None
+        stats = self._stats[provider.name]
+        if stats.samples < HEDGE_MIN_SAMPLES:
+            return None
+        return stats.percentile(95)
+
+    async def _timed_generate(
+        self,
+        provider: TTSProvider,
+        text: str,
+        voice_id: Optional[str],
+        model_id: Optional[str],
+        language: Optional[str],
+        bypass_cache: bool,
+        deadline: Optional[float],
+    ) -> SynthesisResult:
+        """
+        Run one provider's generate() and update its statistics.
+
+        Only provider round trips are recorded (the slowest one for chunked
+        text): cache hits and our own rate limiter's queueing say nothing
+        about the provider, and would favour whichever provider has the
+        text cached or penalise one that is only busy here.
+        """
+        stats = self._stats[provider.name]
+        started = time.perf_counter()
+        try:
+            with provider_call_timer() as round_trips:
+                audio = await provider.generate(
+                    text=text,
+                    voice_id=voice_id,
+                    model_id=model_id,
+                    language=normalize_language(language) if language else None,
+                    bypass_cache=bypass_cache,
+                    deadline=deadline,
+                )
+        except (asyncio.CancelledError, ProviderBusyError):
+            # Lost a hedge race or rejected by our own rate limiter; not a provider failure
+            raise
+        except Exception as e:
+            stats.record_failure(e)
+            raise
+        if round_trips:
+            stats.record_success(max(round_trips))
+        latency = time.perf_counter() - started
+        return SynthesisResult(provider.name, audio, provider.mime_type, latency, False)
+
+    @staticmethod
+    async def _first_success(tasks: Dict["asyncio.Task", TTSProvider]) -> SynthesisResult:
+        """Return the first successful result and cancel the other tasks."""
+        pending = set(tasks)
+        error: Optional[Exception] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> List[Dict]:
+        """Routing state of every provider, best first."""
+        ranked = self.candidates() + [
+            provider for provider in self._providers.values() if not provider.available()
+        ]
+        return [
+            {
+                "name": provider.name,
+                "available": provider.available(),
+                "mime_type": provider.mime_type,
+                "languages": sorted(provider.languages),
+                "queue_wait_s": round(provider.queue_wait(), 3),
+                **self._stats[provider.name].snapshot(),
+            }
+            for provider in ranked
+        ]
+
+
+def _elevenlabs_provider() -> TTSProvider:
+    from app.services import elevenlabs_service
+
+    async def generate(text, voice_id, model_id, language, bypass_cache, deadline):
+        return await elevenlabs_service.generate_tts_audio_async(
+            text=text,
+            voice_id=voice_id,
+            model_id=model_id,
+            language=language,
+            bypass_cache=bypass_cache,
+            deadline=deadline,
+        )
+
+    return TTSProvider(
+        name="elevenlabs",
+        mime_type="audio/mpeg",
+        languages=frozenset(elevenlabs_service.ELEVENLABS_LANGUAGES),
+        generate=generate,
+        available=lambda: bool(get_settings().elevenlabs_api_key),
+        queue_wait=lambda: get_rate_limiter("elevenlabs").estimated_wait(),
+    )
+
+
+def _cartesia_provider() -> TTSProvider:
+    from app.services import cartesia_service
+
+    async def generate(text, voice_id, model_id, language, bypass_cache, deadline):
+        return await cartesia_service.generate_tts_audio_async(
+            text=text,
+            voice_id=voice_id,
+            model_id=model_id or "sonic-3",
+            language=language,
+            bypass_cache=bypass_cache,
+            deadline=deadline,
+        )
+
+    return TTSProvider(
+        name="cartesia",
+        mime_type="audio/wav",
+        languages=frozenset(language["code"] for language in cartesia_service.CARTESIA_LANGUAGES),
+        generate=generate,
+        available=lambda: bool(get_settings().cartesia_api_key),
+        queue_wait=lambda: get_rate_limiter("cartesia").estimated_wait(),
+    )
+
+
+# Process-wide registry instance (lazy initialization)
+_provider_registry: Optional[ProviderRegistry] = None
+
+
+def get_provider_registry() -> ProviderRegistry:
+    """Get or initialize the registry of TTS providers."""
+    global _provider_registry
+    if _provider_registry is None:
+        settings = get_settings()
+        registry = ProviderRegistry(
+            hedge=settings.routing_hedge_enabled,
+            stats_factory=lambda: ProviderStats(
+                failure_threshold=settings.routing_failure_threshold,
+                cooldown=settings.routing_cooldown_seconds,
+            ),
+        )
+        registry.register(_elevenlabs_provider())
+        registry.register(_cartesia_provider())
+        _provider_registry = registry
+    return _provider_registry
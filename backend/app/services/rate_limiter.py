@@ -0,0 +1,215 @@
+"""Outbound rate limiting for provider API calls."""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from app.config import deployment_processes, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderBusyError(Exception):
+    """
+    Raised when a provider call cannot be admitted in time.
+
+    Attributes:
+        status_code: HTTP status to report (429 or 503)
+        retry_after: Seconds after which a retry may be admitted
+    """
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitExceeded(ProviderBusyError):
+    """The next slot for the provider is later than the caller's deadline."""
+    status_code = 429
+
+
+class ProviderQueueFull(ProviderBusyError):
+    """Too many requests are already waiting for the provider."""
+    status_code = 503
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """Return whether a provider error is a 429 / rate-limit response."""
+    status_code = getattr(e, "status_code", None)
+    if status_code is not None:
+        return status_code == 429
+    error_msg = str(e).lower()
+    return "429" in error_msg or "rate limit" in error_msg or "too many requests" in error_msg
+
+
+class TokenBucket:
+    """
+    Token-bucket limiter with a FIFO wait queue.
+
+    Allows rate requests per second on average with bursts of up to burst
+    requests. Implemented as GCRA (virtual scheduling): each admission
+    reserves the next free slot, so waiters are admitted in arrival order
+    and the wait for a new request is known before it queues. A request is
+    rejected up front when its slot falls after the caller's deadline or
+    when max_queue requests are already waiting, instead of sleeping in the
+    handler only to time out.
+
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1, max_queue: int = 100):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_queue = max_queue
+        # Theoretical arrival time of the next request (time.monotonic())
+        self._tat = 0.0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    @property
+    def _interval(self) -> float:
+        return 1.0 / self.rate
+
+    def estimated_wait(self) -> float:
+        """Seconds a request arriving now would wait for its slot."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        return max(0.0, max(self._tat, now) - (self.burst - 1) * self._interval - now)
+
+    async def acquire(self, deadline: Optional[float] = None) -> float:
+        """
+        Wait for a slot.
+
+        Args:
+            deadline: time.monotonic() by which the caller must be admitted,
+                or None to wait as long as needed
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the slot is later than deadline
+            ProviderQueueFull: If max_queue requests are already waiting
+        """
+        if not self.enabled:
+            self.admitted += 1
+            return 0.0
+
+        now = time.monotonic()
+        wait = self.estimated_wait()
+        if wait > 0 and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise ProviderQueueFull(
+                f"Too many requests queued for {self.name}, please retry later",
+                retry_after=wait,
+            )
+        if deadline is not None and now + wait > deadline:
+            self.rejected += 1
+            raise RateLimitExceeded(
+                f"{self.name} rate limit reached, next slot in {wait:.1f}s",
+                retry_after=wait,
+            )
+
+        # Reserve the slot before sleeping so later arrivals queue behind us
+        self._tat = max(self._tat, now) + self._interval
+        reserved_tat = self._tat
+        if wait > 0:
+            self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Hand the slot back if nobody queued behind it
+                if self._tat == reserved_tat:
+                    self._tat -= self._interval
+                raise
+            finally:
+                self.waiting -= 1
+
+        self.admitted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Push every future slot back by seconds (e.g. after a 429).
+
+        The provider's own limit is tighter than configured, so queued and
+        new requests wait instead of each discovering the 429 separately.
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        self._tat = max(self._tat, now + (self.burst - 1) * self._interval) + seconds
+        logger.warning(f"{self.name} rate limited by provider, delaying queue by {seconds:.1f}s")
+
+    def stats(self) -> Dict:
+        """Queue depth, admissions and wait times."""
+        return {
+            "enabled": self.enabled,
+            "rate_per_minute": round(self.rate * 60, 2),
+            "burst": self.burst,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "estimated_wait_s": round(self.estimated_wait(), 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_s": round(self.total_wait / self.admitted, 3) if self.admitted else 0.0,
+            "max_wait_s": round(self.max_wait, 3),
+        }
+
+
+# Process-wide limiters, one per provider (lazy initialization)
+_rate_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """Get or initialize the outbound limiter for provider (elevenlabs, cartesia)."""
+    limiter = _rate_limiters.get(provider)
+    if limiter is None:
+        settings = get_settings()
+        per_minute, burst = {
+            "elevenlabs": (settings.elevenlabs_requests_per_minute, settings.elevenlabs_burst),
+            "cartesia": (settings.cartesia_requests_per_minute, settings.cartesia_burst),
+        }[provider]
+        # The configured rate is for the whole deployment; split it across server and job worker processes
+        workers = deployment_processes(settings)
+        limiter = TokenBucket(
+            provider,
+            rate=per_minute / 60 / workers,
+            burst=max(1, burst // workers),
+            max_queue=settings.provider_queue_max_depth,
+        )
+        _rate_limiters[provider] = limiter
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict]:
+    """Stats of every provider limiter."""
+    return {provider: get_rate_limiter(provider).stats() for provider in ("elevenlabs", "cartesia")}
+
+
+def queue_deadline(max_wait: Optional[float] = None) -> float:
+    """
+    Deadline for admitting a provider call made now.
+
+    Args:
+        max_wait: Seconds the caller is willing to wait; capped at
+            PROVIDER_QUEUE_MAX_WAIT_SECONDS
+
+    Returns:
+        time.monotonic() deadline
+    """
+    limit = get_settings().provider_queue_max_wait_seconds
+    if max_wait is None or max_wait < 0:
+        max_wait = limit
+    return time.monotonic() + min(max_wait, limit)
@@ -0,0 +1,513 @@
+"""
+Realtime TTS: incremental text in, audio frames out.
+
+A RealtimeProvider holds the provider streaming connection of one client
+session, and each utterance is a RealtimeTurn on it. Text fragments (e.g.
+LLM tokens) are passed on as they arrive and the provider decides when
+enough text is buffered to start speaking; flush() forces it. Audio for
+the start of a sentence is therefore produced while the rest of it is
+still being written, without a request per sentence.
+
+Providers:
+    cartesia: one WebSocket per session, one continuation context per turn
+    elevenlabs: stream-input WebSocket per turn (the protocol ends the
+        socket with the turn); the next turn's socket is opened as soon as
+        a turn ends so its handshake is not on the critical path
+    fake: local stand-in for tests and benchmarks (REALTIME_FAKE_PROVIDER_ENABLED)
+"""
+import asyncio
+import base64
+import json
+import logging
+import re
+from typing import AsyncIterator, NamedTuple, Optional
+from app.config import get_settings, ConfigurationError
+from app.services.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+REALTIME_PROVIDERS = ["cartesia", "elevenlabs", "fake"]
+
+# Raw PCM output (no container), which clients can play frame by frame
+DEFAULT_REALTIME_ENCODING = "pcm_s16le"
+DEFAULT_REALTIME_SAMPLE_RATE = 24000
+
+# Bytes per sample of each PCM encoding, and the byte value of silence
+PCM_SAMPLE_WIDTHS = {"pcm_f32le": 4, "pcm_s16le": 2, "pcm_mulaw": 1, "pcm_alaw": 1}
+PCM_SILENCE = {"pcm_f32le": b"\x00", "pcm_s16le": b"\x00", "pcm_mulaw": b"\xff", "pcm_alaw": b"\xd5"}
+
+# ElevenLabs stream-input output_format for each (encoding, sample rate)
+ELEVENLABS_REALTIME_FORMATS = {
+    ("pcm_s16le", 16000): "pcm_16000",
+    ("pcm_s16le", 22050): "pcm_22050",
+    ("pcm_s16le", 24000): "pcm_24000",
+    ("pcm_s16le", 44100): "pcm_44100",
+    ("pcm_mulaw", 8000): "ulaw_8000",
+}
+ELEVENLABS_STREAM_INPUT_URL = "wss://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream-input"
+# Characters ElevenLabs buffers before generating the first, second, ... chunk
+ELEVENLABS_CHUNK_LENGTH_SCHEDULE = [50, 120, 160, 250]
+# Seconds an idle stream-input socket stays open (the maximum allowed)
+ELEVENLABS_INACTIVITY_TIMEOUT = 180
+
+# Fake provider timing: characters are spoken at FAKE_SECONDS_PER_CHAR,
+# generated FAKE_SPEEDUP times faster than real time in FAKE_FRAME_SECONDS frames
+FAKE_FIRST_AUDIO_SECONDS = 0.05
+FAKE_SECONDS_PER_CHAR = 0.06
+FAKE_FRAME_SECONDS = 0.1
+FAKE_SPEEDUP = 5.0
+
+_SENTENCE_END = re.compile(r"[.!?]\s")
+
+
+class RealtimeEvent(NamedTuple):
+    """Output of a turn: type is "audio", "flushed" or "done"."""
+    type: str
+    audio: bytes = b""
+    flush_id: Optional[int] = None
+
+
+class RealtimeTurn:
+    """
+    One utterance on a realtime provider connection.
+
+    send_text() can be called any number of times with arbitrary fragments
+    (text is concatenated verbatim), flush() makes the provider speak all
+    text sent so far and end() marks the last input. events() yields the
+    audio as it is produced and a final "done" event once all input has
+    been spoken; cancel() stops generation.
+    """
+
+    def __init__(self):
+        self.flushes = 0
+
+    async def send_text(self, text: str) -> None:
+        raise NotImplementedError
+
+    async def flush(self) -> int:
+        """Speak the buffered text now; returns the flush id (1, 2, ...)."""
+        raise NotImplementedError
+
+    async def end(self) -> None:
+        raise NotImplementedError
+
+    async def cancel(self) -> None:
+        raise NotImplementedError
+
+    def events(self) -> AsyncIterator[RealtimeEvent]:
+        raise NotImplementedError
+
+
+class RealtimeProvider:
+    """Provider streaming connection for one client session."""
+
+    name = ""
+
+    def __init__(self, voice_id: str, model_id: str, encoding: str, sample_rate: int):
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+
+    async def connect(self) -> None:
+        """Open the provider connection ahead of the first turn."""
+
+    async def open_turn(self, deadline: Optional[float] = None) -> RealtimeTurn:
+        """
+        Start a new turn.
+
+        Raises:
+            ProviderBusyError: If no provider slot is free before deadline
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Close the provider connection."""
+
+
+class CartesiaRealtimeTurn(RealtimeTurn):
+    """A Cartesia WebSocket context; fragments are sent as continuations."""
+
+    def __init__(self, provider: "CartesiaRealtimeProvider", context):
+        super().__init__()
+        self._provider = provider
+        self._context = context
+
+    async def send_text(self, text: str) -> None:
+        if text:
+            await self._context.push(text)
+
+    async def flush(self) -> int:
+        self.flushes += 1
+        await self._context.push("", flush=True)
+        return self.flushes
+
+    async def end(self) -> None:
+        await self._context.no_more_inputs()
+
+    async def cancel(self) -> None:
+        await self._context.cancel()
+
+    async def events(self) -> AsyncIterator[RealtimeEvent]:
+        try:
+            async for event in self._context.receive():
+                if event.type == "chunk":
+                    if event.audio:
+                        yield RealtimeEvent("audio", event.audio)
+                elif event.type == "flush_done":
+                    yield RealtimeEvent("flushed", flush_id=event.flush_id)
+                elif event.type == "done":
+                    break
+                elif event.type == "error":
+                    raise Exception(f"Cartesia realtime error: {event}")
+        except Exception:
+            # The connection may be gone; the next turn opens a new one
+            self._provider.discard_connection()
+            raise
+        yield RealtimeEvent("done")
+
+
+class CartesiaRealtimeProvider(RealtimeProvider):
+    """
+    Cartesia TTS WebSocket shared by all turns of a session.
+
+    Audio received for a context is buffered by the SDK until it is read,
+    so a slow client holds it in memory rather than slowing the socket
+    (at most one turn of audio).
+    """
+
+    name = "cartesia"
+
+    def __init__(
+        self,
+        voice_id: Optional[str] = None,
+        model_id: Optional[str] = None,
+        language: Optional[str] = None,
+        encoding: str = DEFAULT_REALTIME_ENCODING,
+        sample_rate: int = DEFAULT_REALTIME_SAMPLE_RATE,
+        speed: float = 1.0,
+    ):
+        from app.services.cartesia_service import resolve_output_format
+
+        model_id = model_id or "sonic-3"
+        self._output_format = resolve_output_format(model_id, "raw", encoding, sample_rate)
+        super().__init__(voice_id or "6ccbfb76-1fc6-48f7-b71d-91ac6298247b", model_id, encoding, sample_rate)
+        self.language = language
+        self.speed = speed
+        self._manager = None
+        self._connection = None
+
+    async def connect(self) -> None:
+        from app.services.cartesia_service import get_async_cartesia_client
+
+        if self._connection is not None:
+            return
+        client = get_async_cartesia_client()
+        if client is None:
+            raise ConfigurationError(
+                "CARTESIA_API_KEY is not set. Please set it in your .env file. "
+                "Get your API key from https://play.cartesia.ai/keys"
+            )
+        self._manager = client.tts.websocket_connect()
+        self._connection = await self._manager.__aenter__()
+        logger.info("Cartesia realtime connection opened")
+
+    def discard_connection(self) -> None:
+        """Drop a failed connection so the next turn reconnects."""
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            asyncio.ensure_future(connection.close())
+
+    async def open_turn(self, deadline: Optional[float] = None) -> RealtimeTurn:
+        await get_rate_limiter("cartesia").acquire(deadline)
+        await self.connect()
+        context = self._connection.context(
+            # Bounds waiting for output, e.g. when the connection dropped mid-turn
+            timeout=get_settings().realtime_idle_timeout_seconds,
+            model_id=self.model_id,
+            voice={"mode": "id", "id": self.voice_id},
+            output_format=self._output_format,
+            language=self.language,
+            generation_config={"speed": self.speed},
+        )
+        return CartesiaRealtimeTurn(self, context)
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            self._connection = None
+            await self._manager.__aexit__(None, None, None)
+
+
+class ElevenLabsRealtimeTurn(RealtimeTurn):
+    """
+    An ElevenLabs stream-input socket.
+
+    Fragments are sent at word boundaries (ElevenLabs expects whole words
+    with a trailing space); the unfinished word waits for the next
+    fragment, flush or end. ElevenLabs does not acknowledge flushes, so no
+    "flushed" events are produced.
+    """
+
+    def __init__(self, websocket):
+        super().__init__()
+        self._websocket = websocket
+        self._buffer = ""
+
+    async def _send(self, message: dict) -> None:
+        await self._websocket.send(json.dumps(message))
+
+    async def send_text(self, text: str) -> None:
+        self._buffer += text
+        cut = max(self._buffer.rfind(" "), self._buffer.rfind("\n"))
+        if cut < 0:
+            return
+        chunk, self._buffer = self._buffer[:cut + 1], self._buffer[cut + 1:]
+        if chunk.strip():
+            await self._send({"text": chunk})
+
+    async def flush(self) -> int:
+        self.flushes += 1
+        chunk, self._buffer = self._buffer.strip(), ""
+        await self._send({"text": f"{chunk} " if chunk else " ", "flush": True})
+        return self.flushes
+
+    async def end(self) -> None:
+        chunk, self._buffer = self._buffer.strip(), ""
+        if chunk:
+            await self._send({"text": f"{chunk} "})
+        # Empty text ends the input; ElevenLabs speaks the rest and closes
+        await self._send({"text": ""})
+
+    async def cancel(self) -> None:
+        await self._websocket.close()
+
+    async def events(self) -> AsyncIterator[RealtimeEvent]:
+        # Audio is only read as fast as it is consumed; unread frames stay
+        # in the socket and the provider is slowed down (TCP backpressure)
+        async for message in self._websocket:
+            data = json.loads(message)
+            if data.get("error"):
+                raise Exception(f"ElevenLabs realtime error: {data.get('message') or data['error']}")
+            if data.get("audio"):
+                yield RealtimeEvent("audio", base64.b64decode(data["audio"]))
+            if data.get("isFinal"):
+                break
+        yield RealtimeEvent("done")
+
+
+class ElevenLabsRealtimeProvider(RealtimeProvider):
+    """ElevenLabs input streaming, with the next turn's socket opened in advance."""
+
+    name = "elevenlabs"
+
+    def __init__(
+        self,
+        voice_id: Optional[str] = None,
+        model_id: Optional[str] = None,
+        language: Optional[str] = None,
+        encoding: str = DEFAULT_REALTIME_ENCODING,
+        sample_rate: int = DEFAULT_REALTIME_SAMPLE_RATE,
+        speed: float = 1.0,
+    ):
+        output_format = ELEVENLABS_REALTIME_FORMATS.get((encoding, sample_rate))
+        if output_format is None:
+            supported = ", ".join(f"{enc}@{rate}" for enc, rate in ELEVENLABS_REALTIME_FORMATS)
+            raise ValueError(
+                f"Unsupported ElevenLabs realtime format {encoding}@{sample_rate} (supported: {supported})"
+            )
+        # eleven_v3 is not available over WebSocket; flash has the lowest latency
+        super().__init__(voice_id or "JBFqnCBsd6RMkjVDRZzb", model_id or "eleven_flash_v2_5", encoding, sample_rate)
+        self.language = language
+        self.speed = speed
+        self._output_format = output_format
+        self._next: Optional[asyncio.Task] = None
+
+    async def _open_socket(self):
+        from websockets.asyncio.client import connect
+
+        params = f"model_id={self.model_id}&output_format={self._output_format}"
+        params += f"&inactivity_timeout={ELEVENLABS_INACTIVITY_TIMEOUT}"
+        if self.language:
+            params += f"&language_code={self.language}"
+        websocket = await connect(
+            f"{ELEVENLABS_STREAM_INPUT_URL.format(voice_id=self.voice_id)}?{params}",
+            additional_headers={"xi-api-key": get_settings().elevenlabs_api_key},
+        )
+        # The first message opens the stream and carries the settings
+        await websocket.send(json.dumps({
+            "text": " ",
+            "voice_settings": {"stability": 0.5, "similarity_boost": 0.75, "speed": self.speed},
+            "generation_config": {"chunk_length_schedule": ELEVENLABS_CHUNK_LENGTH_SCHEDULE},
+        }))
+        return websocket
+
+    async def connect(self) -> None:
+        if not get_settings().elevenlabs_api_key:
+            raise ConfigurationError(
+                "ELEVENLABS_API_KEY is not set. Please set it in your .env file. "
+                "Get your API key from https://elevenlabs.io/"
+            )
+        if self._next is None:
+            self._next = asyncio.create_task(self._open_socket())
+
+    async def open_turn(self, deadline: Optional[float] = None) -> RealtimeTurn:
+        from websockets.protocol import State
+
+        await get_rate_limiter("elevenlabs").acquire(deadline)
+        await self.connect()
+        task, self._next = self._next, None
+        try:
+            websocket = await task
+        except Exception as e:
+            logger.warning(f"Pre-opened ElevenLabs socket failed ({e}), reconnecting")
+            websocket = None
+        if websocket is None or websocket.state is not State.OPEN:
+            # Closed while idle (inactivity timeout) or failed to open
+            websocket = await self._open_socket()
+        # Open the next turn's socket while this one is spoken
+        self._next = asyncio.create_task(self._open_socket())
+        return ElevenLabsRealtimeTurn(websocket)
+
+    async def close(self) -> None:
+        task, self._next = self._next, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            websocket = await task
+        except BaseException:
+            return
+        await websocket.close()
+
+
+class FakeRealtimeTurn(RealtimeTurn):
+    """
+    Local stand-in for a provider context, for tests and benchmarks.
+
+    Text is spoken when a sentence ends, on flush and on end. Each
+    character becomes FAKE_SECONDS_PER_CHAR of silence, delivered in
+    FAKE_FRAME_SECONDS frames starting FAKE_FIRST_AUDIO_SECONDS after the
+    text is spoken and FAKE_SPEEDUP times faster than real time. Frames
+    wait in a small queue until read, like a provider socket.
+    """
+
+    def __init__(self, encoding: str, sample_rate: int):
+        super().__init__()
+        self._frame = PCM_SILENCE[encoding] * (
+            int(sample_rate * FAKE_FRAME_SECONDS) * PCM_SAMPLE_WIDTHS[encoding]
+        )
+        self._buffer = ""
+        self._inputs: asyncio.Queue = asyncio.Queue()
+        self._events: asyncio.Queue = asyncio.Queue(maxsize=4)
+        self._task = asyncio.create_task(self._generate())
+
+    async def _generate(self) -> None:
+        while True:
+            kind, value = await self._inputs.get()
+            if kind == "speak":
+                await asyncio.sleep(FAKE_FIRST_AUDIO_SECONDS)
+                frames = max(1, round(len(value) * FAKE_SECONDS_PER_CHAR / FAKE_FRAME_SECONDS))
+                for _ in range(frames):
+                    await self._events.put(RealtimeEvent("audio", self._frame))
+                    await asyncio.sleep(FAKE_FRAME_SECONDS / FAKE_SPEEDUP)
+            elif kind == "flushed":
+                await self._events.put(RealtimeEvent("flushed", flush_id=value))
+            else:
+                await self._events.put(RealtimeEvent("done"))
+                return
+
+    def _speak(self, text: str) -> None:
+        if text.strip():
+            self._inputs.put_nowait(("speak", text))
+
+    async def send_text(self, text: str) -> None:
+        self._buffer += text
+        sentences = list(_SENTENCE_END.finditer(self._buffer))
+        if sentences:
+            cut = sentences[-1].end()
+            self._speak(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+
+    async def flush(self) -> int:
+        self.flushes += 1
+        self._speak(self._buffer)
+        self._buffer = ""
+        self._inputs.put_nowait(("flushed", self.flushes))
+        return self.flushes
+
+    async def end(self) -> None:
+        self._speak(self._buffer)
+        self._buffer = ""
+        self._inputs.put_nowait(("done", None))
+
+    async def cancel(self) -> None:
+        self._task.cancel()
+        # Drop unread frames and end events(), which would otherwise wait forever
+        while not self._events.empty():
+            self._events.get_nowait()
+        self._events.put_nowait(RealtimeEvent("done"))
+
+    async def events(self) -> AsyncIterator[RealtimeEvent]:
+        while True:
+            event = await self._events.get()
+            yield event
+            if event.type == "done":
+                return
+
+
+class FakeRealtimeProvider(RealtimeProvider):
+    """Provider for FakeRealtimeTurn (no network, no rate limiting)."""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        voice_id: Optional[str] = None,
+        model_id: Optional[str] = None,
+        language: Optional[str] = None,
+        encoding: str = DEFAULT_REALTIME_ENCODING,
+        sample_rate: int = DEFAULT_REALTIME_SAMPLE_RATE,
+        speed: float = 1.0,
+    ):
+        if encoding not in PCM_SAMPLE_WIDTHS:
+            raise ValueError(f"Unsupported encoding '{encoding}'")
+        super().__init__(voice_id or "fake", model_id or "fake", encoding, sample_rate)
+
+    async def open_turn(self, deadline: Optional[float] = None) -> RealtimeTurn:
+        return FakeRealtimeTurn(self.encoding, self.sample_rate)
+
+
+def create_realtime_provider(
+    provider: str = "cartesia",
+    voice_id: Optional[str] = None,
+    model_id: Optional[str] = None,
+    language: Optional[str] = None,
+    encoding: str = DEFAULT_REALTIME_ENCODING,
+    sample_rate: int = DEFAULT_REALTIME_SAMPLE_RATE,
+    speed: float = 1.0,
+) -> RealtimeProvider:
+    """
+    Create the realtime provider for a session.
+
+    Args:
+        provider: cartesia, elevenlabs or fake
+        voice_id: Voice to use (provider default if None)
+        model_id: Model to use (sonic-3 / eleven_flash_v2_5 if None)
+        language: Language code (optional)
+        encoding: PCM encoding of the audio frames
+        sample_rate: Sample rate of the audio frames in Hz
+        speed: Speaking rate (1.0 = normal)
+
+    Raises:
+        ValueError: If the provider or output format is not supported
+    """
+    providers = {
+        "cartesia": CartesiaRealtimeProvider,
+        "elevenlabs": ElevenLabsRealtimeProvider,
+    }
+    if get_settings().realtime_fake_provider_enabled:
+        providers["fake"] = FakeRealtimeProvider
+    provider_class = providers.get(provider)
+    if provider_class is None:
+        raise ValueError(f"Unknown realtime provider '{provider}' (available: {', '.join(providers)})")
+    return provider_class(voice_id, model_id, language, encoding, sample_rate, speed)
@@ -0,0 +1,205 @@
+"""
+Speech-to-text: pluggable engines and segmented transcription of recordings.
+
+WAV recordings are split at pauses with voice-activity detection
+(app.utils.vad) and the speech segments are transcribed concurrently, so
+a long call takes about as long as its longest segment rather than its
+total length. Other formats are sent to the engine in one request.
+"""
+import asyncio
+import logging
+import time
+from typing import BinaryIO, List, NamedTuple, Optional
+from app.config import get_settings
+from app.utils.vad import SegmentReader, SpeechSegment, read_wav_info, segment_recording
+
+logger = logging.getLogger(__name__)
+
+STT_ENGINES = ["elevenlabs", "fake"]
+
+# Fake engine timing: a fixed latency plus this fraction of the audio length
+FAKE_LATENCY_SECONDS = 0.1
+FAKE_SECONDS_PER_AUDIO_SECOND = 0.05
+
+
+class TranscriptWord(NamedTuple):
+    """A recognized word with its start and end time in seconds."""
+    text: str
+    start: float
+    end: float
+
+
+class Transcript(NamedTuple):
+    """Engine output for one piece of audio."""
+    text: str
+    language: Optional[str]
+    words: List[TranscriptWord]
+
+
+class TranscriptSegment(NamedTuple):
+    """Transcript of one segment, with times relative to the whole recording."""
+    start: float
+    end: float
+    text: str
+    words: List[TranscriptWord]
+
+
+class TranscriptionResult(NamedTuple):
+    """Merged transcript of a recording (duration is None if unknown)."""
+    text: str
+    language: Optional[str]
+    duration: Optional[float]
+    segments: List[TranscriptSegment]
+
+
+class STTEngine:
+    """A speech-to-text backend."""
+
+    name = ""
+
+    async def transcribe(
+        self,
+        audio,
+        filename: str,
+        mime_type: str,
+        language: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> Transcript:
+        """
+        Transcribe one piece of audio.
+
+        Args:
+            audio: Audio bytes, or a seekable file object
+            filename: File name of the audio
+            mime_type: MIME type of the audio
+            language: ISO language code, or None to detect it
+            deadline: Rate limiter deadline (see rate_limiter.queue_deadline)
+        """
+        raise NotImplementedError
+
+
+class ScribeEngine(STTEngine):
+    """ElevenLabs Scribe."""
+
+    name = "elevenlabs"
+
+    async def transcribe(self, audio, filename, mime_type, language=None, deadline=None) -> Transcript:
+        from app.services.elevenlabs_service import transcribe_audio_async
+
+        response = await transcribe_audio_async(audio, filename, mime_type, language, deadline=deadline)
+        words = [
+            TranscriptWord(word.text, word.start or 0.0, word.end or 0.0)
+            for word in response.words or []
+            if word.type == "word"
+        ]
+        return Transcript(response.text.strip(), response.language_code, words)
+
+
+class FakeSTTEngine(STTEngine):
+    """
+    Local stand-in engine for tests and benchmarks.
+
+    Takes FAKE_LATENCY_SECONDS plus FAKE_SECONDS_PER_AUDIO_SECOND per second
+    of audio and "recognizes" one word per second of audio.
+    """
+
+    name = "fake"
+
+    async def transcribe(self, audio, filename, mime_type, language=None, deadline=None) -> Transcript:
+        from app.utils.audio import audio_duration
+
+        if not isinstance(audio, bytes):
+            audio.seek(0)
+            audio = audio.read()
+        duration = audio_duration(audio, mime_type) or 0.0
+        await asyncio.sleep(FAKE_LATENCY_SECONDS + duration * FAKE_SECONDS_PER_AUDIO_SECOND)
+        words = [
+            TranscriptWord(f"word{i + 1}", float(i), min(i + 1.0, duration))
+            for i in range(max(1, int(duration)))
+        ]
+        return Transcript(" ".join(word.text for word in words), language or "en", words)
+
+
+def get_stt_engine() -> STTEngine:
+    """Get the engine selected by STT_ENGINE."""
+    name = get_settings().stt_engine
+    engines = {"elevenlabs": ScribeEngine, "fake": FakeSTTEngine}
+    if name not in engines:
+        raise ValueError(f"Unknown STT engine '{name}' (available: {', '.join(STT_ENGINES)})")
+    return engines[name]()
+
+
+async def transcribe_recording(
+    file: BinaryIO,
+    filename: str,
+    mime_type: str,
+    language: Optional[str] = None,
+    engine: Optional[STTEngine] = None,
+    deadline: Optional[float] = None
+) -> TranscriptionResult:
+    """
+    Transcribe a recording stored in a seekable file.
+
+    WAV files are segmented with voice-activity detection; up to
+    STT_CONCURRENCY segments are transcribed at a time and the results are
+    merged in order, with word times relative to the whole recording.
+    Silence-only recordings produce an empty transcript without calling
+    the engine.
+
+    Raises:
+        ConfigurationError / ProviderBusyError / Exception: From the engine
+    """
+    settings = get_settings()
+    engine = engine or get_stt_engine()
+
+    info = read_wav_info(file)
+    if info is None:
+        # Not segmentable here (compressed or unusual format): one request
+        transcript = await engine.transcribe(file, filename, mime_type, language, deadline)
+        end = transcript.words[-1].end if transcript.words else 0.0
+        segment = TranscriptSegment(0.0, end, transcript.text, transcript.words)
+        return TranscriptionResult(transcript.text, transcript.language, None, [segment])
+
+    started = time.perf_counter()
+    segments = await asyncio.to_thread(segment_recording, file, info, settings.stt_max_segment_seconds)
+    logger.info(
+        f"VAD split {info.duration:.1f}s of audio into {len(segments)} segments "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+    reader = SegmentReader(file, info)
+    semaphore = asyncio.Semaphore(max(1, settings.stt_concurrency))
+
+    async def transcribe_segment(index: int, segment: SpeechSegment) -> Transcript:
+        async with semaphore:
+            audio = await asyncio.to_thread(reader.read, segment)
+            return await engine.transcribe(audio, f"segment-{index}.wav", "audio/wav", language, deadline)
+
+    tasks = [
+        asyncio.ensure_future(transcribe_segment(index, segment))
+        for index, segment in enumerate(segments)
+    ]
+    try:
+        transcripts = await asyncio.gather(*tasks)
+    except BaseException:
+        # One failed segment fails the recording; stop the others
+        for task in tasks:
+            task.cancel()
+        raise
+
+    merged = []
+    for segment, transcript in zip(segments, transcripts):
+        words = [
+            TranscriptWord(word.text, round(segment.start + word.start, 3), round(segment.start + word.end, 3))
+            for word in transcript.words
+        ]
+        merged.append(TranscriptSegment(round(segment.start, 3), round(segment.end, 3), transcript.text, words))
+
+    languages = [transcript.language for transcript in transcripts if transcript.language]
+    text = " ".join(segment.text for segment in merged if segment.text)
+    return TranscriptionResult(
+        text,
+        max(set(languages), key=languages.count) if languages else language,
+        round(info.duration, 3),
+        [segment for segment in merged if segment.text]
+    )
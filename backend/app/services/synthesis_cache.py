@@ -0,0 +1,302 @@
+"""Content-addressed cache for synthesized audio."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def synthesis_cache_key(
+    provider: str,
+    model_id: Optional[str],
+    voice_id: Optional[str],
+    language: Optional[str],
+    output_format: Any,
+    voice_settings: Dict[str, Any],
+    text: str,
+) -> str:
+    """
+    Build the cache key for a synthesis request.
+
+    Every input that changes the produced audio is part of the key, so two
+    requests share an entry only if the provider would return the same clip.
+    Callers should pass resolved values (defaults applied) so that explicit
+    and implicit defaults map to the same entry.
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    canonical = json.dumps(
+        {
+            "provider": provider,
+            "model_id": model_id,
+            "voice_id": voice_id,
+            "language": language,
+            "output_format": output_format,
+            "voice_settings": voice_settings,
+            "text": text,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SynthesisCache:
+    """
+    Two-tier (memory LRU + disk) cache of synthesized audio keyed by content hash.
+
+    The memory tier is bounded by total bytes and evicts least recently used
+    entries. The disk tier stores one file per key and evicts least recently
+    used files once its size budget is exceeded. Disk hits are promoted to
+    memory. All methods are thread-safe; the *_async variants keep disk I/O
+    off the event loop.
+
+    The memory tier is per process. The disk tier can be shared by every
+    process pointing at the same directory: lookups read files written by
+    other processes, and the index of the directory (with file mtimes as
+    the LRU order) is rebuilt every DISK_INDEX_REFRESH_SECONDS, so the byte
+    budget applies to the directory as a whole. Between rebuilds it can be
+    exceeded by what the other processes wrote in the meantime.
+    """
+
+    DISK_INDEX_REFRESH_SECONDS = 60
+
+    def __init__(
+        self,
+        memory_max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir and disk_max_bytes > 0 else None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_index: Optional["OrderedDict[str, int]"] = None
+        self._disk_bytes = 0
+        self._disk_index_loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for key, or None on a miss."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        data = self._disk_get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._memory_put(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store audio under key in both tiers."""
+        if not data:
+            return
+        with self._lock:
+            self.stores += 1
+            self._memory_put(key, data)
+        self._disk_put(key, data)
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        """Async get(); memory hits return without leaving the event loop."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+        return await asyncio.to_thread(self.get, key)
+
+    async def put_async(self, key: str, data: bytes) -> None:
+        """Async put(); disk writes run in a worker thread."""
+        await asyncio.to_thread(self.put, key, data)
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self.disk_dir is not None:
+                index = self._load_disk_index()
+                for key in list(index):
+                    self._disk_remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+                "disk_entries": len(self._disk_index) if self._disk_index is not None else None,
+                "disk_bytes": self._disk_bytes if self._disk_index is not None else None,
+                "disk_max_bytes": self.disk_max_bytes if self.disk_dir is not None else 0,
+            }
+
+    # Memory tier (callers hold self._lock)
+
+    def _memory_put(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # Disk tier
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / key
+
+    def _scan_disk(self) -> "OrderedDict[str, int]":
+        """LRU index of the files on disk, from every process (oldest first)."""
+        entries = []
+        if self.disk_dir.exists():
+            for path in self.disk_dir.glob("*/*"):
+                if path.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    # Evicted by another process while scanning
+                    continue
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+        entries.sort()
+        return OrderedDict((name, size) for _, name, size in entries)
+
+    def _set_disk_index(self, index: "OrderedDict[str, int]") -> None:
+        """Replace the disk index (caller holds self._lock)."""
+        self._disk_index = index
+        self._disk_bytes = sum(index.values())
+        self._disk_index_loaded_at = time.monotonic()
+
+    def _load_disk_index(self) -> "OrderedDict[str, int]":
+        """Build the LRU index of files already on disk (caller holds self._lock)."""
+        if self._disk_index is None:
+            self._set_disk_index(self._scan_disk())
+        return self._disk_index
+
+    def _refresh_disk_index(self) -> None:
+        """Rebuild a stale index so that files written by other processes count towards the budget."""
+        with self._lock:
+            loaded_at = self._disk_index_loaded_at
+            if self._disk_index is not None and time.monotonic() - loaded_at < self.DISK_INDEX_REFRESH_SECONDS:
+                return
+        index = self._scan_disk()
+        with self._lock:
+            # Another thread may have rebuilt it in the meantime
+            if self._disk_index_loaded_at == loaded_at:
+                self._set_disk_index(index)
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if self.disk_dir is None:
+            return None
+        # Not looked up in the index first: the file may have been written by another process
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                if self._disk_index is not None and key in self._disk_index:
+                    self._disk_bytes -= self._disk_index.pop(key)
+            return None
+        with self._lock:
+            index = self._load_disk_index()
+            previous = index.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous
+            index[key] = len(data)
+            self._disk_bytes += len(data)
+        return data
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+        if self.disk_dir is None or len(data) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write synthesis cache entry: {e}")
+            return
+        self._refresh_disk_index()
+        with self._lock:
+            index = self._load_disk_index()
+            previous = index.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous
+            index[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.disk_max_bytes and len(index) > 1:
+                self._disk_remove(next(iter(index)))
+
+    def _disk_remove(self, key: str) -> None:
+        """Remove a disk entry (caller holds self._lock)."""
+        size = self._disk_index.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+        try:
+            self._disk_path(key).unlink()
+        except OSError:
+            pass
+
+
+# Process-wide cache instance (lazy initialization)
+_synthesis_cache: Optional[SynthesisCache] = None
+_synthesis_cache_lock = threading.Lock()
+
+
+def get_synthesis_cache() -> Optional[SynthesisCache]:
+    """Get or initialize the synthesis cache (None when disabled)."""
+    global _synthesis_cache
+    settings = get_settings()
+    if not settings.synthesis_cache_enabled:
+        return None
+    if _synthesis_cache is None:
+        with _synthesis_cache_lock:
+            if _synthesis_cache is None:
+                disk_dir = settings.synthesis_cache_dir or str(
+                    Path(tempfile.gettempdir()) / "voicelab" / "synthesis-cache"
+                )
+                _synthesis_cache = SynthesisCache(
+                    memory_max_bytes=settings.synthesis_cache_memory_max_bytes,
+                    disk_dir=disk_dir,
+                    disk_max_bytes=settings.synthesis_cache_disk_max_bytes,
+                )
+                logger.info(f"Synthesis cache initialized (disk tier: {disk_dir})")
+    return _synthesis_cache
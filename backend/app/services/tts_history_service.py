@@ -0,0 +1,286 @@
+"""TTS history persistence service."""
+import asyncio
+import base64
+import json
+import logging
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import func, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from app import database
+from app.models.tts_request import TTSRequest
+from app.services.audio_store import get_audio_store
+from app.utils.audio import audio_duration
+
+logger = logging.getLogger(__name__)
+
+
+def _audio_duration(audio_bytes: bytes, mime_type: str, output_format: Optional[Dict]) -> Optional[float]:
+    """Duration of generated audio; raw PCM needs the output format's encoding and sample rate."""
+    output_format = output_format or {}
+    return audio_duration(audio_bytes, mime_type, output_format.get("encoding"), output_format.get("sample_rate"))
+
+
+async def record_tts_request(
+    db: AsyncSession,
+    user_id: UUID,
+    text: str,
+    voice_id: Optional[str],
+    audio_bytes: bytes,
+    mime_type: str,
+    commit: bool = True,
+    output_format: Optional[Dict] = None,
+) -> TTSRequest:
+    """
+    Store a completed TTS generation in the user's history.
+
+    The audio is written to the audio store; the row keeps its key, size,
+    MIME type and duration. The blob write runs in a worker thread so it
+    does not block the event loop.
+
+    Args:
+        db: Database session
+        user_id: Owner of the request
+        text: Text that was synthesized
+        voice_id: Voice used for synthesis
+        audio_bytes: Generated audio
+        mime_type: MIME type of the audio (e.g. audio/mpeg)
+        commit: Commit the row; pass False to only flush it, leaving the
+            transaction open for the caller's own writes
+        output_format: Encoding and sample rate of the audio (a Cartesia
+            output_format), needed for the duration of raw PCM
+
+    Returns:
+        The persisted TTSRequest row
+    """
+    audio_key = await asyncio.to_thread(get_audio_store().put, audio_bytes)
+    tts_request = TTSRequest(
+        user_id=user_id,
+        text=text,
+        voice_id=voice_id,
+        audio_key=audio_key,
+        audio_size=len(audio_bytes),
+        audio_mime_type=mime_type,
+        audio_duration=_audio_duration(audio_bytes, mime_type, output_format)
+    )
+    db.add(tts_request)
+    if not commit:
+        await db.flush()
+        return tts_request
+    await db.commit()
+    await db.refresh(tts_request)
+    return tts_request
+
+
+async def record_tts_requests(
+    db: AsyncSession,
+    user_id: UUID,
+    entries: List[Tuple[str, Optional[str], bytes, str, Optional[Dict]]],
+) -> List[TTSRequest]:
+    """
+    Store many completed generations with a single INSERT and commit.
+
+    Args:
+        db: Database session
+        user_id: Owner of the requests
+        entries: (text, voice_id, audio_bytes, mime_type, output_format) per
+            request (see record_tts_request)
+
+    Returns:
+        The persisted TTSRequest rows, in the order of entries
+    """
+    store = get_audio_store()
+    audio_keys = await asyncio.to_thread(
+        lambda: [store.put(audio_bytes) for _, _, audio_bytes, _, _ in entries]
+    )
+    rows = [
+        {
+            "id": uuid4(),
+            "user_id": user_id,
+            "text": text,
+            "voice_id": voice_id,
+            "audio_key": audio_key,
+            "audio_size": len(audio_bytes),
+            "audio_mime_type": mime_type,
+            "audio_duration": _audio_duration(audio_bytes, mime_type, output_format),
+        }
+        for (text, voice_id, audio_bytes, mime_type, output_format), audio_key in zip(entries, audio_keys)
+    ]
+    result = await db.scalars(
+        insert(TTSRequest).returning(TTSRequest, sort_by_parameter_order=True),
+        rows
+    )
+    tts_requests = list(result.all())
+    await db.commit()
+    return tts_requests
+
+
+def encode_history_cursor(created_at: datetime, request_id: UUID) -> str:
+    """Encode the (created_at, id) position of a history row as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{request_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_history_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, request_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), UUID(request_id)
+    except Exception:
+        raise ValueError("Invalid history cursor")
+
+
+async def list_tts_history(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[List[TTSRequest], Optional[str]]:
+    """
+    Return one page of a user's history, newest first.
+
+    Pages are addressed by keyset on (created_at, id), which the
+    (user_id, created_at DESC, id DESC) index serves directly, so the cost
+    of a page does not depend on how deep it is. Only the listing columns
+    are loaded. offset is still accepted for clients that have not moved to
+    cursors, but is ignored when a cursor is given.
+
+    Args:
+        db: Database session
+        user_id: Owner of the history
+        limit: Page size
+        cursor: Cursor returned with the previous page
+        offset: Legacy row offset (used only without a cursor)
+
+    Returns:
+        Tuple of (rows, cursor for the next page or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = select(TTSRequest).options(
+        load_only(
+            TTSRequest.id,
+            TTSRequest.text,
+            TTSRequest.voice_id,
+            TTSRequest.audio_key,
+            TTSRequest.audio_size,
+            TTSRequest.audio_mime_type,
+            TTSRequest.audio_duration,
+            TTSRequest.created_at,
+        )
+    ).where(
+        TTSRequest.user_id == user_id
+    )
+    
+    if cursor:
+        cursor_created_at, cursor_id = decode_history_cursor(cursor)
+        query = query.where(
+            tuple_(TTSRequest.created_at, TTSRequest.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    elif offset:
+        query = query.offset(offset)
+    
+    # Fetch one extra row to learn whether there is a next page
+    result = await db.execute(
+        query.order_by(
+            TTSRequest.created_at.desc(),
+            TTSRequest.id.desc()
+        ).limit(limit + 1)
+    )
+    rows = list(result.scalars().all())
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_history_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+async def count_tts_history(db: AsyncSession, user_id: UUID, exact: bool = False) -> int:
+    """
+    Count a user's history rows.
+
+    The exact count scans all of the user's rows. The estimate reads the
+    planner's row estimate for the same filter, which costs no more than
+    planning the query.
+
+    Args:
+        db: Database session
+        user_id: Owner of the history
+        exact: Whether to run an exact COUNT(*)
+
+    Returns:
+        Number of rows (approximate unless exact is set)
+    """
+    if exact:
+        result = await db.execute(
+            select(func.count()).select_from(TTSRequest).where(TTSRequest.user_id == user_id)
+        )
+        return result.scalar_one()
+    
+    plan = (await db.execute(
+        text("EXPLAIN (FORMAT JSON) SELECT 1 FROM tts_requests WHERE user_id = :user_id"),
+        {"user_id": user_id}
+    )).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def stream_and_record(
+    first_chunk: bytes,
+    chunks: AsyncGenerator[bytes, None],
+    user_id: UUID,
+    text: str,
+    voice_id: Optional[str],
+    mime_type: str,
+    output_format: Optional[Dict] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Forward audio chunks to the client and record history once complete.
+
+    The request-scoped session may already be closed while a streaming
+    response is being sent, so history is written with a fresh session.
+    Nothing is recorded if the stream fails or the client disconnects.
+
+    Args:
+        first_chunk: Chunk already pulled from the stream (used to surface
+            provider errors before the response starts)
+        chunks: Remaining audio chunks
+        user_id: Owner of the request
+        text: Text that was synthesized
+        voice_id: Voice used for synthesis
+        mime_type: MIME type of the audio
+        output_format: Encoding and sample rate of the audio (see
+            record_tts_request)
+
+    Yields:
+        Audio chunks, in order
+    """
+    collected = [first_chunk]
+    # Closing the provider stream when the client disconnects ends its upstream request
+    async with aclosing(chunks):
+        yield first_chunk
+        async for chunk in chunks:
+            collected.append(chunk)
+            yield chunk
+
+    async with database.AsyncSessionLocal() as db:
+        try:
+            await record_tts_request(
+                db, user_id, text, voice_id, b"".join(collected), mime_type, output_format=output_format
+            )
+        except Exception as e:
+            logger.error(f"Failed to record streamed TTS request: {e}")
+            await db.rollback()
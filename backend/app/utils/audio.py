@@ -0,0 +1,267 @@
+"""Audio container helpers."""
+import struct
+from typing import Dict, List, Optional, Tuple
+
+# WAV format tags and sample widths for the PCM encodings Cartesia produces
+PCM_ENCODINGS = {
+    "pcm_f32le": {"format_tag": 3, "sample_width": 4},  # IEEE float
+    "pcm_s16le": {"format_tag": 1, "sample_width": 2},  # Integer PCM
+    "pcm_alaw": {"format_tag": 6, "sample_width": 1},   # A-law
+    "pcm_mulaw": {"format_tag": 7, "sample_width": 1},  # mu-law
+}
+
+# Placeholder size used when the final length is unknown (streaming)
+STREAMING_DATA_SIZE = 0xFFFFFFFF
+
+
+def wav_header(
+    sample_rate: int,
+    encoding: str = "pcm_f32le",
+    num_channels: int = 1,
+    data_size: Optional[int] = None,
+) -> bytes:
+    """
+    Build a RIFF/WAVE header for raw PCM data.
+
+    Args:
+        sample_rate: Sample rate in Hz
+        encoding: PCM encoding (pcm_f32le, pcm_s16le, pcm_alaw, pcm_mulaw)
+        num_channels: Number of interleaved channels
+        data_size: Size of the PCM payload in bytes, or None when streaming
+            (sizes are then set to the maximum value, which players treat as
+            "read until end of stream")
+
+    Returns:
+        44-byte WAV header
+
+    Raises:
+        ValueError: If the encoding is not supported
+    """
+    if encoding not in PCM_ENCODINGS:
+        raise ValueError(f"Unsupported PCM encoding: {encoding}")
+
+    format_tag = PCM_ENCODINGS[encoding]["format_tag"]
+    sample_width = PCM_ENCODINGS[encoding]["sample_width"]
+    block_align = num_channels * sample_width
+    byte_rate = sample_rate * block_align
+
+    if data_size is None:
+        data_size = STREAMING_DATA_SIZE
+        riff_size = STREAMING_DATA_SIZE
+    else:
+        riff_size = min(36 + data_size, STREAMING_DATA_SIZE)
+
+    return (
+        b"RIFF"
+        + struct.pack("<I", riff_size)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack(
+            "<IHHIIHH",
+            16,
+            format_tag,
+            num_channels,
+            sample_rate,
+            byte_rate,
+            block_align,
+            sample_width * 8,
+        )
+        + b"data"
+        + struct.pack("<I", data_size)
+    )
+
+
+def parse_wav(data: bytes) -> Optional[Tuple[Dict, bytes]]:
+    """
+    Split a WAV file into its format and PCM payload.
+
+    Returns:
+        Tuple of (format dict with format_tag, num_channels, sample_rate,
+        byte_rate, block_align, bits_per_sample; payload bytes), or None if
+        data is not a WAV file. Streaming headers with unknown length yield
+        the payload actually present.
+    """
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack("<I", data[offset + 4:offset + 8])[0]
+        if chunk_id == b"fmt ":
+            fields = struct.unpack("<HHIIHH", data[offset + 8:offset + 24])
+            fmt = dict(zip(
+                ("format_tag", "num_channels", "sample_rate", "byte_rate", "block_align", "bits_per_sample"),
+                fields,
+            ))
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            start = offset + 8
+            return fmt, data[start:start + min(chunk_size, len(data) - start)]
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _wav_encoding(fmt: Dict) -> str:
+    for encoding, spec in PCM_ENCODINGS.items():
+        if spec["format_tag"] == fmt["format_tag"] and spec["sample_width"] * 8 == fmt["bits_per_sample"]:
+            return encoding
+    raise ValueError(f"Unsupported WAV format tag: {fmt['format_tag']}")
+
+
+def concat_wav(parts: List[bytes]) -> bytes:
+    """
+    Join WAV files with the same format into one WAV file.
+
+    The PCM payloads are concatenated and a single header with the total
+    size is written.
+
+    Raises:
+        ValueError: If a part is not WAV or the formats differ
+    """
+    parsed = [parse_wav(part) for part in parts]
+    if not parsed or any(item is None for item in parsed):
+        raise ValueError("Cannot concatenate: not a WAV file")
+    fmt = parsed[0][0]
+    if any(item[0] != fmt for item in parsed[1:]):
+        raise ValueError("Cannot concatenate WAV files with different formats")
+    payload = b"".join(item[1] for item in parsed)
+    return wav_header(
+        fmt["sample_rate"],
+        _wav_encoding(fmt),
+        num_channels=fmt["num_channels"],
+        data_size=len(payload),
+    ) + payload
+
+
+# MPEG audio bitrates in kbps, indexed by [version is MPEG-1][bitrate index]
+_MP3_BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0],
+}
+
+# Sample rates in Hz, indexed by [version bits][sample rate index]
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+
+def _id3v2_size(data: bytes) -> int:
+    """Return the length of a leading ID3v2 tag (0 if there is none)."""
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = data[6:10]
+    return 10 + ((size[0] << 21) | (size[1] << 14) | (size[2] << 7) | size[3])
+
+
+def _mp3_frame(data: bytes, i: int) -> Optional[Tuple[int, int]]:
+    """Return (bitrate in bits/s, frame length) of a Layer III frame at i, if any."""
+    if i + 4 > len(data) or data[i] != 0xFF or (data[i + 1] & 0xE0) != 0xE0:
+        return None
+    version_bits = (data[i + 1] >> 3) & 0x03
+    layer_bits = (data[i + 1] >> 1) & 0x03
+    bitrate_index = (data[i + 2] >> 4) & 0x0F
+    sample_rate_index = (data[i + 2] >> 2) & 0x03
+    padding = (data[i + 2] >> 1) & 0x01
+    if version_bits == 1 or layer_bits != 1 or sample_rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES[version_bits == 3][bitrate_index] * 1000
+    if not bitrate:
+        return None
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+    coefficient = 144 if version_bits == 3 else 72
+    return bitrate, coefficient * bitrate // sample_rate + padding
+
+
+def _find_mp3_frame(data: bytes, offset: int, limit: int = 64 * 1024) -> Optional[int]:
+    """Return the offset of the first Layer III frame at or after offset."""
+    end = min(len(data) - 3, offset + limit)
+    for i in range(offset, max(end, offset)):
+        if _mp3_frame(data, i) is not None:
+            return i
+    return None
+
+
+def _mp3_bitrate(data: bytes) -> Optional[int]:
+    """Return the bitrate (bits/s) of the first Layer III frame, if any."""
+    start = _find_mp3_frame(data, _id3v2_size(data))
+    return _mp3_frame(data, start)[0] if start is not None else None
+
+
+def mp3_audio_frames(data: bytes) -> bytes:
+    """
+    Return the audio frames of an MP3 file without its metadata.
+
+    Drops ID3v2/ID3v1 tags and a leading Xing/Info/VBRI frame, which
+    describe the whole file and would be wrong once files are joined.
+    """
+    start = _find_mp3_frame(data, _id3v2_size(data))
+    if start is None:
+        return b""
+    end = len(data) - 128 if len(data) >= 128 and data[-128:-125] == b"TAG" else len(data)
+    frame_length = _mp3_frame(data, start)[1]
+    first_frame = data[start:start + frame_length]
+    if b"Xing" in first_frame or b"Info" in first_frame or b"VBRI" in first_frame:
+        start += frame_length
+    return data[start:end]
+
+
+def concat_mp3(parts: List[bytes]) -> bytes:
+    """
+    Join MP3 files into one stream by concatenating their frames.
+
+    MP3 frames are self-contained, so frame-aligned concatenation plays
+    back seamlessly as long as the parts share a format. The leading ID3v2
+    tag of the first part is kept.
+    """
+    if not parts:
+        return b""
+    head = parts[0][:_id3v2_size(parts[0])]
+    return head + b"".join(mp3_audio_frames(part) for part in parts)
+
+
+def audio_duration(
+    data: bytes,
+    mime_type: str,
+    encoding: Optional[str] = None,
+    sample_rate: Optional[int] = None,
+    num_channels: int = 1,
+) -> Optional[float]:
+    """
+    Estimate the duration of an audio clip in seconds.
+
+    WAV durations are exact (from the fmt/data chunks; streaming headers
+    with unknown length use the actual payload size). MP3 durations assume
+    constant bitrate, which is what ElevenLabs produces. Raw PCM has no
+    header, so its duration needs the encoding and sample rate.
+
+    Args:
+        data: Audio bytes
+        mime_type: MIME type of the audio
+        encoding: PCM encoding of raw audio (audio/pcm)
+        sample_rate: Sample rate of raw audio in Hz
+        num_channels: Number of interleaved channels of raw audio
+
+    Returns:
+        Duration in seconds, or None if it cannot be determined
+    """
+    if mime_type in ("audio/wav", "audio/x-wav", "audio/wave"):
+        parsed = parse_wav(data)
+        if parsed is None:
+            return None
+        fmt, payload = parsed
+        return len(payload) / fmt["byte_rate"] if fmt["byte_rate"] else None
+
+    if mime_type in ("audio/mpeg", "audio/mp3"):
+        bitrate = _mp3_bitrate(data)
+        return len(data) * 8 / bitrate if bitrate else None
+
+    if mime_type == "audio/pcm":
+        if encoding not in PCM_ENCODINGS or not sample_rate:
+            return None
+        return len(data) / (sample_rate * PCM_ENCODINGS[encoding]["sample_width"] * num_channels)
+
+    return None
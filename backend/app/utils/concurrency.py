@@ -0,0 +1,363 @@
+"""Helpers for running blocking work without stalling the event loop."""
+import asyncio
+import concurrent.futures
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, TypeVar
+from app.config import get_settings
+
+T = TypeVar("T")
+
+# Executor used for blocking provider SDK calls (lazy initialization)
+_provider_executor: Optional[ThreadPoolExecutor] = None
+_provider_executor_lock = threading.Lock()
+
+# Executor used for CPU-bound work such as audio processing (lazy initialization)
+_process_executor: Optional[ProcessPoolExecutor] = None
+_process_executor_lock = threading.Lock()
+
+# Durations of the provider calls made in the current context (see provider_call_timer)
+_provider_call_durations: ContextVar[Optional[List[float]]] = ContextVar("provider_call_durations", default=None)
+
+
+def get_provider_executor() -> ThreadPoolExecutor:
+    """Get or initialize the bounded thread pool used for provider calls."""
+    global _provider_executor
+    if _provider_executor is None:
+        with _provider_executor_lock:
+            if _provider_executor is None:
+                settings = get_settings()
+                _provider_executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.provider_max_workers),
+                    thread_name_prefix="provider",
+                )
+    return _provider_executor
+
+
+async def run_in_provider_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking provider call in the bounded provider thread pool.
+
+    Args:
+        func: Blocking callable (e.g. an SDK request)
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The value returned by func
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    result = await loop.run_in_executor(
+        get_provider_executor(),
+        functools.partial(func, *args, **kwargs),
+    )
+    durations = _provider_call_durations.get()
+    if durations is not None:
+        durations.append(time.perf_counter() - started)
+    return result
+
+
+@contextmanager
+def provider_call_timer() -> Iterator[List[float]]:
+    """
+    Collect the durations of the successful run_in_provider_executor() calls made in the block.
+
+    Tasks started inside the block (parallel chunks, a coalesced call led
+    by this caller) report into the same list. Synthesis cache hits, rate
+    limiter waits and calls coalesced into another caller's request do not
+    reach the provider, so an empty list means no provider round trip.
+    """
+    durations: List[float] = []
+    token = _provider_call_durations.set(durations)
+    try:
+        yield durations
+    finally:
+        _provider_call_durations.reset(token)
+
+
+async def iterate_in_provider_executor(
+    func: Callable[..., Iterable[T]],
+    *args: Any,
+    max_buffered: int = 32,
+    **kwargs: Any
+) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterator (e.g. an SDK chunk stream) from async code.
+    
+    The iterator is created and drained in the provider thread pool and each
+    item is handed to the event loop as soon as it arrives. At most
+    max_buffered items are held in memory; the worker thread waits when the
+    consumer falls behind. Closing the async iterator (e.g. when a client
+    disconnects) stops the worker thread at the next item.
+    
+    Args:
+        func: Callable returning a blocking iterable
+        *args: Positional arguments for func
+        max_buffered: Maximum number of items buffered between threads
+        **kwargs: Keyword arguments for func
+    
+    Yields:
+        Items produced by the iterable, in order
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item) -> bool:
+        try:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        except RuntimeError:
+            # Event loop already closed
+            return False
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stop.is_set():
+                    future.cancel()
+                    return False
+    
+    def produce() -> None:
+        iterator = None
+        try:
+            iterator = iter(func(*args, **kwargs))
+            for item in iterator:
+                if stop.is_set() or not put((item, None)):
+                    break
+            else:
+                put((done, None))
+        except BaseException as e:
+            put((done, e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if stop.is_set() and close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+    
+    loop.run_in_executor(get_provider_executor(), produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+    
+    The first caller for a key starts the work; callers arriving while it
+    is in flight await the same result (or exception). A waiter being
+    cancelled does not cancel the shared work. Once the work finishes the
+    key is released, so the next call starts fresh.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+    
+    def in_flight(self, key: Hashable) -> bool:
+        """Return whether work for key is currently running."""
+        return key in self._inflight
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func() for key, or join the run already in flight.
+        
+        Args:
+            key: Identity of the work
+            func: Coroutine function performing the work
+        
+        Returns:
+            The result of the shared run
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._release, key))
+        return await asyncio.shield(future)
+    
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter has gone away
+        if not future.cancelled():
+            future.exception()
+
+
+class _SharedStream:
+    """One running source stream and the chunks it has produced so far."""
+    
+    def __init__(self, source: AsyncIterator[T]):
+        self.chunks: list = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.consumers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump(source))
+    
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    async def changed(self) -> None:
+        """Wait for the next chunk or the end of the stream."""
+        await self._changed.wait()
+    
+    async def _pump(self, source: AsyncIterator[T]) -> None:
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self.done = True
+            self._notify()
+
+
+class StreamFanout:
+    """
+    Share one async chunk stream among concurrent consumers with the same key.
+    
+    The first consumer for a key starts the source; consumers arriving while
+    it runs receive every chunk from the start (replayed from a buffer) and
+    then follow it live. An error in the source is raised to every consumer
+    after the chunks that preceded it. A consumer stopping early (e.g. a
+    client disconnecting) does not affect the others; when the last one
+    stops the source is cancelled. Once the source ends, or is cancelled,
+    the key is released, so the next consumer starts fresh.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, _SharedStream] = {}
+    
+    def in_flight(self, key: Hashable) -> bool:
+        """Return whether a stream for key is currently running."""
+        return key in self._inflight
+    
+    async def stream(self, key: Hashable, source: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Iterate source() for key, or join the stream already in flight.
+        
+        Args:
+            key: Identity of the stream
+            source: Function returning the async iterator to share
+        
+        Yields:
+            Every item of the shared stream, in order
+        """
+        shared = self._inflight.get(key)
+        if shared is None:
+            shared = _SharedStream(source())
+            self._inflight[key] = shared
+            shared.task.add_done_callback(lambda _: self._release(key, shared))
+        shared.consumers += 1
+        try:
+            index = 0
+            while True:
+                if index < len(shared.chunks):
+                    yield shared.chunks[index]
+                    index += 1
+                elif shared.done:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                else:
+                    await shared.changed()
+        finally:
+            shared.consumers -= 1
+            if not shared.consumers and not shared.done:
+                # Nobody is listening any more: stop the upstream call
+                self._release(key, shared)
+                shared.task.cancel()
+    
+    def _release(self, key: Hashable, shared: _SharedStream) -> None:
+        if self._inflight.get(key) is shared:
+            del self._inflight[key]
+
+
+def shutdown_provider_executor(wait: bool = True) -> None:
+    """Shut down the provider thread pool (used on application shutdown)."""
+    global _provider_executor
+    with _provider_executor_lock:
+        if _provider_executor is not None:
+            _provider_executor.shutdown(wait=wait)
+            _provider_executor = None
+
+
+def get_process_executor() -> ProcessPoolExecutor:
+    """
+    Get or initialize the worker process pool used for CPU-bound work.
+    
+    Workers are started with forkserver (spawn where unavailable) rather
+    than forked from the server, whose threads and event loop must not be
+    copied into them.
+    """
+    global _process_executor
+    if _process_executor is None:
+        with _process_executor_lock:
+            if _process_executor is None:
+                settings = get_settings()
+                methods = multiprocessing.get_all_start_methods()
+                _process_executor = ProcessPoolExecutor(
+                    max_workers=max(1, settings.audio_process_workers),
+                    mp_context=multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn"),
+                )
+    return _process_executor
+
+
+async def run_in_process_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run CPU-bound work in the worker process pool.
+    
+    func must be a module-level function and its arguments and result
+    picklable. If a worker dies the pool is replaced, so only the calls
+    running at that moment fail.
+    
+    Args:
+        func: CPU-bound callable
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+    
+    Returns:
+        The value returned by func
+    """
+    global _process_executor
+    loop = asyncio.get_running_loop()
+    executor = get_process_executor()
+    try:
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        with _process_executor_lock:
+            if _process_executor is executor:
+                _process_executor = None
+        raise
+
+
+def shutdown_process_executor(wait: bool = True) -> None:
+    """Shut down the worker process pool (used on application shutdown)."""
+    global _process_executor
+    with _process_executor_lock:
+        if _process_executor is not None:
+            _process_executor.shutdown(wait=wait, cancel_futures=True)
+            _process_executor = None
@@ -0,0 +1,249 @@
+"""
+PCM post-processing of generated speech (NumPy).
+
+A clip is trimmed of leading and trailing silence, resampled, normalized
+to a target loudness and converted to the requested sample format, all
+with whole-array operations. The functions here are CPU-bound and
+self-contained (no application state), so they can run in a worker
+process; see app.utils.concurrency.run_in_process_executor.
+"""
+from typing import NamedTuple, Optional
+import math
+import numpy as np
+from app.utils.audio import PCM_ENCODINGS, parse_wav, wav_header
+
+# Encodings that can be decoded and produced here
+POSTPROCESS_ENCODINGS = ["pcm_f32le", "pcm_s16le"]
+
+# Silence trimming: peak level is measured over windows of this length ...
+TRIM_WINDOW_SECONDS = 0.01
+# ... and this much audio is kept before the first and after the last loud window
+TRIM_PAD_SECONDS = 0.05
+
+# Loudness measurement (gated mean power, after ITU-R BS.1770)
+LOUDNESS_BLOCK_SECONDS = 0.4
+LOUDNESS_HOP_SECONDS = 0.1
+# Blocks quieter than this (dBFS) are ignored ...
+ABSOLUTE_GATE_DBFS = -70.0
+# ... as are blocks this far below the mean of the remaining blocks
+RELATIVE_GATE_DB = 10.0
+# Normalization never raises the peak above this level (dBFS)
+PEAK_CEILING_DBFS = -1.0
+
+# Zeros appended before resampling, so the FFT does not wrap the end onto the start
+RESAMPLE_GUARD_SAMPLES = 256
+
+
+class PostProcessOptions(NamedTuple):
+    """What to do to a clip (target_loudness_dbfs None skips normalization)."""
+    trim_silence: bool = True
+    silence_threshold_dbfs: float = -50.0
+    target_loudness_dbfs: Optional[float] = -20.0
+
+
+def decode_pcm(data: bytes, encoding: str, num_channels: int = 1) -> np.ndarray:
+    """
+    Decode PCM bytes to float32 samples in [-1, 1], shaped (frames, channels).
+
+    Raises:
+        ValueError: If the encoding is not in POSTPROCESS_ENCODINGS
+    """
+    if encoding == "pcm_f32le":
+        samples = np.frombuffer(data, dtype="<f4", count=len(data) // 4)
+    elif encoding == "pcm_s16le":
+        samples = np.frombuffer(data, dtype="<i2", count=len(data) // 2).astype(np.float32) / 32768
+    else:
+        raise ValueError(f"Cannot post-process {encoding} audio")
+    usable = len(samples) // num_channels * num_channels
+    return samples[:usable].reshape(-1, num_channels)
+
+
+def encode_pcm(samples: np.ndarray, encoding: str) -> bytes:
+    """
+    Encode float samples shaped (frames, channels) as interleaved PCM bytes.
+
+    pcm_s16le is rounded to the nearest step and clipped to full scale.
+
+    Raises:
+        ValueError: If the encoding is not in POSTPROCESS_ENCODINGS
+    """
+    if encoding == "pcm_f32le":
+        return samples.astype("<f4").tobytes()
+    if encoding == "pcm_s16le":
+        return np.clip(np.rint(samples * 32767), -32768, 32767).astype("<i2").tobytes()
+    raise ValueError(f"Cannot post-process to {encoding} audio")
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_dbfs: float = -50.0,
+    pad_seconds: float = TRIM_PAD_SECONDS,
+) -> np.ndarray:
+    """
+    Cut leading and trailing silence.
+
+    Everything before the first and after the last TRIM_WINDOW_SECONDS
+    window whose peak exceeds threshold_dbfs is removed, keeping
+    pad_seconds on each side. A clip without any loud window is returned
+    unchanged.
+    """
+    window = max(1, int(sample_rate * TRIM_WINDOW_SECONDS))
+    frames = len(samples)
+    count = -(-frames // window)
+    if not count:
+        return samples
+    peaks = np.abs(samples).max(axis=1)
+    peaks = np.pad(peaks, (0, count * window - frames)).reshape(count, window).max(axis=1)
+    loud = np.flatnonzero(peaks > 10 ** (threshold_dbfs / 20))
+    if not len(loud):
+        return samples
+    pad = int(sample_rate * pad_seconds)
+    start = max(0, int(loud[0]) * window - pad)
+    end = min(frames, (int(loud[-1]) + 1) * window + pad)
+    return samples[start:end]
+
+
+def _fft_length(n: int) -> int:
+    """Smallest length >= n with no prime factor above 5 (fast to transform)."""
+    best = 1 << max(0, (n - 1).bit_length())
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            length = power35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Change the sample rate by truncating or zero-padding the spectrum.
+
+    Downsampling drops everything above the new Nyquist frequency, so it
+    needs no separate anti-aliasing filter.
+    """
+    frames = len(samples)
+    if source_rate == target_rate or not frames:
+        return samples
+    # Both transform lengths are multiples of the reduced rate ratio, so
+    # the ratio is exact and neither length has a large prime factor
+    divisor = math.gcd(source_rate, target_rate)
+    source_step, target_step = source_rate // divisor, target_rate // divisor
+    blocks = _fft_length(-(-(frames + RESAMPLE_GUARD_SAMPLES) // source_step))
+    padded, resampled = blocks * source_step, blocks * target_step
+    spectrum = np.fft.rfft(samples, n=padded, axis=0)
+    bins = resampled // 2 + 1
+    if bins <= len(spectrum):
+        spectrum = spectrum[:bins]
+    else:
+        spectrum = np.pad(spectrum, ((0, bins - len(spectrum)), (0, 0)))
+    output = np.fft.irfft(spectrum, n=resampled, axis=0) * (resampled / padded)
+    return output[:frames * target_step // source_step].astype(np.float32)
+
+
+def loudness_dbfs(samples: np.ndarray, sample_rate: int) -> Optional[float]:
+    """
+    Gated loudness of a clip in dBFS (mean power of the non-silent blocks).
+
+    The clip is measured in overlapping LOUDNESS_BLOCK_SECONDS blocks;
+    blocks below ABSOLUTE_GATE_DBFS, then blocks more than RELATIVE_GATE_DB
+    below the mean of the rest, are left out, so pauses do not pull the
+    measurement down.
+
+    Returns:
+        Loudness, or None if the clip is silent
+    """
+    frames = len(samples)
+    if not frames:
+        return None
+    block = min(frames, max(1, int(sample_rate * LOUDNESS_BLOCK_SECONDS)))
+    hop = max(1, int(sample_rate * LOUDNESS_HOP_SECONDS))
+    energy = np.concatenate(([0.0], np.cumsum(np.mean(np.square(samples, dtype=np.float64), axis=1))))
+    starts = np.arange(0, frames - block + 1, hop)
+    power = (energy[starts + block] - energy[starts]) / block
+
+    gated = power[power > 10 ** (ABSOLUTE_GATE_DBFS / 10)]
+    if not len(gated):
+        return None
+    gated = gated[gated > np.mean(gated) * 10 ** (-RELATIVE_GATE_DB / 10)]
+    return float(10 * np.log10(np.mean(gated)))
+
+
+def normalize_loudness(samples: np.ndarray, sample_rate: int, target_dbfs: float) -> np.ndarray:
+    """
+    Scale a clip to target_dbfs loudness (see loudness_dbfs).
+
+    The gain is limited so the peak stays at or below PEAK_CEILING_DBFS.
+    Silent clips are returned unchanged.
+    """
+    loudness = loudness_dbfs(samples, sample_rate)
+    if loudness is None:
+        return samples
+    gain = 10 ** ((target_dbfs - loudness) / 20)
+    peak = float(np.max(np.abs(samples)))
+    if peak > 0:
+        gain = min(gain, 10 ** (PEAK_CEILING_DBFS / 20) / peak)
+    return samples * np.float32(gain)
+
+
+def postprocess_wav(
+    audio: bytes,
+    encoding: str,
+    sample_rate: int,
+    container: str = "wav",
+    options: PostProcessOptions = PostProcessOptions(),
+) -> bytes:
+    """
+    Post-process a WAV clip into the requested format.
+
+    Trims silence, resamples to sample_rate, normalizes loudness and
+    converts to encoding, in that order (normalizing last keeps the peak
+    ceiling exact after resampling).
+
+    Args:
+        audio: WAV file with pcm_f32le or pcm_s16le samples
+        encoding: Output encoding (pcm_f32le or pcm_s16le)
+        sample_rate: Output sample rate in Hz
+        container: wav (with header) or raw (bare PCM)
+        options: Which steps to apply
+
+    Returns:
+        The processed clip
+
+    Raises:
+        ValueError: If the input is not a supported WAV file or the output
+            format is not supported
+    """
+    parsed = parse_wav(audio)
+    if parsed is None:
+        raise ValueError("Cannot post-process: not a WAV file")
+    fmt, payload = parsed
+    source_encoding = next(
+        (
+            name for name, spec in PCM_ENCODINGS.items()
+            if spec["format_tag"] == fmt["format_tag"] and spec["sample_width"] * 8 == fmt["bits_per_sample"]
+        ),
+        None
+    )
+    if source_encoding not in POSTPROCESS_ENCODINGS:
+        raise ValueError("Cannot post-process: unsupported WAV sample format")
+    if encoding not in POSTPROCESS_ENCODINGS:
+        raise ValueError(f"Cannot post-process to {encoding} audio")
+    num_channels = fmt["num_channels"] or 1
+
+    samples = decode_pcm(payload, source_encoding, num_channels)
+    if options.trim_silence:
+        samples = trim_silence(samples, fmt["sample_rate"], options.silence_threshold_dbfs)
+    samples = resample(samples, fmt["sample_rate"], sample_rate)
+    if options.target_loudness_dbfs is not None:
+        samples = normalize_loudness(samples, sample_rate, options.target_loudness_dbfs)
+
+    data = encode_pcm(samples, encoding)
+    if container == "raw":
+        return data
+    return wav_header(sample_rate, encoding, num_channels, len(data)) + data
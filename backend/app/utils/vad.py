@@ -0,0 +1,323 @@
+"""
+Voice activity detection and segmentation of long recordings (NumPy).
+
+Recordings are read from a seekable file in blocks, so a long call never
+has to be held in memory. Speech is detected from short-term frame energy
+against an adaptive noise floor; the speech regions are then packed into
+segments of at most max_segment_seconds that can be transcribed
+independently, cutting long monologues at their quietest pause.
+"""
+import struct
+import threading
+from typing import BinaryIO, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.utils.audio import wav_header
+
+# WAV format tags read by this module (others are not segmented)
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_ALAW = 6
+WAVE_FORMAT_MULAW = 7
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Detection defaults
+FRAME_SECONDS = 0.03
+# Frames this far above the noise floor (dB) count as speech ...
+SPEECH_MARGIN_DB = 12.0
+# ... as long as they are above this absolute level (dBFS)
+MIN_SPEECH_DBFS = -50.0
+# Pauses shorter than this do not end a speech region
+MIN_SILENCE_SECONDS = 0.5
+# Speech regions shorter than this are dropped (clicks, breaths)
+MIN_SPEECH_SECONDS = 0.25
+# Audio kept around each speech region so word edges are not clipped
+PAD_SECONDS = 0.2
+# Seconds of audio analysed per block
+BLOCK_SECONDS = 60
+
+
+class WavInfo(NamedTuple):
+    """Layout of a WAV file's sample data."""
+    format_tag: int
+    num_channels: int
+    sample_rate: int
+    sample_width: int
+    data_offset: int
+    num_frames: int
+
+    @property
+    def block_align(self) -> int:
+        return self.num_channels * self.sample_width
+
+    @property
+    def duration(self) -> float:
+        return self.num_frames / self.sample_rate
+
+
+class SpeechSegment(NamedTuple):
+    """A span of a recording, in seconds."""
+    start: float
+    end: float
+
+
+def _g711_table(mulaw: bool) -> np.ndarray:
+    """Decode table for 8-bit mu-law / A-law samples (to float in [-1, 1])."""
+    values = np.arange(256, dtype=np.int32)
+    if mulaw:
+        inverted = ~values & 0xFF
+        exponent = (inverted >> 4) & 0x07
+        magnitude = (((inverted & 0x0F) << 3) + 0x84 << exponent) - 0x84
+        decoded = np.where(inverted & 0x80, -magnitude, magnitude)
+        return (decoded / 32768.0).astype(np.float32)
+    toggled = values ^ 0x55
+    exponent = (toggled >> 4) & 0x07
+    mantissa = toggled & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0)
+    )
+    decoded = np.where(toggled & 0x80, magnitude, -magnitude)
+    return (decoded / 32768.0).astype(np.float32)
+
+
+_MULAW_TABLE = _g711_table(mulaw=True)
+_ALAW_TABLE = _g711_table(mulaw=False)
+
+
+def read_wav_info(file: BinaryIO) -> Optional[WavInfo]:
+    """
+    Read the header of a WAV file.
+
+    Only the chunk headers are read; the file position is left undefined.
+
+    Returns:
+        WavInfo, or None if the file is not a WAV file in a format this
+        module can decode (8/16/32-bit PCM, 32-bit float, mu-law, A-law)
+    """
+    file.seek(0, 2)
+    file_size = file.tell()
+    file.seek(0)
+    header = file.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= file_size:
+        file.seek(offset)
+        chunk_id, chunk_size = struct.unpack("<4sI", file.read(8))
+        if chunk_id == b"fmt ":
+            data = file.read(min(chunk_size, 40))
+            if len(data) < 16:
+                return None
+            format_tag, num_channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", data[:16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and len(data) >= 26:
+                # The sub-format GUID starts with the actual format tag
+                format_tag = struct.unpack("<H", data[24:26])[0]
+            fmt = (format_tag, num_channels, sample_rate, bits // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            format_tag, num_channels, sample_rate, sample_width = fmt
+            supported = {
+                WAVE_FORMAT_PCM: (1, 2, 4),
+                WAVE_FORMAT_IEEE_FLOAT: (4,),
+                WAVE_FORMAT_ALAW: (1,),
+                WAVE_FORMAT_MULAW: (1,),
+            }
+            if sample_width not in supported.get(format_tag, ()) or not num_channels or not sample_rate:
+                return None
+            data_offset = offset + 8
+            # Streaming headers carry a placeholder size; use what is present
+            data_size = min(chunk_size, file_size - data_offset)
+            return WavInfo(
+                format_tag, num_channels, sample_rate, sample_width,
+                data_offset, data_size // (num_channels * sample_width)
+            )
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def read_frames(file: BinaryIO, info: WavInfo, start: int, count: int) -> bytes:
+    """Read count frames starting at frame start, as stored in the file."""
+    file.seek(info.data_offset + start * info.block_align)
+    return file.read(max(0, min(count, info.num_frames - start)) * info.block_align)
+
+
+def to_mono_float(data: bytes, info: WavInfo) -> np.ndarray:
+    """Decode stored frames to mono float32 samples in [-1, 1]."""
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        samples = np.frombuffer(data, dtype="<f4")
+    elif info.format_tag == WAVE_FORMAT_MULAW:
+        samples = _MULAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+    elif info.format_tag == WAVE_FORMAT_ALAW:
+        samples = _ALAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+    elif info.sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif info.sample_width == 2:
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768
+    else:
+        samples = np.frombuffer(data, dtype="<i4").astype(np.float32) / 2147483648
+    if info.num_channels > 1:
+        samples = samples.reshape(-1, info.num_channels).mean(axis=1)
+    return samples
+
+
+def frame_duration(info: WavInfo, frame_seconds: float = FRAME_SECONDS) -> float:
+    """
+    Actual length in seconds of the analysis frames frame_energies() uses.
+
+    Frames are a whole number of samples, so this differs from
+    frame_seconds when sample_rate * frame_seconds is not an integer (at
+    22050 Hz a nominal 0.03 s frame is 661 samples, 0.029977 s).
+    """
+    return max(1, int(info.sample_rate * frame_seconds)) / info.sample_rate
+
+
+def frame_energies(file: BinaryIO, info: WavInfo, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """
+    Short-term energy (dBFS) of consecutive analysis frames.
+
+    The file is read BLOCK_SECONDS at a time, so memory use does not grow
+    with the length of the recording.
+    """
+    frame_length = max(1, int(info.sample_rate * frame_seconds))
+    block_frames = frame_length * max(1, int(BLOCK_SECONDS / frame_seconds))
+    energies = []
+    for start in range(0, info.num_frames, block_frames):
+        samples = to_mono_float(read_frames(file, info, start, block_frames), info)
+        usable = len(samples) // frame_length * frame_length
+        if not usable:
+            break
+        frames = samples[:usable].reshape(-1, frame_length)
+        power = np.mean(np.square(frames, dtype=np.float64), axis=1)
+        energies.append(10 * np.log10(np.maximum(power, 1e-10)))
+    return np.concatenate(energies) if energies else np.zeros(0)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) index ranges where mask is True."""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def detect_speech(
+    energies: np.ndarray,
+    frame_seconds: float = FRAME_SECONDS,
+    margin_db: float = SPEECH_MARGIN_DB,
+    min_speech_dbfs: float = MIN_SPEECH_DBFS,
+    min_silence_seconds: float = MIN_SILENCE_SECONDS,
+    min_speech_seconds: float = MIN_SPEECH_SECONDS,
+) -> List[Tuple[int, int]]:
+    """
+    Find speech regions from frame energies.
+
+    The noise floor is the 10th percentile of the frame energies, so the
+    threshold adapts to line noise in call recordings.
+
+    Returns:
+        [start, end) frame index ranges of speech
+    """
+    if not len(energies):
+        return []
+    threshold = max(float(np.percentile(energies, 10)) + margin_db, min_speech_dbfs)
+    speech = energies > threshold
+
+    # Close short pauses, then drop short blips
+    min_silence = int(round(min_silence_seconds / frame_seconds))
+    for start, end in _runs(~speech):
+        if 0 < start and end < len(speech) and end - start < min_silence:
+            speech[start:end] = True
+    min_speech = int(round(min_speech_seconds / frame_seconds))
+    return [(start, end) for start, end in _runs(speech) if end - start >= min_speech]
+
+
+def pack_segments(
+    regions: List[Tuple[int, int]],
+    energies: np.ndarray,
+    max_segment_seconds: float,
+    frame_seconds: float = FRAME_SECONDS,
+    pad_seconds: float = PAD_SECONDS,
+) -> List[SpeechSegment]:
+    """
+    Turn speech regions into segments of at most max_segment_seconds.
+
+    Neighbouring regions are merged while the segment stays within the
+    limit (fewer, fuller requests). Regions longer than the limit are cut
+    at the quietest frame in the last third of each window, which is
+    normally a pause between words.
+    """
+    max_frames = max(1, int(max_segment_seconds / frame_seconds))
+    pad = int(round(pad_seconds / frame_seconds))
+    total = len(energies)
+
+    pieces = []
+    for start, end in regions:
+        start, end = max(0, start - pad), min(total, end + pad)
+        while end - start > max_frames:
+            window_start = start + max_frames * 2 // 3
+            cut = window_start + int(np.argmin(energies[window_start:start + max_frames]))
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+
+    segments: List[List[int]] = []
+    for start, end in pieces:
+        if segments and start <= segments[-1][1]:
+            start = segments[-1][1]
+        if segments and end - segments[-1][0] <= max_frames:
+            segments[-1][1] = end
+        elif end > start:
+            segments.append([start, end])
+    return [SpeechSegment(start * frame_seconds, end * frame_seconds) for start, end in segments]
+
+
+def segment_recording(
+    file: BinaryIO,
+    info: WavInfo,
+    max_segment_seconds: float,
+    frame_seconds: float = FRAME_SECONDS,
+) -> List[SpeechSegment]:
+    """Detect speech in a WAV recording and split it into transcribable segments."""
+    energies = frame_energies(file, info, frame_seconds)
+    # Frame indexes are converted with the real frame length, or timestamps drift
+    actual_frame_seconds = frame_duration(info, frame_seconds)
+    regions = detect_speech(energies, actual_frame_seconds)
+    return pack_segments(regions, energies, max_segment_seconds, actual_frame_seconds)
+
+
+class SegmentReader:
+    """
+    Reads segments of a WAV file as standalone WAV files.
+
+    Reads are serialized, so one file object can serve concurrent
+    transcriptions; only the segments being sent are held in memory.
+    """
+
+    _ENCODINGS = {
+        (WAVE_FORMAT_PCM, 2): "pcm_s16le",
+        (WAVE_FORMAT_IEEE_FLOAT, 4): "pcm_f32le",
+        (WAVE_FORMAT_MULAW, 1): "pcm_mulaw",
+        (WAVE_FORMAT_ALAW, 1): "pcm_alaw",
+    }
+
+    def __init__(self, file: BinaryIO, info: WavInfo):
+        self.file = file
+        self.info = info
+        self._lock = threading.Lock()
+
+    def read(self, segment: SpeechSegment) -> bytes:
+        info = self.info
+        start = int(segment.start * info.sample_rate)
+        count = int(segment.end * info.sample_rate) - start
+        with self._lock:
+            data = read_frames(self.file, info, start, count)
+        encoding = self._ENCODINGS.get((info.format_tag, info.sample_width))
+        if encoding is None:
+            # 8-bit and 32-bit integer PCM are sent as 16-bit PCM
+            samples = to_mono_float(data, info)
+            data = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+            return wav_header(info.sample_rate, "pcm_s16le", 1, len(data)) + data
+        return wav_header(info.sample_rate, encoding, info.num_channels, len(data)) + data
@@ -0,0 +1,51 @@
+"""
+Standalone background job worker.
+
+Claims and runs queued TTS jobs without serving HTTP, so generation can be
+scaled separately from the API. Any number of workers can run on any
+number of hosts against the same database.
+
+Set JOB_WORKER_PROCESSES to the number of these workers, with the same
+value and the same WEB_CONCURRENCY on API and worker nodes: every process
+then takes an equal share of the provider rate limits and the database
+connection budget (see app.config.deployment_processes()), and the API
+processes leave jobs to the dedicated workers unless JOB_WORKER_ENABLED
+is set.
+
+Usage (from backend/):
+    python -m app.worker
+"""
+import asyncio
+import logging
+import signal
+from app.config import get_settings
+from app.database import init_database, wait_for_database, dispose_database
+from app.services.job_queue import create_job_worker
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    settings = get_settings()
+    init_database()
+    await wait_for_database(settings.db_startup_timeout_seconds)
+
+    worker = create_job_worker()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker.start()
+    await stop.wait()
+    logger.info("Shutting down job worker, waiting for running jobs...")
+    await worker.stop(timeout=settings.job_visibility_timeout_seconds / 2)
+    await dispose_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+Throughput of sync vs async database sessions inside async route handlers.
+
+Compares the previous request pattern (a sync SQLAlchemy Session used from
+an ``async def`` handler, which blocks the event loop for every query) with
+the AsyncSession/asyncpg dependency now used by the API. Each request runs
+the same work as an authenticated history page: a user lookup plus one
+keyset page of tts_requests. An optional per-request pg_sleep models the
+round trip to a database that is not on localhost.
+
+Requires a reachable Postgres configured through the usual .env/DATABASE_URL
+settings with the schema migrated (alembic upgrade head).
+
+Usage (from backend/):
+    python benchmarks/db_session_benchmark.py --requests 2000 --concurrency 50
+    python benchmarks/db_session_benchmark.py --db-latency-ms 2
+
+Prints one JSON object per mode to stdout.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from app import database  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.database import get_db, init_database  # noqa: E402
+from app.models.tts_request import TTSRequest  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+BENCH_USERNAME = "db-session-benchmark"
+
+
+def _history_query(user_id):
+    return select(TTSRequest.id, TTSRequest.text, TTSRequest.created_at).where(
+        TTSRequest.user_id == user_id
+    ).order_by(TTSRequest.created_at.desc(), TTSRequest.id.desc()).limit(10)
+
+
+def build_app(db_latency: float) -> FastAPI:
+    """Build an app exposing the same query under both session styles."""
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_handler():
+        db = database.SessionLocal()
+        try:
+            user = db.execute(select(User).where(User.username == BENCH_USERNAME)).scalars().first()
+            if db_latency:
+                db.execute(text("SELECT pg_sleep(:s)"), {"s": db_latency})
+            rows = db.execute(_history_query(user.id)).all()
+        finally:
+            db.close()
+        return {"count": len(rows)}
+
+    @app.get("/async")
+    async def async_handler(db: AsyncSession = Depends(get_db)):
+        user = (await db.execute(select(User).where(User.username == BENCH_USERNAME))).scalars().first()
+        if db_latency:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": db_latency})
+        rows = (await db.execute(_history_query(user.id))).all()
+        return {"count": len(rows)}
+
+    return app
+
+
+async def ensure_fixture(rows: int) -> None:
+    """Create the benchmark user with a small history."""
+    async with database.AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.username == BENCH_USERNAME))).scalars().first()
+        if user is None:
+            user = User(username=BENCH_USERNAME)
+            db.add(user)
+            await db.flush()
+            db.add_all(
+                TTSRequest(user_id=user.id, text=f"benchmark {i}", voice_id="bench")
+                for i in range(rows)
+            )
+            await db.commit()
+
+
+async def run_mode(app: FastAPI, path: str, requests: int, concurrency: int) -> dict:
+    """Send requests to path with the given concurrency and summarize."""
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        # Warm up the pool before timing
+        await asyncio.gather(*(client.get(path) for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "mode": path.strip("/"),
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0,
+                        help="Extra server-side delay per request (pg_sleep)")
+    parser.add_argument("--history-rows", type=int, default=200)
+    args = parser.parse_args()
+
+    init_database()
+    await ensure_fixture(args.history_rows)
+    app = build_app(args.db_latency_ms / 1000)
+
+    settings = get_settings()
+    for path in ("/sync", "/async"):
+        result = await run_mode(app, path, args.requests, args.concurrency)
+        result.update(
+            db_latency_ms=args.db_latency_ms,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+        print(json.dumps(result))
+
+    await database.dispose_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,238 @@
+"""
+Local stand-ins for the ElevenLabs and Cartesia HTTP APIs.
+
+Serves the endpoints the API's SDK clients call, with the same paths and
+response shapes, so the full stack (SDK, retries, rate limiter, caches,
+database) can be load tested without provider keys or costs:
+
+    ElevenLabs  POST /v1/text-to-speech/{voice_id}[/stream]   MP3 audio
+                GET  /v1/voices
+                GET  /v1/models                                (health check)
+    Cartesia    POST /tts/bytes                                WAV, raw PCM or MP3
+                GET  /voices
+                GET  /                                         (health check)
+
+Audio is streamed in --chunks chunks --chunk-interval-ms apart, after a
+time to first chunk drawn from a lognormal distribution (median
+--latency-ms, shape --latency-sigma). Its length follows the text
+(--seconds-per-char), so payload sizes match real speech. A fraction
+--rate-limit-ratio of synthesis requests is answered 429 with a
+Retry-After header. GET /stats returns the request counts.
+
+Point the API at it with ELEVENLABS_BASE_URL / CARTESIA_BASE_URL (any API
+key is accepted); benchmarks/load_benchmark.py does this for you.
+
+Usage (from backend/):
+    python benchmarks/fake_providers.py --port 9100
+    python benchmarks/fake_providers.py --latency-ms 800 --latency-sigma 0.5 --rate-limit-ratio 0.05
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+from app.utils.audio import PCM_ENCODINGS, wav_header  # noqa: E402
+
+# MPEG-1 Layer III bitrate indexes (kbit/s -> header value); frames are 44.1 kHz
+MP3_BITRATE_INDEX = {32: 1, 40: 2, 48: 3, 56: 4, 64: 5, 80: 6, 96: 7, 112: 8, 128: 9, 160: 10, 192: 11, 224: 12, 256: 13, 320: 14}
+MP3_SAMPLE_RATE = 44100
+MP3_FRAME_SAMPLES = 1152
+
+# Silence bytes of the companded encodings
+COMPANDED_SILENCE = {"pcm_mulaw": b"\xff", "pcm_alaw": b"\xd5"}
+
+
+class FakeProviderOptions(NamedTuple):
+    """Latency, pacing, error and payload model of the fake providers."""
+    latency_ms: float = 300.0
+    latency_sigma: float = 0.4
+    chunks: int = 8
+    chunk_interval_ms: float = 20.0
+    rate_limit_ratio: float = 0.0
+    retry_after_seconds: float = 1.0
+    seconds_per_char: float = 0.065
+    catalog_latency_ms: float = 150.0
+    voices: int = 40
+
+
+def mp3_audio(seconds: float, bit_rate: int) -> bytes:
+    """Constant-bitrate MP3 frames (silent payload) lasting about seconds."""
+    kbps = min(MP3_BITRATE_INDEX, key=lambda rate: abs(rate - bit_rate // 1000))
+    header = bytes((0xFF, 0xFB, MP3_BITRATE_INDEX[kbps] << 4, 0xC4))
+    frame = header + b"\0" * (144 * kbps * 1000 // MP3_SAMPLE_RATE - len(header))
+    return frame * max(1, round(seconds * MP3_SAMPLE_RATE / MP3_FRAME_SAMPLES))
+
+
+def pcm_audio(seconds: float, encoding: str, sample_rate: int) -> bytes:
+    """A quiet tone (silence for the companded encodings) lasting seconds."""
+    frames = max(1, int(seconds * sample_rate))
+    if encoding in COMPANDED_SILENCE:
+        return COMPANDED_SILENCE[encoding] * frames
+    tone = 0.1 * np.sin(2 * np.pi * 200 * np.arange(frames) / sample_rate)
+    if encoding == "pcm_s16le":
+        return (tone * 32767).astype("<i2").tobytes()
+    return tone.astype("<f4").tobytes()
+
+
+def split_chunks(data: bytes, count: int) -> list:
+    size = -(-len(data) // max(1, count))
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def build_app(options: FakeProviderOptions) -> FastAPI:
+    """Build the fake provider app."""
+    app = FastAPI()
+    stats = Counter()
+    rng = random.Random(0)
+
+    def first_chunk_delay() -> float:
+        if options.latency_ms <= 0:
+            return 0.0
+        return rng.lognormvariate(math.log(options.latency_ms / 1000), options.latency_sigma)
+
+    def rate_limited(provider: str):
+        if rng.random() >= options.rate_limit_ratio:
+            return None
+        stats[f"{provider}_rate_limited"] += 1
+        return JSONResponse(
+            {"detail": {"status": "too_many_concurrent_requests", "message": "Too many requests"}},
+            status_code=429,
+            headers={"Retry-After": f"{options.retry_after_seconds:g}"},
+        )
+
+    def stream(audio: bytes, media_type: str) -> StreamingResponse:
+        delay = first_chunk_delay()
+
+        async def body():
+            await asyncio.sleep(delay)
+            for index, chunk in enumerate(split_chunks(audio, options.chunks)):
+                if index and options.chunk_interval_ms:
+                    await asyncio.sleep(options.chunk_interval_ms / 1000)
+                yield chunk
+
+        return StreamingResponse(body(), media_type=media_type)
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    @app.post("/v1/text-to-speech/{voice_id}/stream")
+    async def elevenlabs_tts(voice_id: str, request: Request, output_format: str = "mp3_44100_128"):
+        stats["elevenlabs_tts"] += 1
+        payload = await request.json()
+        limited = rate_limited("elevenlabs")
+        if limited is not None:
+            return limited
+        bit_rate = int(output_format.rsplit("_", 1)[-1]) * 1000 if output_format.startswith("mp3_") else 128000
+        seconds = len(payload.get("text", "")) * options.seconds_per_char
+        return stream(mp3_audio(seconds, bit_rate), "audio/mpeg")
+
+    @app.get("/v1/voices")
+    async def elevenlabs_voices():
+        stats["elevenlabs_voices"] += 1
+        await asyncio.sleep(options.catalog_latency_ms / 1000)
+        return {"voices": [
+            {
+                "voice_id": f"fake-elevenlabs-{index:04d}",
+                "name": f"Fake Voice {index}",
+                "category": "premade",
+                "description": "Load test voice",
+                "preview_url": None,
+                "labels": {"accent": "neutral"},
+                "settings": {"stability": 0.5, "similarity_boost": 0.75},
+            }
+            for index in range(options.voices)
+        ]}
+
+    @app.get("/v1/models")
+    async def elevenlabs_models():
+        stats["elevenlabs_models"] += 1
+        return [{"model_id": "eleven_multilingual_v2", "name": "Eleven Multilingual v2"}]
+
+    @app.post("/tts/bytes")
+    async def cartesia_tts(request: Request):
+        stats["cartesia_tts"] += 1
+        payload = await request.json()
+        limited = rate_limited("cartesia")
+        if limited is not None:
+            return limited
+        output_format = payload.get("output_format") or {}
+        container = output_format.get("container", "wav")
+        seconds = len(payload.get("transcript", "")) * options.seconds_per_char
+        if container == "mp3":
+            return stream(mp3_audio(seconds, output_format.get("bit_rate") or 128000), "audio/mpeg")
+        encoding = output_format.get("encoding", "pcm_f32le")
+        if encoding not in PCM_ENCODINGS:
+            return JSONResponse({"error": f"unsupported encoding {encoding}"}, status_code=400)
+        sample_rate = output_format.get("sample_rate", 44100)
+        audio = pcm_audio(seconds, encoding, sample_rate)
+        if container == "wav":
+            audio = wav_header(sample_rate, encoding, 1, len(audio)) + audio
+        return stream(audio, "audio/wav" if container == "wav" else "application/octet-stream")
+
+    @app.get("/voices")
+    async def cartesia_voices():
+        stats["cartesia_voices"] += 1
+        await asyncio.sleep(options.catalog_latency_ms / 1000)
+        return {"voices": [
+            {
+                "id": f"fake-cartesia-{index:04d}",
+                "name": f"Fake Voice {index}",
+                "description": "Load test voice",
+                "preview_url": None,
+            }
+            for index in range(options.voices)
+        ]}
+
+    @app.get("/")
+    async def cartesia_status():
+        stats["cartesia_status"] += 1
+        return {"ok": True, "version": "fake"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the FakeProviderOptions flags (shared with load_benchmark.py)."""
+    defaults = FakeProviderOptions()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms,
+                        help="median time to first audio chunk")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma,
+                        help="lognormal shape of the time to first chunk (0 for a fixed latency)")
+    parser.add_argument("--chunks", type=int, default=defaults.chunks)
+    parser.add_argument("--chunk-interval-ms", type=float, default=defaults.chunk_interval_ms)
+    parser.add_argument("--rate-limit-ratio", type=float, default=defaults.rate_limit_ratio,
+                        help="fraction of synthesis requests answered 429")
+    parser.add_argument("--retry-after-seconds", type=float, default=defaults.retry_after_seconds)
+    parser.add_argument("--seconds-per-char", type=float, default=defaults.seconds_per_char,
+                        help="audio length per character of text (sets payload sizes)")
+    parser.add_argument("--catalog-latency-ms", type=float, default=defaults.catalog_latency_ms)
+    parser.add_argument("--voices", type=int, default=defaults.voices)
+
+
+def options_from_arguments(args: argparse.Namespace) -> FakeProviderOptions:
+    return FakeProviderOptions(**{name: getattr(args, name) for name in FakeProviderOptions._fields})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(build_app(options_from_arguments(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
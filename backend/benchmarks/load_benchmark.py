@@ -0,0 +1,309 @@
+"""
+End-to-end load test of the API against local fake providers.
+
+Starts benchmarks/fake_providers.py and the API (uvicorn app.main:app)
+as subprocesses, with the provider base URLs pointed at the fake and the
+outbound rate limiters off (--keep-rate-limits leaves them as configured),
+logs in, and drives each scenario at each concurrency level:
+
+    tts_generate       POST /api/tts/generate?binary=true
+    cartesia_generate  POST /api/cartesia/generate?binary=true
+    history            GET  /api/tts/history
+    voices             GET  /api/tts/voices and /api/cartesia/voices
+    login              POST /api/auth/login
+
+Generate requests use a different text each time unless --repeat-ratio
+is set, so by default every one reaches the provider. For each run it
+reports throughput, latency percentiles, status codes, the provider calls
+and 429s seen by the fake, the peak RSS of the API process during the run
+and the lifetime memory high-water marks (VmHWM) of the API and the fake.
+
+Requires a reachable Postgres configured through the usual .env/DATABASE_URL
+settings with the schema migrated (alembic upgrade head). Values in
+backend/.env take precedence over the environment set here. With --api-url
+an already running API is used instead (start it with ELEVENLABS_BASE_URL /
+CARTESIA_BASE_URL pointing at a fake_providers.py; pass --api-pid to get
+its memory); the fake is then only started if --fake-url is not given.
+
+Usage (from backend/):
+    python benchmarks/load_benchmark.py --concurrency 1 16 64 --requests 300
+    python benchmarks/load_benchmark.py --scenarios tts_generate --duration 30 --latency-ms 800 --rate-limit-ratio 0.05
+    python benchmarks/load_benchmark.py --api-url http://127.0.0.1:8000 --api-pid 1234 --fake-url http://127.0.0.1:9100
+
+Prints one JSON object per scenario and concurrency to stdout. Fake
+provider flags (--latency-ms, --chunks, ...) are described in
+fake_providers.py.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+from fake_providers import add_arguments, options_from_arguments  # noqa: E402
+
+SCENARIOS = ["tts_generate", "cartesia_generate", "history", "voices", "login"]
+FILLER = (
+    "The quick brown fox jumps over the lazy dog while the narrator keeps a steady, "
+    "even pace so the listener can follow every word. "
+)
+
+
+def memory_kb(pid: Optional[int], field: str) -> Optional[int]:
+    """Read a memory field (VmRSS, VmHWM) of a process from /proc, in kB."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def megabytes(kb: Optional[int]) -> Optional[float]:
+    return round(kb / 1024, 1) if kb is not None else None
+
+
+def percentile(latencies: list, fraction: float) -> float:
+    return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 1)
+
+
+class Workload:
+    """Builds the request for each scenario."""
+
+    def __init__(self, text_chars: int, repeat_ratio: float, credentials: dict):
+        self.text_chars = text_chars
+        self.repeat_ratio = repeat_ratio
+        self.credentials = credentials
+        self.counter = itertools.count()
+        self.rng = random.Random(0)
+        self.run_id = f"{os.getpid()}-{int(time.time())}"
+
+    def text(self) -> str:
+        if self.rng.random() < self.repeat_ratio:
+            prefix = "Repeated request. "
+        else:
+            prefix = f"Request {self.run_id}-{next(self.counter)}. "
+        return (prefix + FILLER * (self.text_chars // len(FILLER) + 1))[:self.text_chars]
+
+    def request(self, scenario: str, index: int) -> tuple:
+        """Return (method, path, JSON body) for the scenario's next request."""
+        if scenario == "tts_generate":
+            return "POST", "/api/tts/generate?binary=true", {"text": self.text()}
+        if scenario == "cartesia_generate":
+            return "POST", "/api/cartesia/generate?binary=true", {
+                "text": self.text(), "container": "wav", "encoding": "pcm_s16le", "sample_rate": 24000,
+            }
+        if scenario == "history":
+            return "GET", "/api/tts/history?limit=20", None
+        if scenario == "login":
+            return "POST", "/api/auth/login", self.credentials
+        return "GET", "/api/tts/voices" if index % 2 else "/api/cartesia/voices", None
+
+
+async def fake_stats(client: httpx.AsyncClient, fake_url: Optional[str]) -> Counter:
+    if not fake_url:
+        return Counter()
+    return Counter((await client.get(f"{fake_url}/stats")).json())
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    scenario: str,
+    concurrency: int,
+    requests: int,
+    duration: Optional[float],
+    fake_url: Optional[str],
+    api_pid: Optional[int],
+) -> dict:
+    """Send the scenario's requests at the given concurrency and summarize."""
+    latencies = []
+    statuses = Counter()
+    indexes = itertools.count() if duration else iter(range(requests))
+    deadline = time.perf_counter() + duration if duration else None
+    peak_rss = memory_kb(api_pid, "VmRSS")
+    running = True
+
+    async def worker() -> None:
+        for index in indexes:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            method, path, body = workload.request(scenario, index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    async def sample_memory() -> None:
+        nonlocal peak_rss
+        while running:
+            rss = memory_kb(api_pid, "VmRSS")
+            if rss is not None:
+                peak_rss = max(peak_rss or 0, rss)
+            await asyncio.sleep(0.1)
+
+    before = await fake_stats(client, fake_url)
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    running = False
+    await sampler
+    provider = await fake_stats(client, fake_url)
+    provider.subtract(before)
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": percentile(latencies, 1.0),
+        "statuses": dict(statuses),
+        "provider_calls": provider["elevenlabs_tts"] + provider["cartesia_tts"]
+        + provider["elevenlabs_voices"] + provider["cartesia_voices"],
+        "provider_rate_limited": provider["elevenlabs_rate_limited"] + provider["cartesia_rate_limited"],
+        "api_rss_peak_mb": megabytes(peak_rss),
+        "api_hwm_mb": megabytes(memory_kb(api_pid, "VmHWM")),
+    }
+
+
+def start_process(args: list, env: Optional[dict] = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 60) -> None:
+    """Poll url until it answers (or fail if the process exits)."""
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}")
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not start within {timeout:g}s")
+
+
+async def login(api_url: str, username: str, password: str) -> str:
+    async with httpx.AsyncClient(base_url=api_url) as client:
+        response = await client.post("/api/auth/login", json={"username": username, "password": password})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+
+def default_credentials() -> tuple:
+    """The first user of app/utils/credentials.json."""
+    with open(BACKEND_DIR / "app" / "utils" / "credentials.json") as file:
+        user = json.load(file)["users"][0]
+    return user["username"], user["password"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and concurrency")
+    parser.add_argument("--duration", type=float, help="run each scenario for this many seconds instead")
+    parser.add_argument("--text-chars", type=int, default=200)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0,
+                        help="fraction of generate requests that reuse one text (synthesis cache hits)")
+    parser.add_argument("--api-url")
+    parser.add_argument("--api-pid", type=int)
+    parser.add_argument("--api-port", type=int, default=8790)
+    parser.add_argument("--fake-url")
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        fake_url, fake_pid = args.fake_url, None
+        if fake_url is None:
+            fake_url = f"http://127.0.0.1:{args.fake_port}"
+            options = options_from_arguments(args)
+            flags = [f"--{name.replace('_', '-')}={value}" for name, value in options._asdict().items()]
+            fake = start_process([str(Path(__file__).parent / "fake_providers.py"), f"--port={args.fake_port}", *flags])
+            processes.append(fake)
+            fake_pid = fake.pid
+            await wait_ready(f"{fake_url}/stats", fake)
+
+        api_url, api_pid = args.api_url, args.api_pid
+        if api_url is None:
+            api_url = f"http://127.0.0.1:{args.api_port}"
+            env = {
+                **os.environ,
+                "ELEVENLABS_API_KEY": os.environ.get("ELEVENLABS_API_KEY") or "load-test",
+                "CARTESIA_API_KEY": os.environ.get("CARTESIA_API_KEY") or "load-test",
+                "ELEVENLABS_BASE_URL": fake_url,
+                "CARTESIA_BASE_URL": fake_url,
+            }
+            if not args.keep_rate_limits:
+                env.update(ELEVENLABS_REQUESTS_PER_MINUTE="0", CARTESIA_REQUESTS_PER_MINUTE="0")
+            api = start_process(
+                ["-m", "uvicorn", "app.main:app", "--host=127.0.0.1", f"--port={args.api_port}", "--log-level=warning"],
+                env,
+            )
+            processes.append(api)
+            api_pid = api.pid
+            await wait_ready(f"{api_url}/health", api)
+
+        username, password = default_credentials()
+        credentials = {"username": args.username or username, "password": args.password or password}
+        token = await login(api_url, credentials["username"], credentials["password"])
+        workload = Workload(args.text_chars, args.repeat_ratio, credentials)
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                async with httpx.AsyncClient(
+                    base_url=api_url,
+                    headers={"Authorization": f"Bearer {token}"},
+                    timeout=120,
+                    limits=httpx.Limits(max_connections=concurrency),
+                ) as client:
+                    result = await run_scenario(
+                        client, workload, scenario, concurrency, args.requests, args.duration, fake_url, api_pid
+                    )
+                result["fake_hwm_mb"] = megabytes(memory_kb(fake_pid, "VmHWM"))
+                print(json.dumps(result), flush=True)
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,235 @@
+"""
+PCM post-processing: NumPy stage vs a per-sample Python reference.
+
+Synthesizes TTS-like clips (a voiced tone with syllable-rate amplitude
+modulation between leading and trailing silence) as 44.1 kHz pcm_f32le
+WAV, the master format Cartesia audio is post-processed from, and runs
+the full post-processing stage on each: silence trimming, resampling,
+loudness normalization and conversion to pcm_s16le. The reference does
+the same steps one sample at a time in pure Python (resampling by linear
+interpolation, since a per-sample FFT is not practical).
+
+Reports the time of both implementations, the output duration and
+loudness of each (they should agree), and the bytes saved against the
+f32 master, by trimming alone and in total.
+
+With --loop-lag the longest event loop stall is measured while clips are
+post-processed inline on the loop and in the worker process pool
+(run_in_process_executor), as the API does.
+
+Usage (from backend/):
+    python benchmarks/pcm_postprocess_benchmark.py --seconds 2 10 30
+    python benchmarks/pcm_postprocess_benchmark.py --sample-rate 16000 --loop-lag 20
+
+Prints one JSON object per clip and mode to stdout.
+"""
+import argparse
+import asyncio
+import json
+import math
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from app.utils.audio import parse_wav, wav_header  # noqa: E402
+from app.utils.concurrency import run_in_process_executor, shutdown_process_executor  # noqa: E402
+from app.utils.pcm import (  # noqa: E402
+    ABSOLUTE_GATE_DBFS,
+    LOUDNESS_BLOCK_SECONDS,
+    LOUDNESS_HOP_SECONDS,
+    PEAK_CEILING_DBFS,
+    RELATIVE_GATE_DB,
+    TRIM_PAD_SECONDS,
+    TRIM_WINDOW_SECONDS,
+    PostProcessOptions,
+    decode_pcm,
+    loudness_dbfs,
+    postprocess_wav,
+    trim_silence,
+)
+
+SOURCE_RATE = 44100
+LEAD_SECONDS = 0.4
+TAIL_SECONDS = 0.6
+
+
+def make_clip(seconds: float, seed: int = 0) -> bytes:
+    """A quiet, modulated tone with LEAD/TAIL_SECONDS of near-silence, as f32 WAV."""
+    rng = np.random.default_rng(seed)
+    voiced = int(seconds * SOURCE_RATE)
+    t = np.arange(voiced) / SOURCE_RATE
+    tone = 0.08 * np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) ** 2
+    samples = np.concatenate((
+        np.zeros(int(LEAD_SECONDS * SOURCE_RATE)), tone, np.zeros(int(TAIL_SECONDS * SOURCE_RATE))
+    ))
+    samples += rng.normal(0, 1e-5, len(samples))
+    data = samples.astype("<f4").tobytes()
+    return wav_header(SOURCE_RATE, "pcm_f32le", 1, len(data)) + data
+
+
+def reference_postprocess(audio: bytes, sample_rate: int, options: PostProcessOptions) -> bytes:
+    """postprocess_wav() for mono pcm_f32le in, pcm_s16le WAV out, one sample at a time."""
+    fmt, payload = parse_wav(audio)
+    source_rate = fmt["sample_rate"]
+    samples = list(struct.unpack(f"<{len(payload) // 4}f", payload))
+
+    # Trim to the first/last loud window, plus padding
+    window = max(1, int(source_rate * TRIM_WINDOW_SECONDS))
+    threshold = 10 ** (options.silence_threshold_dbfs / 20)
+    first = last = None
+    for i, sample in enumerate(samples):
+        if abs(sample) > threshold:
+            if first is None:
+                first = i
+            last = i
+    if first is not None:
+        pad = int(source_rate * TRIM_PAD_SECONDS)
+        start = max(0, first // window * window - pad)
+        end = min(len(samples), (last // window + 1) * window + pad)
+        samples = samples[start:end]
+
+    # Resample by linear interpolation
+    if sample_rate != source_rate:
+        count = len(samples) * sample_rate // source_rate
+        step = source_rate / sample_rate
+        resampled = []
+        for i in range(count):
+            position = i * step
+            j = int(position)
+            a = samples[j]
+            b = samples[j + 1] if j + 1 < len(samples) else a
+            resampled.append(a + (b - a) * (position - j))
+        samples = resampled
+
+    # Gated loudness and gain
+    if options.target_loudness_dbfs is not None and samples:
+        block = min(len(samples), max(1, int(sample_rate * LOUDNESS_BLOCK_SECONDS)))
+        hop = max(1, int(sample_rate * LOUDNESS_HOP_SECONDS))
+        powers = []
+        for start in range(0, len(samples) - block + 1, hop):
+            total = 0.0
+            for sample in samples[start:start + block]:
+                total += sample * sample
+            powers.append(total / block)
+        gated = [power for power in powers if power > 10 ** (ABSOLUTE_GATE_DBFS / 10)]
+        if gated:
+            mean = sum(gated) / len(gated)
+            gated = [power for power in gated if power > mean * 10 ** (-RELATIVE_GATE_DB / 10)]
+            loudness = 10 * math.log10(sum(gated) / len(gated))
+            gain = 10 ** ((options.target_loudness_dbfs - loudness) / 20)
+            peak = 0.0
+            for sample in samples:
+                peak = max(peak, abs(sample))
+            if peak > 0:
+                gain = min(gain, 10 ** (PEAK_CEILING_DBFS / 20) / peak)
+            samples = [sample * gain for sample in samples]
+
+    # Quantize to 16 bits
+    quantized = []
+    for sample in samples:
+        quantized.append(max(-32768, min(32767, round(sample * 32767))))
+    data = struct.pack(f"<{len(quantized)}h", *quantized)
+    return wav_header(sample_rate, "pcm_s16le", 1, len(data)) + data
+
+
+def describe(audio: bytes) -> dict:
+    fmt, payload = parse_wav(audio)
+    samples = decode_pcm(payload, "pcm_s16le")
+    loudness = loudness_dbfs(samples, fmt["sample_rate"])
+    return {
+        "duration": round(len(samples) / fmt["sample_rate"], 3),
+        "loudness_dbfs": round(loudness, 2) if loudness is not None else None,
+        "bytes_out": len(audio),
+    }
+
+
+def timed(func, *args) -> tuple:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
+async def loop_lag(clip: bytes, sample_rate: int, count: int, in_process: bool) -> dict:
+    """Longest event loop stall while count clips are post-processed."""
+    stalls = []
+    running = True
+
+    async def ticker() -> None:
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stalls.append(now - last - 0.005)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    if in_process:
+        await asyncio.gather(*(
+            run_in_process_executor(postprocess_wav, clip, "pcm_s16le", sample_rate)
+            for _ in range(count)
+        ))
+    else:
+        for _ in range(count):
+            postprocess_wav(clip, "pcm_s16le", sample_rate)
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    running = False
+    await task
+    return {
+        "mode": "process_pool" if in_process else "inline",
+        "clips": count,
+        "seconds": round(elapsed, 2),
+        "max_loop_stall_ms": round(max(stalls, default=0.0) * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[2, 10, 30])
+    parser.add_argument("--sample-rate", type=int, default=SOURCE_RATE)
+    parser.add_argument("--loop-lag", type=int, default=0, metavar="CLIPS")
+    args = parser.parse_args()
+    options = PostProcessOptions()
+    if args.loop_lag:
+        # Start the workers first (a one-time cost the API pays on its first clip)
+        await run_in_process_executor(postprocess_wav, make_clip(0.1), "pcm_s16le", args.sample_rate)
+
+    for seconds in args.seconds:
+        clip = make_clip(seconds)
+        fmt, payload = parse_wav(clip)
+        trimmed = trim_silence(decode_pcm(payload, "pcm_f32le"), SOURCE_RATE, options.silence_threshold_dbfs)
+        common = {
+            "clip_seconds": round(seconds + LEAD_SECONDS + TAIL_SECONDS, 2),
+            "sample_rate": args.sample_rate,
+            "bytes_in": len(clip),
+            "bytes_saved_by_trim": len(payload) - trimmed.nbytes,
+        }
+        vectorized, vectorized_ms = timed(postprocess_wav, clip, "pcm_s16le", args.sample_rate, "wav", options)
+        reference, reference_ms = timed(reference_postprocess, clip, args.sample_rate, options)
+        for mode, audio, ms in (("numpy", vectorized, vectorized_ms), ("reference", reference, reference_ms)):
+            result = describe(audio)
+            print(json.dumps({
+                **common,
+                "mode": mode,
+                "ms": ms,
+                **result,
+                "bytes_saved": len(clip) - result["bytes_out"],
+                "speedup": round(reference_ms / max(vectorized_ms, 0.1), 1) if mode == "numpy" else None,
+            }))
+
+        if args.loop_lag:
+            for in_process in (False, True):
+                print(json.dumps({
+                    "clip_seconds": common["clip_seconds"],
+                    **await loop_lag(clip, args.sample_rate, args.loop_lag, in_process),
+                }))
+    shutdown_process_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
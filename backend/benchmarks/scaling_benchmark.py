@@ -0,0 +1,129 @@
+"""
+Throughput of the production server (python -m app.serve) by worker count.
+
+Starts benchmarks/fake_providers.py, then for each --workers value starts
+the API with WEB_CONCURRENCY set to it (outbound rate limiters off), and
+drives the load_benchmark.py scenarios against it at a fixed concurrency.
+Each result reports throughput and latency percentiles plus the speedup
+over the first worker count. Scaling is bounded by the CPUs available:
+on a machine with C cores expect roughly linear gains up to C workers
+for CPU-bound scenarios, and little beyond.
+
+Requires a reachable Postgres configured through the usual .env/DATABASE_URL
+settings with the schema migrated (alembic upgrade head), with enough
+max_connections for the largest worker count (pools are scaled down to
+fit, see app.database.pool_limits()). Values in backend/.env take
+precedence over the environment set here, so WEB_CONCURRENCY must not be
+set there.
+
+Usage (from backend/):
+    python benchmarks/scaling_benchmark.py
+    python benchmarks/scaling_benchmark.py --workers 1 2 4 8 --scenarios tts_generate --concurrency 128 --requests 2000
+
+Prints one JSON object per worker count and scenario to stdout. Fake
+provider flags (--latency-ms, --chunks, ...) are described in
+fake_providers.py.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+from fake_providers import add_arguments, options_from_arguments  # noqa: E402
+from load_benchmark import (  # noqa: E402
+    SCENARIOS, Workload, default_credentials, login, run_scenario, start_process, wait_ready,
+)
+from app.config import available_cpus  # noqa: E402
+
+
+def default_worker_counts() -> list:
+    """1, 2, 4, ... up to the number of CPUs (inclusive)."""
+    counts, workers = [], 1
+    while workers < available_cpus():
+        counts.append(workers)
+        workers *= 2
+    return counts + [available_cpus()]
+
+
+async def measure(args, workers: int, fake_url: str) -> list:
+    """Start the server with this many workers and run every scenario against it."""
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "ELEVENLABS_API_KEY": os.environ.get("ELEVENLABS_API_KEY") or "load-test",
+        "CARTESIA_API_KEY": os.environ.get("CARTESIA_API_KEY") or "load-test",
+        "ELEVENLABS_BASE_URL": fake_url,
+        "CARTESIA_BASE_URL": fake_url,
+        "ELEVENLABS_REQUESTS_PER_MINUTE": "0",
+        "CARTESIA_REQUESTS_PER_MINUTE": "0",
+    }
+    server = start_process(["-m", "app.serve", "--host=127.0.0.1", f"--port={args.api_port}"], env)
+    try:
+        await wait_ready(f"{api_url}/health/ready", server)
+        username, password = default_credentials()
+        token = await login(api_url, username, password)
+        workload = Workload(args.text_chars, 0.0, {"username": username, "password": password})
+        results = []
+        async with httpx.AsyncClient(
+            base_url=api_url,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=120,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        ) as client:
+            for scenario in args.scenarios:
+                # Warm up every worker (connections, provider clients, caches)
+                await run_scenario(client, workload, scenario, args.concurrency, args.concurrency * 2, None, None, None)
+                result = await run_scenario(
+                    client, workload, scenario, args.concurrency, args.requests, None, fake_url, None
+                )
+                result["workers"] = workers
+                for field in ("api_rss_peak_mb", "api_hwm_mb"):
+                    result.pop(field)
+                results.append(result)
+        return results
+    finally:
+        # Graceful shutdown, as in production
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_worker_counts())
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=["tts_generate", "history"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario and worker count")
+    parser.add_argument("--text-chars", type=int, default=200)
+    parser.add_argument("--api-port", type=int, default=8791)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    add_arguments(parser)
+    parser.set_defaults(latency_ms=50.0)
+    args = parser.parse_args()
+
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    options = options_from_arguments(args)
+    flags = [f"--{name.replace('_', '-')}={value}" for name, value in options._asdict().items()]
+    fake = start_process([str(Path(__file__).parent / "fake_providers.py"), f"--port={args.fake_port}", *flags])
+    try:
+        await wait_ready(f"{fake_url}/stats", fake)
+        baseline = {}
+        for workers in args.workers:
+            for result in await measure(args, workers, fake_url):
+                baseline.setdefault(result["scenario"], result["req_per_s"])
+                result["speedup"] = round(result["req_per_s"] / baseline[result["scenario"]], 2)
+                print(json.dumps(result), flush=True)
+    finally:
+        fake.terminate()
+        fake.wait(timeout=15)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+Transcription time of long recordings: sequential vs concurrent segments.
+
+Synthesizes call-like WAV recordings (utterances separated by pauses, with
+line noise) of increasing length, runs voice-activity segmentation and
+transcribes them with the fake STT engine, once with one segment at a time
+and once with --concurrency segments at a time. The fake engine's
+latency grows with segment length like a real engine, so with enough
+concurrency the wall time tracks the longest segment, not the recording.
+
+Also reports the VAD time and the peak Python memory (tracemalloc) of the
+concurrent run. Recordings are read in blocks, so memory is bounded by the
+segments in flight (concurrency x segment size), not the recording size.
+
+Usage (from backend/):
+    python benchmarks/stt_segmentation_benchmark.py --minutes 5 15 30 60
+    python benchmarks/stt_segmentation_benchmark.py --concurrency 16 --max-segment-seconds 20
+
+Prints one JSON object per recording and mode to stdout.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.services.stt_service import FakeSTTEngine, transcribe_recording  # noqa: E402
+from app.utils.audio import wav_header  # noqa: E402
+from app.utils.vad import read_wav_info, segment_recording  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def write_recording(file, minutes: float, seed: int = 0) -> None:
+    """Write a call-like recording: 3-12 s utterances between 0.5-4 s pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    file.write(wav_header(SAMPLE_RATE, "pcm_s16le", 1, total * 2))
+    written = 0
+    speech = False
+    while written < total:
+        seconds = rng.uniform(3, 12) if speech else rng.uniform(0.5, 4)
+        length = min(total - written, int(seconds * SAMPLE_RATE))
+        samples = rng.normal(0, 0.003, length)
+        if speech:
+            t = np.arange(length) / SAMPLE_RATE
+            pitch = rng.uniform(100, 250)
+            samples += 0.2 * np.sin(2 * np.pi * pitch * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        file.write((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+        written += length
+        speech = not speech
+    file.flush()
+
+
+async def run(file, concurrency: int, trace: bool) -> dict:
+    get_settings().stt_concurrency = concurrency
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = await transcribe_recording(file, "call.wav", "audio/wav", "en", FakeSTTEngine())
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if trace else None
+    if trace:
+        tracemalloc.stop()
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "segments": len(result.segments),
+        "peak_mb": round(peak / 1e6, 1) if peak is not None else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-segment-seconds", type=float, default=get_settings().stt_max_segment_seconds)
+    args = parser.parse_args()
+    get_settings().stt_max_segment_seconds = args.max_segment_seconds
+
+    for minutes in args.minutes:
+        with tempfile.TemporaryFile() as file:
+            write_recording(file, minutes)
+            info = read_wav_info(file)
+            started = time.perf_counter()
+            segments = segment_recording(file, info, args.max_segment_seconds)
+            vad_ms = (time.perf_counter() - started) * 1000
+            common = {
+                "minutes": minutes,
+                "file_mb": round(info.num_frames * info.block_align / 1e6, 1),
+                "vad_ms": round(vad_ms, 1),
+                "longest_segment_seconds": round(max(end - start for start, end in segments), 1),
+            }
+            for concurrency, trace in ((1, False), (args.concurrency, True)):
+                print(json.dumps({**common, **await run(file, concurrency, trace)}))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
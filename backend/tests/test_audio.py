@@ -0,0 +1,18 @@
+"""Tests for audio container helpers (app.utils.audio)."""
+import pytest
+from app.utils.audio import audio_duration, wav_header
+
+
+@pytest.mark.parametrize("encoding, sample_rate", [("pcm_f32le", 44100), ("pcm_s16le", 22050), ("pcm_mulaw", 8000)])
+def test_raw_pcm_duration_from_format(encoding, sample_rate):
+    width = {"pcm_f32le": 4, "pcm_s16le": 2, "pcm_mulaw": 1}[encoding]
+    audio = b"\x00" * (sample_rate * width * 3 // 2)
+
+    assert audio_duration(audio, "audio/pcm", encoding, sample_rate) == pytest.approx(1.5)
+    # The same samples in a WAV container need no format
+    wav = wav_header(sample_rate, encoding, 1, len(audio)) + audio
+    assert audio_duration(wav, "audio/wav") == pytest.approx(1.5)
+
+
+def test_raw_pcm_duration_unknown_without_format():
+    assert audio_duration(b"\x00" * 1000, "audio/pcm") is None
@@ -0,0 +1,83 @@
+"""Tests for the Cartesia output formats of /api/cartesia/generate."""
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from app.api.routes import cartesia
+from app.database import get_db
+from app.main import app
+from app.utils.audio import audio_duration
+
+PCM = b"\x00\x00" * 16000
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client for an authenticated user; generation returns one second of 16 kHz pcm_s16le."""
+    generated = {}
+
+    async def authenticated(request, db=None):
+        return SimpleNamespace(id=uuid.uuid4())
+
+    async def no_db():
+        yield None
+
+    async def generate(**kwargs):
+        generated.update(kwargs)
+        return PCM
+
+    async def record(db, user_id, text, voice_id, audio_bytes, mime_type, output_format=None):
+        return SimpleNamespace(
+            id=uuid.uuid4(),
+            audio_url=None,
+            voice_id=voice_id,
+            audio_size=len(audio_bytes),
+            audio_duration=audio_duration(
+                audio_bytes, mime_type, output_format.get("encoding"), output_format["sample_rate"]
+            ),
+            created_at=datetime.now(),
+        )
+
+    monkeypatch.setattr(cartesia, "get_current_user_from_request", authenticated)
+    monkeypatch.setattr(cartesia, "generate_tts_audio_async", generate)
+    monkeypatch.setattr(cartesia, "record_tts_request", record)
+    monkeypatch.setitem(app.dependency_overrides, get_db, no_db)
+    client = TestClient(app)
+    client.generated = generated
+    return client
+
+
+def test_generate_raw_pcm(client):
+    response = client.post("/api/cartesia/generate", json={
+        "text": "Hello", "container": "raw", "encoding": "pcm_s16le", "sample_rate": 16000, "postprocess": False,
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mime_type"] == "audio/pcm"
+    assert body["output_format"] == {"container": "raw", "encoding": "pcm_s16le", "sample_rate": 16000}
+    assert body["audio_duration"] == pytest.approx(1.0)
+    assert client.generated["output_format"]["container"] == "raw"
+
+
+def test_generate_raw_pcm_binary(client):
+    response = client.post("/api/cartesia/generate?binary=true", json={
+        "text": "Hello", "container": "raw", "encoding": "pcm_s16le", "sample_rate": 16000, "postprocess": False,
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/pcm"
+    assert response.content == PCM
+
+
+def test_advertised_containers_are_accepted(client):
+    models = client.get("/api/cartesia/models").json()
+    models = models["models"] if isinstance(models, dict) else models
+
+    for model in models:
+        for container in model["containers"]:
+            response = client.post("/api/cartesia/generate", json={
+                "text": "Hello", "model_id": model["id"], "container": container, "postprocess": False,
+            })
+            assert response.status_code == 200, (model["id"], container, response.text)
@@ -0,0 +1,52 @@
+"""Tests for sharing limits and the disk cache between server and job worker processes."""
+import pytest
+from app.config import get_settings
+from app.database import pool_limits
+from app.services import rate_limiter
+from app.services.synthesis_cache import SynthesisCache
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Settings for 4 server processes and 2 standalone job workers."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "web_concurrency", 4)
+    monkeypatch.setattr(settings, "job_worker_processes", 2)
+    monkeypatch.setattr(settings, "db_max_connections", 100)
+    monkeypatch.setattr(settings, "db_reserved_connections", 10)
+    monkeypatch.setattr(settings, "db_pool_size", 10)
+    monkeypatch.setattr(settings, "db_max_overflow", 20)
+    return settings
+
+
+def test_job_workers_share_the_database_budget(settings):
+    pool_size, max_overflow = pool_limits(settings)
+
+    assert 6 * (pool_size + max_overflow) <= 90
+
+
+def test_job_workers_share_the_rate_limits(settings, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_rate_limiters", {})
+    monkeypatch.setattr(settings, "elevenlabs_requests_per_minute", 600)
+    monkeypatch.setattr(settings, "elevenlabs_burst", 12)
+
+    limiter = rate_limiter.get_rate_limiter("elevenlabs")
+
+    assert limiter.rate == pytest.approx(600 / 60 / 6)
+    assert limiter.burst == 2
+
+
+def test_disk_tier_is_shared_between_processes(tmp_path):
+    first = SynthesisCache(memory_max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=1000)
+    second = SynthesisCache(memory_max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=1000)
+    first.get("a" * 64)
+
+    second.put("a" * 64, b"x" * 400)
+    # Written by the other process after this one indexed the directory
+    assert first.get("a" * 64) == b"x" * 400
+
+    first.DISK_INDEX_REFRESH_SECONDS = 0
+    first.put("b" * 64, b"y" * 400)
+    first.put("c" * 64, b"z" * 400)
+    # The budget covers both processes' files: the oldest one was evicted
+    assert sorted(path.name[0] for path in tmp_path.glob("*/*")) == ["b", "c"]
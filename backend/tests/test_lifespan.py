@@ -0,0 +1,67 @@
+"""Tests for application startup and shutdown (app.main.lifespan)."""
+import asyncio
+import threading
+import pytest
+from app import main
+from app.utils import concurrency
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Lifespan without a database or health checks; returns the shutdown steps taken."""
+    calls = []
+
+    async def wait_for_database(timeout):
+        pass
+
+    async def health_prober_stop():
+        calls.append("health_prober")
+
+    async def dispose_database():
+        calls.append("database")
+
+    async def nothing():
+        pass
+
+    monkeypatch.setattr(main, "init_database", lambda: None)
+    monkeypatch.setattr(main, "wait_for_database", wait_for_database)
+    monkeypatch.setattr(main, "dispose_database", dispose_database)
+    monkeypatch.setattr(main.health_prober, "start", nothing)
+    monkeypatch.setattr(main.health_prober, "stop", health_prober_stop)
+    monkeypatch.setattr(main.settings, "job_worker_enabled", False)
+    return calls
+
+
+def test_shutdown_stops_the_provider_warmup(calls, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(main, "load_provider_clients", lambda: release.wait(5))
+
+    async def run():
+        async with main.lifespan(main.app):
+            warmup = main.provider_warmup
+            release.set()
+        return warmup
+
+    warmup = asyncio.run(run())
+
+    assert warmup.done()
+    assert concurrency._provider_executor is None
+    assert calls == ["health_prober", "database"]
+
+
+def test_shutdown_releases_resources_when_a_step_fails(calls, monkeypatch):
+    async def failing_stop():
+        raise RuntimeError("prober stuck")
+
+    monkeypatch.setattr(main, "load_provider_clients", lambda: None)
+    monkeypatch.setattr(main.health_prober, "stop", failing_stop)
+
+    async def run():
+        async with main.lifespan(main.app):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+    assert concurrency._provider_executor is None
+    assert calls == ["database"]
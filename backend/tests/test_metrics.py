@@ -0,0 +1,63 @@
+"""Tests for the Prometheus text exposition (app.services.metrics)."""
+import pytest
+from app.services import metrics
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """An empty metrics registry."""
+    monkeypatch.setattr(metrics, "_registry", {})
+
+
+def test_counter_and_histogram_exposition():
+    requests = metrics.counter("test_requests_total", "Requests handled", ("route",))
+    requests.inc("/a")
+    requests.inc("/a", amount=2)
+    latency = metrics.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1))
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    assert metrics.render_metrics() == "\n".join([
+        "# HELP test_requests_total Requests handled",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{route="/a"} 3',
+        "# HELP test_latency_seconds Latency",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{le="0.1"} 1',
+        'test_latency_seconds_bucket{le="1"} 2',
+        'test_latency_seconds_bucket{le="+Inf"} 2',
+        "test_latency_seconds_sum 0.55",
+        "test_latency_seconds_count 2",
+    ]) + "\n"
+
+
+def test_escaping():
+    metrics.counter("test_escaped_total", "Path \\ with\nnewline", ("value",)).inc('a "quoted" \\ value\nnext')
+
+    assert metrics.render_metrics().splitlines() == [
+        "# HELP test_escaped_total Path \\\\ with\\nnewline",
+        "# TYPE test_escaped_total counter",
+        'test_escaped_total{value="a \\"quoted\\" \\\\ value\\nnext"} 1',
+    ]
+
+
+def test_failing_collector_is_skipped():
+    def collect():
+        raise RuntimeError("source unavailable")
+
+    metrics.register_collector("test_broken", "Broken", "gauge", collect)
+    metrics.register_collector("test_queue_depth", "Queue depth", "gauge", lambda: [({"provider": "p"}, 4)])
+
+    assert metrics.render_metrics().splitlines() == [
+        "# HELP test_queue_depth Queue depth",
+        "# TYPE test_queue_depth gauge",
+        'test_queue_depth{provider="p"} 4',
+    ]
+
+
+def test_metric_must_implement_samples():
+    class Incomplete(metrics._Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("test_incomplete", "Incomplete")
@@ -0,0 +1,56 @@
+"""
+Concurrent provider calls overlap instead of queueing.
+
+Provider SDK calls are replaced by fakes with a fixed latency; N concurrent
+requests must then take about one latency, not N times it.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services import cartesia_service, elevenlabs_service
+from app.services.rate_limiter import TokenBucket
+from app.utils import concurrency
+
+LATENCY = 0.5
+CONCURRENCY = 8
+
+
+def slow_provider_call(*args, **kwargs) -> bytes:
+    """Stand-in for one blocking SDK request."""
+    time.sleep(LATENCY)
+    return b"audio"
+
+
+def elapsed_seconds(coroutine) -> float:
+    started = time.perf_counter()
+    asyncio.run(coroutine)
+    return time.perf_counter() - started
+
+
+@pytest.fixture
+def fake_providers(monkeypatch):
+    """Fake ElevenLabs and Cartesia clients, no rate limiting, no synthesis cache."""
+    for service, provider in ((elevenlabs_service, "elevenlabs"), (cartesia_service, "cartesia")):
+        monkeypatch.setattr(service.settings, f"{provider}_api_key", "test")
+        monkeypatch.setattr(service, f"get_{provider}_client", lambda: object())
+        monkeypatch.setattr(service, "get_rate_limiter", lambda name: TokenBucket(name, rate=0))
+        monkeypatch.setattr(service, "get_synthesis_cache", lambda: None)
+    monkeypatch.setattr(elevenlabs_service, "_convert_once", slow_provider_call)
+    monkeypatch.setattr(cartesia_service, "_bytes_once", slow_provider_call)
+    # A pool with a thread per request, whatever PROVIDER_MAX_WORKERS is
+    executor = ThreadPoolExecutor(max_workers=CONCURRENCY)
+    monkeypatch.setattr(concurrency, "_provider_executor", executor)
+    yield
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("service", [elevenlabs_service, cartesia_service], ids=["elevenlabs", "cartesia"])
+def test_generate_calls_overlap(fake_providers, service):
+    async def generate_all():
+        results = await asyncio.gather(*(
+            service.generate_tts_audio_async(f"Request number {i}.") for i in range(CONCURRENCY)
+        ))
+        assert results == [b"audio"] * CONCURRENCY
+
+    assert elapsed_seconds(generate_all()) < 2 * LATENCY
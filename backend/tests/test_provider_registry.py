@@ -0,0 +1,63 @@
+"""Tests for latency-aware provider routing (app.services.provider_registry)."""
+import asyncio
+import time
+import pytest
+from app.services import elevenlabs_service
+from app.services.provider_registry import ProviderRegistry, _elevenlabs_provider
+from app.services.rate_limiter import TokenBucket
+from app.services.synthesis_cache import SynthesisCache
+
+LATENCY = 0.05
+
+
+def provider_call(*args, **kwargs) -> bytes:
+    """Stand-in for one blocking SDK request."""
+    time.sleep(LATENCY)
+    return b"audio"
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registry with an ElevenLabs provider backed by a fake SDK call and an in-memory cache."""
+    cache = SynthesisCache(memory_max_bytes=1024 * 1024)
+    monkeypatch.setattr(elevenlabs_service.settings, "elevenlabs_api_key", "test")
+    monkeypatch.setattr(elevenlabs_service, "get_elevenlabs_client", lambda: object())
+    monkeypatch.setattr(elevenlabs_service, "get_rate_limiter", lambda name: TokenBucket(name, rate=0))
+    monkeypatch.setattr(elevenlabs_service, "get_synthesis_cache", lambda: cache)
+    monkeypatch.setattr(elevenlabs_service, "_convert_once", provider_call)
+    registry = ProviderRegistry()
+    registry.register(_elevenlabs_provider())
+    return registry
+
+
+def test_cache_hit_leaves_stats_unchanged(registry):
+    async def synthesize_twice():
+        first = await registry.synthesize("Hello there.", provider="elevenlabs")
+        after_first = registry.stats("elevenlabs").snapshot()
+        second = await registry.synthesize("Hello there.", provider="elevenlabs")
+        return first, after_first, second
+
+    first, after_first, second = asyncio.run(synthesize_twice())
+
+    assert first.audio == second.audio == b"audio"
+    assert after_first["requests"] == 1
+    assert after_first["latency_ewma_ms"] >= LATENCY * 1000
+    # Served from the synthesis cache: no provider round trip to record
+    assert registry.stats("elevenlabs").snapshot() == after_first
+
+
+def test_rate_limiter_wait_is_not_provider_latency(registry, monkeypatch):
+    # The second call waits 0.5 s for a slot before reaching the provider
+    limiter = TokenBucket("elevenlabs", rate=2, burst=1)
+    monkeypatch.setattr(elevenlabs_service, "get_rate_limiter", lambda name: limiter)
+
+    async def synthesize_two():
+        await registry.synthesize("First text.", provider="elevenlabs")
+        return await registry.synthesize("Second text.", provider="elevenlabs")
+
+    second = asyncio.run(synthesize_two())
+
+    assert second.latency >= 0.4
+    stats = registry.stats("elevenlabs")
+    assert stats.samples == 2
+    assert stats.percentile(100) < 0.4
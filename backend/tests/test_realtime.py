@@ -0,0 +1,208 @@
+"""Tests for the realtime TTS WebSocket (/api/realtime/tts) with the fake provider."""
+import asyncio
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.api.routes import realtime
+from app.api.routes.realtime import _RealtimeSession
+from app.config import get_settings
+from app.main import app
+from app.services import realtime_tts
+from app.services.realtime_tts import FakeRealtimeProvider
+
+START = {"type": "start", "provider": "fake", "encoding": "pcm_s16le", "sample_rate": 16000}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client for an authenticated user, with the fake provider enabled."""
+    async def authenticated(websocket):
+        return object()
+
+    monkeypatch.setattr(realtime, "get_current_user_from_websocket", authenticated)
+    monkeypatch.setattr(get_settings(), "realtime_fake_provider_enabled", True)
+    return TestClient(app)
+
+
+def receive_until(websocket, event_type: str):
+    """Read messages up to the first event of event_type; returns (audio frames, events)."""
+    frames, events = [], []
+    while True:
+        message = websocket.receive()
+        if message.get("bytes") is not None:
+            frames.append(message["bytes"])
+            continue
+        event = json.loads(message["text"])
+        events.append(event)
+        if event["type"] == event_type:
+            return frames, events
+
+
+def test_turn_with_flush(client):
+    with client.websocket_connect("/api/realtime/tts") as websocket:
+        websocket.send_json(START)
+        ready = websocket.receive_json()
+        assert ready["type"] == "ready"
+        assert (ready["provider"], ready["encoding"], ready["sample_rate"]) == ("fake", "pcm_s16le", 16000)
+
+        websocket.send_json({"type": "text", "text": "Hello there, "})
+        websocket.send_json({"type": "text", "text": "how are you"})
+        websocket.send_json({"type": "flush"})
+        frames, events = receive_until(websocket, "flushed")
+        assert frames
+        assert events[-1] == {"type": "flushed", "turn": 1, "flush_id": 1}
+
+        websocket.send_json({"type": "text", "text": "Fine, thanks."})
+        websocket.send_json({"type": "end"})
+        more_frames, events = receive_until(websocket, "done")
+        done = events[-1]
+        assert done["turn"] == 1
+        assert done["audio_bytes"] == sum(len(frame) for frame in frames + more_frames)
+        # 16-bit samples
+        assert all(len(frame) % 2 == 0 for frame in frames + more_frames)
+
+
+def test_turns_are_not_interleaved(client):
+    with client.websocket_connect("/api/realtime/tts") as websocket:
+        websocket.send_json(START)
+        websocket.receive_json()
+        # The second turn starts while the first is still being spoken
+        for text in ("First turn with a few words. ", "Second turn. "):
+            websocket.send_json({"type": "text", "text": text})
+            websocket.send_json({"type": "end"})
+
+        first_frames, first_events = receive_until(websocket, "done")
+        second_frames, second_events = receive_until(websocket, "done")
+
+    assert first_events[-1]["turn"] == 1
+    assert first_events[-1]["audio_bytes"] == sum(len(frame) for frame in first_frames)
+    assert second_events[-1]["turn"] == 2
+    assert second_events[-1]["audio_bytes"] == sum(len(frame) for frame in second_frames)
+
+
+def test_cancel_drops_the_turn(client):
+    with client.websocket_connect("/api/realtime/tts") as websocket:
+        websocket.send_json(START)
+        websocket.receive_json()
+        websocket.send_json({"type": "text", "text": "word " * 100})
+        websocket.send_json({"type": "flush"})
+        assert websocket.receive()["bytes"]
+
+        websocket.send_json({"type": "cancel"})
+        _, events = receive_until(websocket, "cancelled")
+        assert events[-1]["turn"] == 1
+
+        # The connection stays usable for the next turn
+        websocket.send_json({"type": "text", "text": "After the barge-in."})
+        websocket.send_json({"type": "end"})
+        _, events = receive_until(websocket, "done")
+
+    assert [event["turn"] for event in events if event["type"] == "done"] == [2]
+
+
+def test_protocol_errors(client, monkeypatch):
+    with client.websocket_connect("/api/realtime/tts") as websocket:
+        websocket.send_json({"type": "text", "text": "no start"})
+        assert websocket.receive_json()["status_code"] == 400
+
+    with client.websocket_connect("/api/realtime/tts") as websocket:
+        websocket.send_json(START)
+        websocket.receive_json()
+        websocket.send_json({"type": "shout"})
+        assert websocket.receive_json() == {
+            "type": "error", "turn": None, "status_code": 400, "detail": "Unknown message type 'shout'"
+        }
+        websocket.send_json({"type": "text", "text": 42})
+        assert websocket.receive_json()["detail"] == "text must be a string"
+
+    monkeypatch.setattr(get_settings(), "realtime_fake_provider_enabled", False)
+    with client.websocket_connect("/api/realtime/tts") as websocket:
+        websocket.send_json(START)
+        assert websocket.receive_json()["status_code"] == 400
+
+
+class SlowClient:
+    """WebSocket stand-in that cannot send anything until released."""
+
+    def __init__(self):
+        self.released = asyncio.Event()
+        self.frames = []
+        self.events = []
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self.released.wait()
+        self.frames.append(data)
+
+    async def send_json(self, data) -> None:
+        await self.released.wait()
+        self.events.append(data)
+
+
+def test_slow_client_stops_reading_from_the_provider(monkeypatch):
+    monkeypatch.setattr(get_settings(), "realtime_send_queue_frames", 2)
+    monkeypatch.setattr(realtime_tts, "FAKE_SPEEDUP", 1000.0)
+    text = "x" * 200 + ". "
+    expected_frames = round(len(text.strip()) * realtime_tts.FAKE_SECONDS_PER_CHAR / realtime_tts.FAKE_FRAME_SECONDS)
+
+    async def scenario():
+        websocket = SlowClient()
+        session = _RealtimeSession(websocket, FakeRealtimeProvider())
+        sender = asyncio.create_task(session.sender())
+        await session.on_text(text)
+        await session.on_end()
+        turn = session.turns[1]
+        await asyncio.sleep(0.3)
+
+        # Both queues are full and the provider is not read any further
+        assert session.outbound.full()
+        assert turn._events.full()
+        assert not turn._task.done()
+
+        websocket.released.set()
+        while not any(event.get("type") == "done" for event in websocket.events):
+            await asyncio.sleep(0.01)
+        sender.cancel()
+        return websocket
+
+    websocket = asyncio.run(scenario())
+    assert len(websocket.frames) == expected_frames
+    assert websocket.events[-1]["audio_bytes"] == sum(len(frame) for frame in websocket.frames)
+
+
+def test_cancel_ends_events():
+    async def read_all(turn) -> list:
+        return [event async for event in turn.events()]
+
+    async def scenario():
+        turn = await FakeRealtimeProvider().open_turn()
+        await turn.send_text("word " * 100)
+        await turn.flush()
+        reader = asyncio.create_task(read_all(turn))
+        await asyncio.sleep(0.1)
+        await turn.cancel()
+        # A reader still in events() finishes instead of waiting forever
+        return await asyncio.wait_for(reader, timeout=1)
+
+    events = asyncio.run(scenario())
+    assert events[0].type == "audio"
+    assert events[-1].type == "done"
+
+
+def test_sessions_are_independent():
+    async def speak() -> int:
+        turn = await FakeRealtimeProvider().open_turn()
+        await turn.send_text("Hello there. ")
+        await turn.end()
+        return sum([len(event.audio) async for event in turn.events()])
+
+    async def speak_concurrently(sessions: int) -> None:
+        sizes = await asyncio.gather(*(speak() for _ in range(sessions)))
+        assert all(size > 0 for size in sizes)
+
+    started = time.perf_counter()
+    asyncio.run(speak_concurrently(1))
+    single = time.perf_counter() - started
+    started = time.perf_counter()
+    asyncio.run(speak_concurrently(8))
+    assert time.perf_counter() - started < 2 * single
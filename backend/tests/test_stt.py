@@ -0,0 +1,166 @@
+"""Tests for /api/stt/transcribe with the fake engine."""
+import asyncio
+import io
+import time
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.api.routes import stt
+from app.config import get_settings
+from app.main import app
+from app.services import stt_service
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.stt_service import FakeSTTEngine, transcribe_recording
+from app.utils.audio import wav_header
+
+SAMPLE_RATE = 16000
+
+
+def wav_with_utterances(seconds: float, utterances: list) -> bytes:
+    """16-bit mono WAV of faint noise with a one-second tone starting at each utterance time."""
+    samples = np.random.default_rng(0).normal(0, 0.001, int(seconds * SAMPLE_RATE))
+    for start in utterances:
+        span = slice(int(start * SAMPLE_RATE), int((start + 1) * SAMPLE_RATE))
+        samples[span] += 0.3 * np.sin(2 * np.pi * 220 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)
+    data = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+    return wav_header(SAMPLE_RATE, "pcm_s16le", 1, len(data)) + data
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client for an authenticated user, with the fake engine and short segments."""
+    async def authenticated(request):
+        return object()
+
+    monkeypatch.setattr(stt, "get_current_user_from_request", authenticated)
+    monkeypatch.setattr(stt_service, "FAKE_LATENCY_SECONDS", 0.01)
+    monkeypatch.setattr(get_settings(), "stt_engine", "fake")
+    monkeypatch.setattr(get_settings(), "stt_max_segment_seconds", 3.0)
+    return TestClient(app)
+
+
+def test_raw_upload_is_segmented(client):
+    utterances = [2, 6, 10]
+    response = client.post(
+        "/api/stt/transcribe?language=en",
+        content=wav_with_utterances(14, utterances),
+        headers={"Content-Type": "audio/wav"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["engine"] == "fake"
+    assert body["duration"] == pytest.approx(14)
+    assert len(body["segments"]) == len(utterances)
+    for segment, start in zip(body["segments"], utterances):
+        assert segment["start"] <= start < segment["end"]
+        # Word times refer to the whole recording
+        assert all(segment["start"] <= word["start"] <= segment["end"] for word in segment["words"])
+    assert body["text"] == " ".join(segment["text"] for segment in body["segments"])
+
+
+def test_streamed_upload_without_length(client):
+    audio = wav_with_utterances(6, [2])
+
+    def chunks():
+        for offset in range(0, len(audio), 4096):
+            yield audio[offset:offset + 4096]
+
+    response = client.post("/api/stt/transcribe", content=chunks(), headers={"Content-Type": "audio/wav"})
+
+    assert response.status_code == 200
+    assert len(response.json()["segments"]) == 1
+
+
+def test_multipart_upload(client):
+    files = {"file": ("call.wav", wav_with_utterances(6, [2]), "audio/wav")}
+    response = client.post("/api/stt/transcribe", files=files)
+
+    assert response.status_code == 200
+    assert len(response.json()["segments"]) == 1
+
+
+def test_multipart_upload_without_file(client):
+    response = client.post("/api/stt/transcribe", data={"language": "en"}, files={"other": ("x", b"1")})
+
+    assert response.status_code == 400
+
+
+def test_silence_is_not_sent_to_the_engine(client, monkeypatch):
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("engine called for silence")
+
+    monkeypatch.setattr(FakeSTTEngine, "transcribe", unexpected)
+    response = client.post(
+        "/api/stt/transcribe", content=wav_with_utterances(5, []), headers={"Content-Type": "audio/wav"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["text"] == ""
+    assert response.json()["segments"] == []
+
+
+def test_compressed_audio_is_sent_whole(client):
+    response = client.post("/api/stt/transcribe", content=b"\xff\xfb" + b"\x00" * 1000, headers={"Content-Type": "audio/mpeg"})
+
+    assert response.status_code == 200
+    assert response.json()["duration"] is None
+    assert len(response.json()["segments"]) == 1
+
+
+def test_empty_upload(client):
+    response = client.post("/api/stt/transcribe", content=b"", headers={"Content-Type": "audio/wav"})
+
+    assert response.status_code == 400
+
+
+def test_upload_too_large(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "stt_max_upload_mb", 0)
+    audio = wav_with_utterances(1, [])
+
+    # Rejected from Content-Length, and while streaming when there is none
+    response = client.post("/api/stt/transcribe", content=audio, headers={"Content-Type": "audio/wav"})
+    assert response.status_code == 413
+    response = client.post("/api/stt/transcribe", content=iter([audio]), headers={"Content-Type": "audio/wav"})
+    assert response.status_code == 413
+
+
+def test_unknown_engine(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "stt_engine", "nope")
+    response = client.post("/api/stt/transcribe", content=wav_with_utterances(1, []), headers={"Content-Type": "audio/wav"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("error, status_code", [
+    (RateLimitExceeded("busy", retry_after=2.5), 429),
+    (ValueError("bad audio"), 400),
+    (Exception("engine down"), 500),
+])
+def test_engine_errors(client, monkeypatch, error, status_code):
+    async def failing(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(FakeSTTEngine, "transcribe", failing)
+    response = client.post(
+        "/api/stt/transcribe", content=wav_with_utterances(4, [2]), headers={"Content-Type": "audio/wav"}
+    )
+
+    assert response.status_code == status_code
+    if status_code == 429:
+        assert response.headers["Retry-After"] == "3"
+
+
+def test_segments_are_transcribed_concurrently(monkeypatch):
+    latency = 0.5
+    monkeypatch.setattr(stt_service, "FAKE_LATENCY_SECONDS", latency)
+    monkeypatch.setattr(get_settings(), "stt_concurrency", 4)
+    monkeypatch.setattr(get_settings(), "stt_max_segment_seconds", 3.0)
+    file = io.BytesIO(wav_with_utterances(18, [2, 6, 10, 14]))
+
+    started = time.perf_counter()
+    result = asyncio.run(transcribe_recording(file, "call.wav", "audio/wav", "en", FakeSTTEngine()))
+
+    # One engine latency, not one per segment
+    assert time.perf_counter() - started < 2 * latency
+    assert len(result.segments) == 4
@@ -0,0 +1,71 @@
+"""Tests that the streaming TTS routes close the provider stream."""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.api.routes import cartesia, tts
+from app.database import get_db
+from app.main import app
+from app.services.tts_history_service import stream_and_record
+
+
+class ProviderStream:
+    """Provider audio stream that fails on the first chunk and records whether it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        raise ValueError("provider failed")
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client for an authenticated user, without a database."""
+    async def authenticated(request, db):
+        return object()
+
+    async def no_db():
+        yield None
+
+    for route in (tts, cartesia):
+        monkeypatch.setattr(route, "get_current_user_from_request", authenticated)
+    monkeypatch.setitem(app.dependency_overrides, get_db, no_db)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("route, path", [(tts, "/api/tts/stream"), (cartesia, "/api/cartesia/stream")])
+def test_failed_stream_is_closed(client, monkeypatch, route, path):
+    stream = ProviderStream()
+    monkeypatch.setattr(route, "stream_tts_audio_async", lambda **kwargs: stream)
+
+    response = client.post(path, json={"text": "Hello", "voice_id": "voice"})
+
+    assert response.status_code >= 400
+    assert stream.closed
+
+
+def test_stream_and_record_closes_the_stream_on_disconnect():
+    closed = asyncio.Event()
+
+    async def chunks():
+        try:
+            for _ in range(10):
+                yield b"audio"
+        finally:
+            closed.set()
+
+    async def read_one_chunk():
+        body = stream_and_record(b"first", chunks(), user_id=None, text="", voice_id=None, mime_type="audio/mpeg")
+        await anext(body)
+        await anext(body)
+        # The client went away
+        await body.aclose()
+        return closed.is_set()
+
+    assert asyncio.run(read_one_chunk())
@@ -0,0 +1,30 @@
+"""Tests for voice activity detection and segmentation (app.utils.vad)."""
+import io
+import numpy as np
+import pytest
+from app.utils.audio import wav_header
+from app.utils.vad import read_wav_info, segment_recording, PAD_SECONDS
+
+
+def wav_with_speech(sample_rate: int, seconds: float, speech: tuple) -> io.BytesIO:
+    """16-bit mono WAV of faint noise with a loud tone between speech[0] and speech[1] seconds."""
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 0.001, int(seconds * sample_rate))
+    start, end = (int(t * sample_rate) for t in speech)
+    samples[start:end] += 0.3 * np.sin(2 * np.pi * 220 * np.arange(end - start) / sample_rate)
+    data = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+    return io.BytesIO(wav_header(sample_rate, "pcm_s16le", 1, len(data)) + data)
+
+
+@pytest.mark.parametrize("sample_rate", [16000, 22050, 11025])
+def test_segment_timestamps_do_not_drift(sample_rate):
+    # At 22050 and 11025 Hz a 0.03 s frame is not a whole number of samples
+    file = wav_with_speech(sample_rate, 600, (590, 595))
+    info = read_wav_info(file)
+
+    segments = segment_recording(file, info, max_segment_seconds=30)
+
+    assert len(segments) == 1
+    tolerance = 0.05
+    assert segments[0].start == pytest.approx(590 - PAD_SECONDS, abs=tolerance)
+    assert segments[0].end == pytest.approx(595 + PAD_SECONDS, abs=tolerance)
@@ -86,10 +86,15 @@ class ApiClient {
   }
 
   /**
-   * Get TTS history
+   * Get TTS history (newest first)
+   * Pass the next_cursor of the previous page to fetch the following page
    */
-  async getTTSHistory(limit = 10, offset = 0) {
-    return this.request(`/api/tts/history?limit=${limit}&offset=${offset}`);
+  async getTTSHistory(limit = 10, cursor = null) {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    return this.request(`/api/tts/history?${params.toString()}`);
   }
 
   /**